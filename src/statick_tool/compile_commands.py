@@ -0,0 +1,140 @@
+"""Compilation database interface.
+
+Reads the `compile_commands.json` files written by CMake (or any other build system
+supporting the JSON compilation database format) so that plugins can work with each
+translation unit individually.
+
+https://clang.llvm.org/docs/JSONCompilationDatabase.html
+"""
+
+import json
+import os
+import shlex
+from typing import Any, Optional
+
+
+class CompileCommands:
+    """Interface for reading a compilation database."""
+
+    def __init__(self, filename: Optional[str]) -> None:
+        """Initialize compilation database interface.
+
+        Args:
+            filename: Path to compile_commands.json file.
+        """
+        if not filename:
+            raise ValueError(f"{filename} is not a valid file")
+        self.filename = os.path.abspath(filename)
+        with open(filename, encoding="utf8") as fname:
+            try:
+                entries = json.load(fname)
+            except json.JSONDecodeError as ex:
+                raise ValueError(f"{filename} is not a valid JSON file: {ex}") from ex
+        if not isinstance(entries, list):
+            raise ValueError(f"{filename} is not a compilation database")
+        self.entries: list[dict[str, Any]] = [
+            entry
+            for entry in entries
+            if isinstance(entry, dict) and "file" in entry and "directory" in entry
+        ]
+        self.files: dict[str, dict[str, Any]] = {}
+        for entry in self.entries:
+            self.files.setdefault(self.get_file(entry), entry)
+
+    def get_entry(self, filename: str) -> Optional[dict[str, Any]]:
+        """Get the first entry used to compile a source file.
+
+        Args:
+            filename: Path to source file.
+
+        Returns:
+            Entry for the source file or None if it is not in the database.
+        """
+        return self.files.get(os.path.normpath(os.path.abspath(filename)))
+
+    @staticmethod
+    def get_file(entry: dict[str, Any]) -> str:
+        """Get the absolute path of the source file for an entry.
+
+        Args:
+            entry: Compilation database entry.
+
+        Returns:
+            Absolute path of source file.
+        """
+        return str(os.path.normpath(os.path.join(entry["directory"], entry["file"])))
+
+    @staticmethod
+    def get_arguments(entry: dict[str, Any]) -> list[str]:
+        """Get the compiler command for an entry as a list of arguments.
+
+        Entries may use either the `arguments` list or the `command` string.
+
+        Args:
+            entry: Compilation database entry.
+
+        Returns:
+            Compiler command, starting with the compiler itself.
+        """
+        if "arguments" in entry:
+            return list(entry["arguments"])
+        return shlex.split(entry.get("command", ""))
+
+    @staticmethod
+    def get_include_dirs(entry: dict[str, Any]) -> list[str]:
+        """Get the include directories used to compile an entry.
+
+        Args:
+            entry: Compilation database entry.
+
+        Returns:
+            Absolute paths of the include directories, in command line order.
+        """
+        include_dirs: list[str] = []
+        prefixes = ("-isystem", "-iquote", "-idirafter", "-I")
+        args = CompileCommands.get_arguments(entry)
+        for i, arg in enumerate(args):
+            include_dir = None
+            for prefix in prefixes:
+                if arg == prefix and i + 1 < len(args):
+                    include_dir = args[i + 1]
+                elif arg.startswith(prefix) and arg != prefix:
+                    include_dir = arg[len(prefix) :]
+                if include_dir is not None:
+                    break
+            if include_dir is None:
+                continue
+            include_dir = os.path.normpath(
+                os.path.join(entry["directory"], include_dir)
+            )
+            if include_dir not in include_dirs:
+                include_dirs.append(include_dir)
+        return include_dirs
+
+    @staticmethod
+    def strip_output_args(args: list[str]) -> list[str]:
+        """Remove the arguments that tell the compiler what files to write.
+
+        The object file, dependency file and compile-only arguments are removed so that
+        the command can be reused to run the compiler in a different mode.
+
+        Args:
+            args: Compiler command from the compilation database.
+
+        Returns:
+            Compiler command without output arguments.
+        """
+        stripped: list[str] = []
+        skip_next = False
+        for arg in args:
+            if skip_next:
+                skip_next = False
+            elif arg in ["-o", "-MF", "-MT", "-MQ"]:
+                skip_next = True
+            elif arg in ["-c", "-M", "-MM", "-MD", "-MMD"] or arg.startswith(
+                ("-o", "-MF", "-MT", "-MQ")
+            ):
+                continue
+            else:
+                stripped.append(arg)
+        return stripped
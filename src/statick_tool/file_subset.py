@@ -0,0 +1,52 @@
+"""Scan only some of the files in a package.
+
+Discovery normally walks the whole package and runs the `file` command on every file
+it finds. When only some files are to be scanned, such as the files changed in a
+commit, only those files are given to the discovery plugins and listed in the package
+under `file_subset`. Only tools that can be limited to some files are run, since tools
+that build or analyze the whole package can't be limited to some of its files.
+"""
+
+import logging
+import os
+
+from statick_tool.discovery_plugin import DiscoveryPlugin
+from statick_tool.package import Package
+
+
+def parse_files(value: str) -> list[str]:
+    """Parse a comma-separated list of files.
+
+    Args:
+        value: Comma-separated list of files, relative to the current directory.
+
+    Returns:
+        Absolute paths of the files.
+    """
+    return [os.path.abspath(filename) for filename in value.split(",") if filename]
+
+
+def find_files(package: Package, files: list[str]) -> None:
+    """Give only some files of a package to the discovery plugins.
+
+    Files outside the package or that don't exist are skipped.
+
+    Args:
+        package: Package to discover files in, before discovery has walked it.
+        files: Absolute paths of the files to scan.
+    """
+    discovery = DiscoveryPlugin()
+    root = os.path.join(os.path.abspath(package.path), "")
+    for filename in files:
+        if not filename.startswith(root):
+            continue
+        if not os.path.isfile(filename):
+            logging.warning("Skipping %s, it is not a file.", filename)
+            continue
+        package.files[filename] = {
+            "name": os.path.basename(filename).lower(),
+            "path": filename,
+            "file_cmd_out": discovery.get_file_cmd_output(filename),
+        }
+    package["file_subset"] = sorted(package.files)
+    package._walked = True  # pylint: disable=protected-access
@@ -0,0 +1,155 @@
+"""Run Python tools in persistent worker processes.
+
+Many tools are Python packages that are slow to import compared to the time it takes
+them to check a small package. Instead of starting a new interpreter for every run,
+the tool's console script entry point is called inside a pool of worker processes.
+The workers keep the tool modules imported between runs.
+
+Each call still gets the command line arguments, working directory and combined
+stdout and stderr output it would get as a separate process.
+"""
+
+import atexit
+import importlib
+import io
+import logging
+import multiprocessing
+import os
+import subprocess
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import redirect_stderr, redirect_stdout
+from typing import Any, Optional, Tuple
+
+if sys.version_info < (3, 10):
+    from importlib_metadata import entry_points
+else:
+    from importlib.metadata import entry_points
+
+_EXECUTOR: Optional[ProcessPoolExecutor] = None
+
+
+def get_entry_point(tool_bin: str) -> Optional[str]:
+    """Find the Python function behind a console script.
+
+    Args:
+        tool_bin: Name of the tool binary.
+
+    Returns:
+        Entry point in `module:function` form, or None if the tool is not a console
+        script of an installed Python package.
+    """
+    if os.path.dirname(tool_bin):
+        return None
+    for entry_point in entry_points(group="console_scripts", name=tool_bin):
+        return str(entry_point.value)
+    return None
+
+
+def run_entry_point(entry_point: str, args: list[str], cwd: str) -> Tuple[int, str]:
+    """Call a console script entry point as if it was run from the command line.
+
+    Args:
+        entry_point: Entry point in `module:function` form.
+        args: Command line arguments, starting with the tool name.
+        cwd: Directory to run the tool in.
+
+    Returns:
+        The exit code and the combined stdout and stderr output of the tool.
+    """
+    module_name, _, attrs = entry_point.partition(":")
+    function: Any = importlib.import_module(module_name)
+    for attr in attrs.split("."):
+        function = getattr(function, attr)
+
+    # Some tools write bytes to sys.stdout.buffer, so a StringIO is not enough.
+    buffer = io.BytesIO()
+    stream = io.TextIOWrapper(buffer, encoding="utf8", write_through=True)
+    original_argv = sys.argv
+    original_cwd = os.getcwd()
+    sys.argv = list(args)
+    returncode = 0
+    try:
+        os.chdir(cwd)
+        with redirect_stdout(stream), redirect_stderr(stream):
+            try:
+                result = function()
+                if isinstance(result, int):
+                    returncode = int(result)
+            except SystemExit as ex:
+                if isinstance(ex.code, int):
+                    returncode = int(ex.code)
+                elif ex.code is not None:
+                    print(ex.code, file=sys.stderr)
+                    returncode = 1
+    finally:
+        sys.argv = original_argv
+        os.chdir(original_cwd)
+    stream.flush()
+    return returncode, buffer.getvalue().decode("utf8", errors="replace")
+
+
+def get_executor(max_workers: int) -> Optional[ProcessPoolExecutor]:
+    """Get the pool of worker processes, starting it if needed.
+
+    Args:
+        max_workers: Number of worker processes to start the pool with.
+
+    Returns:
+        The worker pool, or None if this process can't start one.
+    """
+    global _EXECUTOR  # pylint: disable=global-statement
+    # Daemon processes, like workspace package workers, can't start a pool.
+    if multiprocessing.current_process().daemon:
+        return None
+    if _EXECUTOR is None:
+        _EXECUTOR = ProcessPoolExecutor(max_workers=max(1, max_workers))
+        atexit.register(shutdown)
+    return _EXECUTOR
+
+
+def shutdown() -> None:
+    """Stop the worker processes."""
+    global _EXECUTOR  # pylint: disable=global-statement
+    if _EXECUTOR is not None:
+        _EXECUTOR.shutdown()
+        _EXECUTOR = None
+
+
+def check_output(subproc_args: list[str], max_workers: int = 1) -> Optional[str]:
+    """Run a Python tool in a worker process.
+
+    Behaves like `subprocess.check_output` with stderr redirected to stdout.
+
+    Args:
+        subproc_args: Tool command line, starting with the tool binary.
+        max_workers: Number of worker processes to start the pool with.
+
+    Returns:
+        The output of the tool, or None if the tool can't be run in a worker process.
+
+    Raises:
+        CalledProcessError: The tool exited with a non-zero exit code.
+    """
+    entry_point = get_entry_point(subproc_args[0])
+    if entry_point is None:
+        return None
+    executor = get_executor(max_workers)
+    if executor is None:
+        return None
+    try:
+        returncode, output = executor.submit(
+            run_entry_point, entry_point, subproc_args, os.getcwd()
+        ).result()
+    except Exception as ex:  # pylint: disable=broad-except
+        if isinstance(ex, BrokenProcessPool):
+            shutdown()
+        logging.warning(
+            "Unable to run %s in process:\n%s", subproc_args[0], traceback.format_exc()
+        )
+        return None
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, subproc_args, output=output)
+    return output
@@ -0,0 +1,532 @@
+"""Language Server Protocol front-end publishing Statick issues as diagnostics.
+
+`statick lsp` talks to an editor over standard input and output. When a file is
+opened or saved, the tools enabled at the level of its package are run on just that
+file, and the issues left after applying the exceptions are published as
+diagnostics. This gives editors the same tools, flags, exceptions and CERT references
+as a full Statick scan.
+
+Plugins, configuration and the tools found at each level are loaded once, and the
+files of each package are discovered the first time one of its files is linted.
+Only tools that scan single files are run, in parallel. Saves are debounced, and when
+a file is saved again while it is being linted, the tools not started yet are skipped
+and the outdated results are dropped.
+"""
+
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, BinaryIO, Callable, Optional, Tuple
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+from statick_tool import file_subset, watch
+from statick_tool.issue import Issue
+from statick_tool.package import Package
+from statick_tool.plugin_context import PluginContext
+from statick_tool.statick_tool import Statick
+from statick_tool.tool_plugin import ToolPlugin
+
+METHOD_NOT_FOUND = -32601
+SEVERITY_ERROR = 1
+SEVERITY_WARNING = 2
+SEVERITY_INFORMATION = 3
+
+Message = dict[str, Any]
+
+
+def read_message(stream: BinaryIO) -> Optional[Message]:
+    """Read a message from the editor.
+
+    Args:
+        stream: Stream to read from.
+
+    Returns:
+        The message, or None at the end of the stream.
+    """
+    length = None
+    while True:
+        line = stream.readline()
+        if not line:
+            return None
+        line = line.strip()
+        if not line:
+            break
+        name, _, value = line.decode("ascii").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    if length is None:
+        raise ValueError("Message without Content-Length header")
+    message: Message = json.loads(stream.read(length).decode("utf8"))
+    return message
+
+
+def write_message(stream: BinaryIO, message: Message) -> None:
+    """Send a message to the editor.
+
+    Args:
+        stream: Stream to write to.
+        message: Message to send.
+    """
+    body = json.dumps(message).encode("utf8")
+    stream.write(f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body)
+    stream.flush()
+
+
+def uri_to_path(uri: str) -> Optional[str]:
+    """Get the path of a file URI.
+
+    Args:
+        uri: URI sent by the editor.
+
+    Returns:
+        Absolute path of the file, or None if the URI is not a file.
+    """
+    parsed = urlparse(uri)
+    if parsed.scheme != "file":
+        return None
+    return os.path.abspath(url2pathname(parsed.path))
+
+
+def get_diagnostic(issue: Issue) -> Message:
+    """Describe an issue as an LSP diagnostic covering the line of the issue.
+
+    Args:
+        issue: Issue found by a tool.
+
+    Returns:
+        The diagnostic.
+    """
+    line = max(int(issue.line_number) - 1, 0)
+    severity = SEVERITY_INFORMATION
+    try:
+        if int(issue.severity) > 2:
+            severity = SEVERITY_WARNING
+        if int(issue.severity) > 4:
+            severity = SEVERITY_ERROR
+    except ValueError as ex:
+        logging.warning(
+            "Invalid severity integer (%s), using default information severity. "
+            "Error = %s",
+            issue.severity,
+            ex,
+        )
+    message = f"{issue.tool}: {issue.message}"
+    if issue.cert_reference:
+        message += f" ({issue.cert_reference})"
+    return {
+        "range": {
+            "start": {"line": line, "character": 0},
+            "end": {"line": line + 1, "character": 0},
+        },
+        "severity": severity,
+        "code": issue.issue_type,
+        "source": "statick",
+        "message": message,
+    }
+
+
+class Linter:
+    """Run the tools of a package on single files."""
+
+    def __init__(self, statick: Statick, args: argparse.Namespace) -> None:
+        """Initialize the linter.
+
+        Args:
+            statick: Statick object with configuration and exceptions loaded.
+            args: Arguments from the command line.
+        """
+        self.statick = statick
+        self.args = args
+        self.packages: dict[str, Tuple[Package, str]] = {}
+
+    def get_package(self, root: str, path: str) -> Optional[Tuple[Package, str]]:
+        """Get a discovered package and its level.
+
+        The package is discovered the first time, and again when a file it does not
+        have yet is linted.
+
+        Args:
+            root: Path of the package.
+            path: Absolute path of the file to lint.
+
+        Returns:
+            The package and its level, or None if discovery failed.
+        """
+        if root in self.packages and path in self.packages[root][0].files:
+            return self.packages[root]
+        package = Package(os.path.basename(root), root)
+        if root in self.packages:
+            # Only look at the new file, the others were found before.
+            package.files = dict(self.packages[root][0].files)
+            file_subset.find_files(package, [path])
+        discovered, level, _ = self.statick.discover_package(self.args, package)
+        if discovered is None or level is None:
+            logging.error("Unable to run discovery on %s.", root)
+            return None
+        self.packages[root] = (discovered, level)
+        return self.packages[root]
+
+    def get_plugins(
+        self, level: str, file_types: set[str], plugin_context: PluginContext
+    ) -> list[ToolPlugin]:
+        """Find the installed tools enabled at a level that can scan a single file.
+
+        Args:
+            level: Level of the package.
+            file_types: File types of the file to lint.
+            plugin_context: Context to give the tool plugins.
+
+        Returns:
+            Tool plugins to run, with their context set.
+        """
+        assert self.statick.config is not None
+        plugin_names = self.statick.config.get_enabled_tool_plugins(level)
+        if not plugin_names:
+            plugin_names = list(self.statick.tool_plugins)
+        if self.args.force_tool_list is not None:
+            force_tool_list = self.args.force_tool_list.split(",")
+            plugin_names = [name for name in plugin_names if name in force_tool_list]
+        missing_tools = self.statick.check_tools(level, plugin_context)
+        plugins: list[ToolPlugin] = []
+        for plugin_name in plugin_names:
+            plugin = self.statick.tool_plugins.get(plugin_name)
+            if plugin is None or plugin_name in missing_tools:
+                continue
+            if plugin.supports_file_subset() and file_types.intersection(
+                plugin.get_file_types() or []
+            ):
+                plugin.set_plugin_context(plugin_context)
+                plugins.append(plugin)
+        return plugins
+
+    def run_tools(
+        self,
+        plugins: list[ToolPlugin],
+        package: Package,
+        level: str,
+        is_current: Callable[[], bool],
+    ) -> dict[str, list[Issue]]:
+        """Run tools in parallel.
+
+        Args:
+            plugins: Tool plugins, with their context set.
+            package: Package listing only the file to lint.
+            level: Level of the package.
+            is_current: Function telling if the results are still wanted.
+
+        Returns:
+            Issues found by each tool that succeeded.
+        """
+
+        def run_tool(plugin: ToolPlugin) -> Tuple[str, Optional[list[Issue]]]:
+            if not is_current():
+                return plugin.get_name(), None
+            return plugin.get_name(), plugin.scan(package, level)
+
+        max_workers = max(1, min(len(plugins), self.args.max_procs))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(run_tool, plugins))
+        return {name: issues for name, issues in results if issues is not None}
+
+    def lint(
+        self, root: str, path: str, is_current: Callable[[], bool]
+    ) -> Optional[list[Issue]]:
+        """Run the tools of a package on a file.
+
+        Tools run in the output directory of the package, like they do when the
+        package is scanned.
+
+        Args:
+            root: Path of the package.
+            path: Absolute path of the file.
+            is_current: Function telling if the results are still wanted. Tools are
+                not started once it returns False.
+
+        Returns:
+            Issues found in the file, or None if the file could not be linted.
+        """
+        found = self.get_package(root, path)
+        if found is None:
+            return None
+        package, level = found
+        assert self.statick.config is not None
+        plugin_context = PluginContext(
+            self.args, self.statick.resources, self.statick.config
+        )
+        file_types = watch.get_file_types(package, [path])
+        plugins = self.get_plugins(level, file_types, plugin_context)
+        orig_path = os.getcwd()
+        try:
+            if self.args.output_directory:
+                output_dir = os.path.join(
+                    self.args.output_directory, package.name + "-" + level
+                )
+                os.makedirs(output_dir, exist_ok=True)
+                os.chdir(output_dir)
+            subset = watch.get_subset(package, list(file_types), {path})
+            issues = self.run_tools(plugins, subset, level, is_current)
+            if self.statick.exceptions is not None:
+                issues = self.statick.exceptions.filter_issues(package, issues)
+            # Tools may also report issues in the files the linted file uses.
+            return [
+                issue
+                for tool_issues in issues.values()
+                for issue in tool_issues
+                if os.path.abspath(issue.filename) == path
+            ]
+        except OSError as ex:
+            logging.error("Unable to lint %s: %s", path, ex)
+            return None
+        finally:
+            os.chdir(orig_path)
+
+
+class LanguageServer:  # pylint: disable=too-many-instance-attributes
+    """Handle messages from an editor and publish diagnostics."""
+
+    def __init__(self, linter: Linter, roots: list[str], debounce: float = 0.2) -> None:
+        """Initialize the server.
+
+        Args:
+            linter: Linter running the tools.
+            roots: Paths of the packages to lint files of, used until the editor
+                sends its workspace folders.
+            debounce: Seconds to wait after a save before linting the file.
+        """
+        self.linter = linter
+        self.roots = roots
+        self.debounce = debounce
+        self.output: Optional[BinaryIO] = None
+        self.write_lock = threading.Lock()
+        self.condition = threading.Condition()
+        # Time each file is due to be linted at, by URI.
+        self.pending: dict[str, float] = {}
+        # Incremented on every save, so running lints can tell they are outdated.
+        self.generations: dict[str, int] = {}
+        self.running = False
+
+    def send(self, message: Message) -> None:
+        """Send a message to the editor.
+
+        Args:
+            message: Message without the JSON-RPC version.
+        """
+        assert self.output is not None
+        with self.write_lock:
+            write_message(self.output, {"jsonrpc": "2.0", **message})
+
+    def publish(self, uri: str, issues: list[Issue]) -> None:
+        """Publish the issues of a file as diagnostics.
+
+        Args:
+            uri: URI of the file.
+            issues: Issues found in the file.
+        """
+        self.send(
+            {
+                "method": "textDocument/publishDiagnostics",
+                "params": {
+                    "uri": uri,
+                    "diagnostics": [get_diagnostic(issue) for issue in issues],
+                },
+            }
+        )
+
+    def get_root(self, path: str) -> Optional[str]:
+        """Find the package a file is in.
+
+        Editor workspace folders often hold several packages. Like a workspace scan,
+        the innermost directory with a package.xml, setup.py or pyproject.toml is the
+        package, so only that package is discovered and its level and exceptions
+        apply. Without one, the workspace folder is the package. Files below a
+        directory with an ignore file are not in a package.
+
+        Args:
+            path: Absolute path of the file.
+
+        Returns:
+            Path of the innermost package containing the file, or None.
+        """
+        roots = [
+            root
+            for root in self.roots
+            if path.startswith(os.path.join(os.path.abspath(root), ""))
+        ]
+        if not roots:
+            return None
+        root = os.path.abspath(max(roots, key=len))
+        package_dir = None
+        directory = os.path.dirname(path)
+        while True:
+            try:
+                files = os.listdir(directory)
+            except OSError:
+                files = []
+            if any(item in Statick.IGNORE_FILES for item in files):
+                return None
+            if package_dir is None and any(
+                item in Statick.PACKAGE_INDICATORS for item in files
+            ):
+                package_dir = directory
+            if directory == root or directory == os.path.dirname(directory):
+                break
+            directory = os.path.dirname(directory)
+        return package_dir or root
+
+    def schedule(self, uri: str) -> None:
+        """Lint a file once no newer save arrives within the debounce time.
+
+        Args:
+            uri: URI of the file.
+        """
+        with self.condition:
+            self.generations[uri] = self.generations.get(uri, 0) + 1
+            self.pending[uri] = time.monotonic() + self.debounce
+            self.condition.notify()
+
+    def cancel(self, uri: str) -> None:
+        """Stop linting a file.
+
+        Args:
+            uri: URI of the file.
+        """
+        with self.condition:
+            self.generations[uri] = self.generations.get(uri, 0) + 1
+            self.pending.pop(uri, None)
+
+    def next_uri(self) -> Optional[Tuple[str, int]]:
+        """Wait for a file to be due for linting.
+
+        Returns:
+            URI of the file and its generation, or None when the server stops.
+        """
+        with self.condition:
+            while self.running:
+                if not self.pending:
+                    self.condition.wait()
+                    continue
+                uri, due = min(self.pending.items(), key=lambda item: item[1])
+                delay = due - time.monotonic()
+                if delay > 0:
+                    self.condition.wait(delay)
+                    continue
+                del self.pending[uri]
+                return uri, self.generations[uri]
+        return None
+
+    def lint_files(self) -> None:
+        """Lint files as they become due until the server stops."""
+        while True:
+            found = self.next_uri()
+            if found is None:
+                return
+            uri, generation = found
+
+            def is_current(uri: str = uri, generation: int = generation) -> bool:
+                with self.condition:
+                    return self.running and self.generations.get(uri) == generation
+
+            path = uri_to_path(uri)
+            root = None if path is None else self.get_root(path)
+            if path is None or root is None:
+                logging.info("Skipping %s, it is not in a package.", uri)
+                continue
+            start = time.monotonic()
+            try:
+                issues = self.linter.lint(root, path, is_current)
+            except Exception as ex:  # pylint: disable=broad-except
+                # Keep linting other saves if a tool plugin fails unexpectedly.
+                logging.exception("Unable to lint %s: %s", path, ex)
+                continue
+            if issues is None or not is_current():
+                continue
+            logging.info("Linted %s in %.3f seconds.", path, time.monotonic() - start)
+            self.publish(uri, issues)
+
+    def handle(self, message: Message) -> bool:
+        """Handle a message from the editor.
+
+        Args:
+            message: Request or notification.
+
+        Returns:
+            False once the editor asks the server to exit.
+        """
+        method = message.get("method")
+        params = message.get("params") or {}
+        result: Any = None
+        if method == "initialize":
+            folders = params.get("workspaceFolders") or []
+            uris = [folder["uri"] for folder in folders]
+            if not uris and params.get("rootUri"):
+                uris = [params["rootUri"]]
+            roots = [path for path in map(uri_to_path, uris) if path is not None]
+            if roots:
+                self.roots = roots
+            result = {
+                "capabilities": {
+                    "textDocumentSync": {
+                        "openClose": True,
+                        "change": 0,
+                        "save": {"includeText": False},
+                    }
+                },
+                "serverInfo": {"name": "statick"},
+            }
+        elif method in ["textDocument/didOpen", "textDocument/didSave"]:
+            self.schedule(params["textDocument"]["uri"])
+        elif method == "textDocument/didClose":
+            uri = params["textDocument"]["uri"]
+            self.cancel(uri)
+            self.send(
+                {
+                    "method": "textDocument/publishDiagnostics",
+                    "params": {"uri": uri, "diagnostics": []},
+                }
+            )
+        elif method == "exit":
+            return False
+        elif method != "shutdown" and "id" in message:
+            self.send(
+                {
+                    "id": message["id"],
+                    "error": {
+                        "code": METHOD_NOT_FOUND,
+                        "message": f"Method not found: {method}",
+                    },
+                }
+            )
+            return True
+        if "id" in message:
+            self.send({"id": message["id"], "result": result})
+        return True
+
+    def serve(self, input_stream: BinaryIO, output_stream: BinaryIO) -> None:
+        """Handle messages from the editor until it asks the server to exit.
+
+        Args:
+            input_stream: Stream to read messages from.
+            output_stream: Stream to send messages to.
+        """
+        self.output = output_stream
+        self.running = True
+        worker = threading.Thread(target=self.lint_files, daemon=True)
+        worker.start()
+        try:
+            while True:
+                try:
+                    message = read_message(input_stream)
+                    if message is None or not self.handle(message):
+                        break
+                except (ValueError, KeyError, TypeError) as ex:
+                    logging.warning("Invalid message: %s", ex)
+        finally:
+            with self.condition:
+                self.running = False
+                self.condition.notify()
+            worker.join()
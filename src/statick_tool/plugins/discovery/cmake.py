@@ -11,12 +11,15 @@ for the current package. That information is made available as part of the packa
 """
 
 import argparse
+import filecmp
+import hashlib
+import json
 import logging
 import os
 import re
 import shutil
 import subprocess
-from typing import Match, Optional, Pattern, Union
+from typing import Any, Match, Optional, Pattern, Union
 
 from statick_tool.discovery_plugin import DiscoveryPlugin
 from statick_tool.exceptions import Exceptions
@@ -26,6 +29,9 @@ from statick_tool.package import Package
 class CMakeDiscoveryPlugin(DiscoveryPlugin):
     """Discovery plugin to find CMake-based projects."""
 
+    CONFIGURE_CACHE = "statick_cmake.json"
+    SOURCE_EXTENSIONS = (".c", ".cc", ".cpp", ".cxx", ".h", ".hxx", ".hpp")
+
     def get_name(self) -> str:
         """Get name of discovery type.
 
@@ -41,7 +47,7 @@ class CMakeDiscoveryPlugin(DiscoveryPlugin):
         Returns:
             List of plugin names.
         """
-        return ["ros"]
+        return ["ros", "compile_commands"]
 
     def gather_args(self, args: argparse.Namespace) -> None:
         """Gather arguments.
@@ -52,6 +58,19 @@ class CMakeDiscoveryPlugin(DiscoveryPlugin):
         args.add_argument(
             "--cmake-flags", dest="cmake_flags", type=str, help="CMake flags"
         )
+        args.add_argument(
+            "--cmake-build-dir",
+            dest="cmake_build_dir",
+            type=str,
+            help="Directory to keep a CMake build directory for each package in. "
+            "CMake is only run again when the CMake inputs or the C/C++ files change",
+        )
+        args.add_argument(
+            "--cmake-generator",
+            dest="cmake_generator",
+            type=str,
+            help="CMake generator to use (Unix Makefiles or Ninja)",
+        )
 
     def scan(
         self, package: Package, level: str, exceptions: Optional[Exceptions] = None
@@ -78,6 +97,10 @@ class CMakeDiscoveryPlugin(DiscoveryPlugin):
             ):
                 package["cmake_src"].append(file_dict["path"])
 
+        if "compile_commands" in package:
+            logging.info("  Using targets from %s.", package["compile_commands"])
+            return
+
         package["make_targets"] = []
         package["headers"] = []
 
@@ -87,9 +110,6 @@ class CMakeDiscoveryPlugin(DiscoveryPlugin):
 
         package["cmake"] = [os.path.join(package.path, "CMakeLists.txt")]
 
-        cmake_template = self.plugin_context.resources.get_file("CMakeLists.txt.in")
-        shutil.copyfile(cmake_template, "CMakeLists.txt")  # type: ignore
-
         tool_flags: Union[str, None] = self.plugin_context.config.get_tool_config(
             "make", level, "flags", ""
         )
@@ -135,30 +155,196 @@ class CMakeDiscoveryPlugin(DiscoveryPlugin):
             subproc_args.extend(default_flags)
         subproc_args.extend(path_flags)
 
+        output = self.configure(package, subproc_args)
+        if output is None:
+            return
+
+        logging.debug("%s", output)
+
+        if self.plugin_context and self.plugin_context.args.output_directory:
+            with open("cmake.log", "w", encoding="utf8") as fid:
+                fid.write(output)
+
+        self.process_output(output, package)
+
+        logging.info("  %d make targets found.", len(package["make_targets"]))
+        logging.info("  %d CMake files found.", len(package["cmake_src"]))
+
+    def configure(self, package: Package, subproc_args: list[str]) -> Optional[str]:
+        """Run CMake on the Statick template for a package.
+
+        When a persistent build directory is used and none of the CMake inputs have
+        changed since the last configure, the saved CMake output is returned instead.
+
+        Args:
+            package: The package to configure.
+            subproc_args: The CMake command.
+
+        Returns:
+            The CMake output, or None if CMake could not be run.
+        """
+        assert self.plugin_context is not None
+        if (
+            "cmake_generator" in self.plugin_context.args
+            and self.plugin_context.args.cmake_generator
+        ):
+            subproc_args = subproc_args + [
+                "-G",
+                self.plugin_context.args.cmake_generator,
+            ]
+            package["cmake_generator"] = self.plugin_context.args.cmake_generator
+
+        persistent_dir = self.get_build_dir(package)
+        build_dir = persistent_dir or os.getcwd()
+        cmake_template = self.plugin_context.resources.get_file("CMakeLists.txt.in")
+        build_template = os.path.join(build_dir, "CMakeLists.txt")
+        # Leave an unchanged template alone so make does not reconfigure.
+        if not os.path.isfile(build_template) or not filecmp.cmp(
+            cmake_template, build_template, shallow=False  # type: ignore
+        ):
+            shutil.copyfile(cmake_template, build_template)  # type: ignore
+
+        fingerprint = None
+        if persistent_dir is not None:
+            source_files = [
+                file_dict["path"]
+                for file_dict in package.files.values()
+                if file_dict["name"].endswith(self.SOURCE_EXTENSIONS)
+            ]
+            fingerprint = self.get_fingerprint(
+                package["cmake_src"],
+                source_files,
+                subproc_args,
+                cmake_template,  # type: ignore
+            )
+            output = self.read_configure_cache(build_dir, fingerprint)
+            if output is not None:
+                logging.info("  Reusing CMake configuration in %s.", build_dir)
+                return output
+
         try:
-            output: str = subprocess.check_output(
-                subproc_args, stderr=subprocess.STDOUT, universal_newlines=True
+            output = subprocess.check_output(
+                subproc_args,
+                cwd=build_dir,
+                stderr=subprocess.STDOUT,
+                universal_newlines=True,
             )
+            if fingerprint is not None:
+                self.write_configure_cache(build_dir, fingerprint, output)
         except subprocess.CalledProcessError as ex:
             output = ex.output
             logging.warning("Problem running CMake! Returncode = %d", ex.returncode)
-            logging.warning("From %s, running %s", os.getcwd(), subproc_args)
+            logging.warning("From %s, running %s", build_dir, subproc_args)
             logging.warning("CMake output: %s", ex.output)
 
         except OSError:
             logging.warning("Couldn't find cmake executable!")
-            return
+            return None
 
-        logging.debug("%s", output)
+        return output
 
-        if self.plugin_context and self.plugin_context.args.output_directory:
-            with open("cmake.log", "w", encoding="utf8") as fid:
-                fid.write(output)
+    def get_build_dir(self, package: Package) -> Optional[str]:
+        """Get the persistent directory to configure the package in.
 
-        self.process_output(output, package)
+        Args:
+            package: The package to configure.
 
-        logging.info("  %d make targets found.", len(package["make_targets"]))
-        logging.info("  %d CMake files found.", len(package["cmake_src"]))
+        Returns:
+            Persistent build directory for the package, or None if there is none.
+        """
+        if (
+            self.plugin_context is None
+            or "cmake_build_dir" not in self.plugin_context.args
+            or not self.plugin_context.args.cmake_build_dir
+        ):
+            return None
+        build_dir = os.path.join(
+            os.path.abspath(self.plugin_context.args.cmake_build_dir), package.name
+        )
+        try:
+            os.makedirs(build_dir, exist_ok=True)
+        except OSError as ex:
+            logging.warning("Unable to create build directory %s: %s", build_dir, ex)
+            return None
+        return build_dir
+
+    @staticmethod
+    def get_fingerprint(
+        cmake_src: list[str],
+        source_files: list[str],
+        subproc_args: list[str],
+        cmake_template: str,
+    ) -> str:
+        """Hash the inputs of a CMake configure.
+
+        Only the names of the C/C++ files are hashed. Targets that glob for sources
+        change when a file is added or removed, not when one is edited.
+
+        Args:
+            cmake_src: CMake files in the package.
+            source_files: C/C++ files in the package.
+            subproc_args: The CMake command.
+            cmake_template: The Statick CMake template.
+
+        Returns:
+            Hash of the CMake files, C/C++ file names, command and template.
+        """
+        digest = hashlib.sha256()
+        digest.update("\0".join(subproc_args).encode("utf8"))
+        digest.update("\0".join(sorted(source_files)).encode("utf8"))
+        for filename in [cmake_template] + sorted(cmake_src):
+            digest.update(filename.encode("utf8"))
+            try:
+                with open(filename, "rb") as fid:
+                    digest.update(fid.read())
+            except OSError:
+                digest.update(b"\0")
+        return digest.hexdigest()
+
+    @classmethod
+    def read_configure_cache(cls, build_dir: str, fingerprint: str) -> Optional[str]:
+        """Read the output of a previous configure of the build directory.
+
+        Args:
+            build_dir: The build directory.
+            fingerprint: Hash of the current CMake inputs.
+
+        Returns:
+            The previous CMake output, or None if the inputs have changed.
+        """
+        try:
+            with open(
+                os.path.join(build_dir, cls.CONFIGURE_CACHE), encoding="utf8"
+            ) as fid:
+                cache: Any = json.load(fid)
+        except (OSError, ValueError):
+            return None
+        if (
+            not isinstance(cache, dict)
+            or cache.get("fingerprint") != fingerprint
+            or not isinstance(cache.get("output"), str)
+        ):
+            return None
+        return str(cache["output"])
+
+    @classmethod
+    def write_configure_cache(
+        cls, build_dir: str, fingerprint: str, output: str
+    ) -> None:
+        """Save the output of a configure of the build directory.
+
+        Args:
+            build_dir: The build directory.
+            fingerprint: Hash of the CMake inputs.
+            output: The CMake output.
+        """
+        try:
+            with open(
+                os.path.join(build_dir, cls.CONFIGURE_CACHE), "w", encoding="utf8"
+            ) as fid:
+                json.dump({"fingerprint": fingerprint, "output": output}, fid)
+        except OSError as ex:
+            logging.warning("Unable to save CMake output in %s: %s", build_dir, ex)
 
     @classmethod
     def process_output(  # pylint: disable=too-many-locals
@@ -0,0 +1,184 @@
+"""Discovery plugin to find C/C++ targets in an existing compilation database.
+
+Packages that have already been built usually have a `compile_commands.json` file in
+their build directory. Reading the source files and include directories from it gives
+the same package data as the CMake discovery plugin without configuring the package
+again.
+
+https://clang.llvm.org/docs/JSONCompilationDatabase.html
+"""
+
+import argparse
+import glob
+import logging
+import os
+from typing import Any, Optional
+
+from statick_tool.compile_commands import CompileCommands
+from statick_tool.discovery_plugin import DiscoveryPlugin
+from statick_tool.exceptions import Exceptions
+from statick_tool.package import Package
+
+
+class CompileCommandsDiscoveryPlugin(DiscoveryPlugin):
+    """Discovery plugin to find C/C++ targets in an existing compilation database."""
+
+    FILENAME = "compile_commands.json"
+    HEADER_EXTENSIONS = (".h", ".hh", ".hpp", ".hxx")
+
+    def get_name(self) -> str:
+        """Get name of discovery type.
+
+        Returns:
+            Name of the discovery type.
+        """
+        return "compile_commands"
+
+    @classmethod
+    def get_discovery_dependencies(cls) -> list[str]:
+        """Get a list of plugins that must run before this one.
+
+        Returns:
+            List of plugin names.
+        """
+        return ["ros"]
+
+    def gather_args(self, args: argparse.Namespace) -> None:
+        """Gather arguments.
+
+        Args:
+            args: Flags for this plugin will be added to these existing arguments.
+        """
+        args.add_argument(
+            "--compile-commands",
+            dest="compile_commands",
+            type=str,
+            help="Path to a compile_commands.json file, or a directory containing a "
+            "build directory for each package, to discover C/C++ targets from",
+        )
+        args.add_argument(
+            "--compile-commands-search",
+            dest="compile_commands_search",
+            action="store_true",
+            help="Search the usual build directories of each package for a "
+            "compile_commands.json file to discover C/C++ targets from",
+        )
+
+    def scan(  # pylint: disable=too-many-locals
+        self, package: Package, level: str, exceptions: Optional[Exceptions] = None
+    ) -> None:
+        """Scan package looking for a compilation database.
+
+        Args:
+            package: The package to scan.
+            level: The level of scanning.
+            exceptions: Optional exceptions to apply.
+        """
+        if self.plugin_context is None:
+            return
+
+        filename = self.find_compile_commands(package)
+        if filename is None:
+            return
+
+        try:
+            compile_commands = CompileCommands(filename)
+        except (OSError, ValueError) as ex:
+            logging.warning("Unable to read compilation database: %s", ex)
+            return
+
+        package_path = os.path.abspath(package.path)
+        src: list[str] = []
+        include_dirs: list[str] = []
+        for entry in compile_commands.entries:
+            src_file = CompileCommands.get_file(entry)
+            if not src_file.startswith(package_path + os.sep) or src_file in src:
+                continue
+            src.append(src_file)
+            for include_dir in CompileCommands.get_include_dirs(entry):
+                if include_dir not in include_dirs:
+                    include_dirs.append(include_dir)
+
+        if exceptions:
+            src = exceptions.filter_file_exceptions_early(package, src)
+
+        if not src:
+            logging.info("  No package sources in %s.", filename)
+            return
+
+        self.find_files(package)
+        include_path = os.path.join(package_path, "include") + os.sep
+        headers: list[str] = sorted(
+            file_dict["path"]
+            for file_dict in package.files.values()
+            if file_dict["path"].startswith(include_path)
+            and file_dict["name"].endswith(self.HEADER_EXTENSIONS)
+        )
+
+        target: dict[str, Any] = {
+            "name": package.name,
+            "src_dir": package_path,
+            "include_dirs": include_dirs,
+            "src": src,
+        }
+        package["compile_commands"] = filename
+        package["make_targets"] = [target]
+        package["headers"] = headers
+        package["src_dir"] = package_path
+        package["bin_dir"] = os.path.dirname(filename)
+        package["cpplint"] = "cpplint"
+
+        logging.info("  Found compilation database %s.", filename)
+        logging.info("  %d source files found.", len(src))
+
+    def find_compile_commands(self, package: Package) -> Optional[str]:
+        """Find the compilation database for a package.
+
+        Args:
+            package: The package to find the compilation database for.
+
+        Returns:
+            Path to the compilation database, or None if there is none.
+        """
+        assert self.plugin_context is not None
+        candidates: list[str] = []
+        if (
+            "compile_commands" in self.plugin_context.args
+            and self.plugin_context.args.compile_commands
+        ):
+            path = os.path.abspath(self.plugin_context.args.compile_commands)
+            if os.path.isfile(path):
+                candidates.append(path)
+            candidates += [
+                os.path.join(path, package.name, self.FILENAME),
+                os.path.join(path, self.FILENAME),
+            ]
+        if (
+            "compile_commands_search" in self.plugin_context.args
+            and self.plugin_context.args.compile_commands_search
+        ):
+            package_path = os.path.abspath(package.path)
+            candidates += [
+                os.path.join(package_path, self.FILENAME),
+                os.path.join(package_path, "build", self.FILENAME),
+            ]
+            candidates += sorted(
+                glob.glob(os.path.join(package_path, "build", "*", self.FILENAME))
+            )
+            candidates += sorted(
+                glob.glob(os.path.join(package_path, "cmake-build-*", self.FILENAME))
+            )
+            # Workspace layouts, where the package is in <workspace>/src.
+            for build in ["build", "build_isolated"]:
+                candidates.append(
+                    os.path.join(
+                        os.path.dirname(os.path.dirname(package_path)),
+                        build,
+                        package.name,
+                        self.FILENAME,
+                    )
+                )
+        for candidate in candidates:
+            if os.path.isfile(candidate):
+                return candidate
+        return None
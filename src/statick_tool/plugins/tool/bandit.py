@@ -74,6 +74,8 @@ class BanditToolPlugin(ToolPlugin):
         bandit_bin = self.get_binary()
 
         flags: list[str] = ["--format=csv"]
+        if self.use_structured_output():
+            flags = ["--format=json"]
         flags += user_flags
 
         try:
@@ -95,6 +97,8 @@ class BanditToolPlugin(ToolPlugin):
             return None
 
         logging.debug("%s", output)
+        if self.use_structured_output():
+            return [output]
         return output.splitlines()
 
     def parse_output(
@@ -109,6 +113,9 @@ class BanditToolPlugin(ToolPlugin):
         Returns:
             List of issues found.
         """
+        if self.use_structured_output():
+            return self.parse_json_output(total_output)
+
         issues: list[Issue] = []
 
         # Copy output for modification
@@ -142,3 +149,32 @@ class BanditToolPlugin(ToolPlugin):
             )
 
         return issues
+
+    def parse_json_output(self, total_output: list[str]) -> list[Issue]:
+        """Parse bandit JSON output and report issues.
+
+        Args:
+            total_output: List of output strings.
+
+        Returns:
+            List of issues found.
+        """
+        issues: list[Issue] = []
+        confidence_severity = {"MEDIUM": 3, "HIGH": 5}
+        for output in total_output:
+            for report in self.iter_json(output):
+                if not isinstance(report, dict):
+                    continue
+                for result in report.get("results", []):
+                    issues.append(
+                        Issue(
+                            result["filename"],
+                            int(result["line_number"]),
+                            self.get_name(),
+                            result["test_id"],
+                            confidence_severity.get(result["issue_confidence"], 1),
+                            result["issue_text"],
+                            None,
+                        )
+                    )
+        return issues
@@ -30,6 +30,14 @@ class CatkinLintToolPlugin(ToolPlugin):
         """
         return ["catkin"]
 
+    def supports_file_subset(self) -> bool:
+        """Check if the tool can scan only some of the files of a package.
+
+        Returns:
+            False, since the whole package is linted.
+        """
+        return False
+
     def process_files(
         self, package: Package, level: str, files: list[str], user_flags: list[str]
     ) -> Optional[list[str]]:
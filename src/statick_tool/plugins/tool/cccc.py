@@ -10,18 +10,23 @@ browser.
 
 import argparse
 import csv
+import hashlib
+import json
 import logging
+import os
 import subprocess
+import tempfile
+import xml.etree.ElementTree as etree
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Optional
-
-import xmltodict
-import yaml
+from typing import Any, Optional, Tuple
 
 from statick_tool.issue import Issue
 from statick_tool.package import Package
 from statick_tool.tool_plugin import ToolPlugin
 
+SUMMARY_SECTIONS = ("structural_summary", "procedural_summary", "oo_design")
+
 
 class CCCCToolPlugin(ToolPlugin):
     """Apply CCCC tool and gather results."""
@@ -34,6 +39,14 @@ class CCCCToolPlugin(ToolPlugin):
         """
         return "cccc"
 
+    def get_input_file_types(self) -> list[str]:
+        """Return the file types the tool depends on.
+
+        Returns:
+            C/C++ files.
+        """
+        return ["c_src"]
+
     def gather_args(self, args: argparse.Namespace) -> None:
         """Gather arguments.
 
@@ -46,6 +59,13 @@ class CCCCToolPlugin(ToolPlugin):
         args.add_argument(
             "--cccc-config", dest="cccc_config", type=str, help="cccc config file"
         )
+        args.add_argument(
+            "--cccc-parallel",
+            dest="cccc_parallel",
+            action="store_true",
+            help="Run cccc on up to --max-procs files at a time. Each file still gets "
+            "its own cccc run and output directory",
+        )
 
     def get_binary(  # pylint: disable=unused-argument
         self, level: Optional[str] = None, package: Optional[Package] = None
@@ -77,11 +97,14 @@ class CCCCToolPlugin(ToolPlugin):
         """
         return self.get_version_from_apt()
 
-    def scan(  # pylint: disable=too-many-branches,too-many-locals
+    def scan(  # pylint: disable=too-many-locals
         self, package: Package, level: str
     ) -> Optional[list[Issue]]:
         """Run tool and gather output.
 
+        Each file is analyzed by a separate cccc run writing to its own output
+        directory, so runs can be done in parallel.
+
         Args:
             package: The package to scan.
             level: The level of the scan.
@@ -107,122 +130,271 @@ class CCCCToolPlugin(ToolPlugin):
             return []
         opts.append(" --lang=c++")
 
-        issues: list[Issue] = []
-
-        for src in package["c_src"]:
-            tool_output_dir: str = ".cccc-" + Path(src).name
-            opts.append("--outdir=" + tool_output_dir)
+        config = self.parse_config(config_file)
+        cache_dir = self.get_cache_dir("metrics")
+        cache_salt = None
+        if cache_dir is not None:
+            cache_salt = self.get_cache_salt(opts, config_file)
 
-            try:
-                subproc_args: list[str] = [cccc_bin] + opts + [src]
-                logging.debug(" ".join(subproc_args))
-                log_output: bytes = subprocess.check_output(
-                    subproc_args, stderr=subprocess.STDOUT
+        num_jobs = 1
+        if (
+            "cccc_parallel" in self.plugin_context.args
+            and self.plugin_context.args.cccc_parallel
+        ):
+            num_jobs = self.get_num_jobs()
+        srcs: list[str] = package["c_src"]
+        with ThreadPoolExecutor(max_workers=num_jobs) as executor:
+            results = list(
+                executor.map(
+                    lambda src, outdir: self.analyze_file(
+                        cccc_bin, opts, src, outdir, config, cache_dir, cache_salt
+                    ),
+                    srcs,
+                    self.get_output_dirs(srcs),
                 )
-            except subprocess.CalledProcessError as ex:
-                if ex.returncode == 1:
-                    log_output = ex.output
-                else:
-                    logging.warning("Problem %d", ex.returncode)
-                    logging.warning("%s exception: %s", self.get_name(), ex.output)
-                    return None
-
-            except OSError as ex:
-                logging.warning("Couldn't find cccc executable! (%s)", ex)
+            )
+
+        issues: list[Issue] = []
+        total_output = b""
+        for src, (log_output, metrics) in zip(srcs, results):
+            if log_output is None:
                 return None
+            total_output += log_output
+            if metrics is not None:
+                issues.extend(self.find_issues(config, metrics, src))
+
+        if self.plugin_context and self.plugin_context.args.output_directory:
+            with open(self.get_name() + ".log", "ab") as flog:
+                flog.write(total_output)
+
+        return issues
 
-            logging.debug("%s", log_output)
+    @classmethod
+    def get_output_dirs(cls, srcs: list[str]) -> list[str]:
+        """Get a separate output directory for each file.
 
-            if self.plugin_context and self.plugin_context.args.output_directory:
-                with open(self.get_name() + ".log", "ab") as flog:
-                    flog.write(log_output)
+        Args:
+            srcs: The files to analyze.
 
-            try:
-                with open(tool_output_dir + "/cccc.xml", encoding="utf8") as fresults:
-                    tool_output = xmltodict.parse(
-                        fresults.read(), dict_constructor=dict
-                    )
-            except FileNotFoundError:
-                continue
+        Returns:
+            An output directory for each file, named after the file.
+        """
+        outdirs: list[str] = []
+        for src in srcs:
+            outdir = ".cccc-" + Path(src).name
+            if outdir in outdirs:
+                outdir += f"-{len(outdirs)}"
+            outdirs.append(outdir)
+        return outdirs
+
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    def analyze_file(
+        self,
+        cccc_bin: str,
+        opts: list[str],
+        src: str,
+        outdir: str,
+        config: dict[Any, Any],
+        cache_dir: Optional[str],
+        cache_salt: Optional[str],
+    ) -> Tuple[Optional[bytes], Optional[dict[str, Any]]]:
+        """Get the metrics of the modules in a single file.
+
+        If caching is enabled the metrics are looked up by a hash of the file, so cccc
+        is only run if the file, the cccc options, the configuration or the cccc
+        version have changed.
 
-            issues.extend(self.parse_tool_output(tool_output, src, config_file))
-        return issues
+        Args:
+            cccc_bin: The cccc binary to run.
+            opts: Options to pass to cccc.
+            src: The file to analyze.
+            outdir: Directory cccc writes its reports to.
+            config: The parsed configuration, with the metrics to extract.
+            cache_dir: Directory holding cached metrics, None to disable caching.
+            cache_salt: Hash of the cccc version, options and configuration.
 
-    def parse_tool_output(  # pylint: disable=too-many-branches
-        self, output: dict[Any, Any], src: str, config_file: str
-    ) -> list[Issue]:
-        """Parse tool output and report issues.
+        Returns:
+            The output of cccc, or None if it failed, and the metrics for each module,
+            or None if there are none.
+        """
+        cache_file = None
+        if cache_dir is not None and cache_salt is not None:
+            key = self.get_cache_key(src, cache_salt)
+            if key is not None:
+                cache_file = os.path.join(cache_dir, key[:2], key + ".json")
+                cached = self.read_cache(cache_file)
+                if cached is not None:
+                    logging.debug("Using cached cccc metrics for %s", src)
+                    return b"", cached
+
+        try:
+            subproc_args: list[str] = [cccc_bin] + opts + ["--outdir=" + outdir, src]
+            logging.debug(" ".join(subproc_args))
+            log_output: bytes = subprocess.check_output(
+                subproc_args, stderr=subprocess.STDOUT
+            )
+        except subprocess.CalledProcessError as ex:
+            if ex.returncode == 1:
+                log_output = ex.output
+            else:
+                logging.warning("Problem %d", ex.returncode)
+                logging.warning("%s exception: %s", self.get_name(), ex.output)
+                return None, None
+
+        except OSError as ex:
+            logging.warning("Couldn't find cccc executable! (%s)", ex)
+            return None, None
+
+        logging.debug("%s", log_output)
+
+        metrics = self.parse_xml_file(os.path.join(outdir, "cccc.xml"), config)
+        if metrics is not None and cache_file is not None:
+            self.write_cache(cache_file, metrics)
+        return log_output, metrics
+
+    # pylint: enable=too-many-arguments, too-many-positional-arguments
+
+    def get_cache_salt(self, opts: list[str], config_file: str) -> str:
+        """Hash the inputs shared by all files of a scan.
 
         Args:
-            output: The output from the tool.
-            src: The source file being scanned.
+            opts: Options to pass to cccc.
             config_file: The configuration file.
 
         Returns:
-            A list of issues found by the tool.
+            Hash of the cccc version, options and configuration.
         """
-        if "CCCC_Project" not in output:
-            return []
+        digest = hashlib.sha256()
+        digest.update(self.get_cached_version().encode("utf8"))
+        digest.update("\0".join(opts).encode("utf8"))
+        try:
+            with open(config_file, "rb") as fid:
+                digest.update(fid.read())
+        except OSError:
+            pass
+        return digest.hexdigest()
 
-        config = self.parse_config(config_file)
-        logging.debug(config)
+    @classmethod
+    def get_cache_key(cls, src: str, cache_salt: str) -> Optional[str]:
+        """Hash everything the metrics for a file depend on.
 
-        results: dict[Any, Any] = {}
-        logging.debug(yaml.dump(output))
-        if (
-            "structural_summary" in output["CCCC_Project"]
-            and output["CCCC_Project"]["structural_summary"]
-            and "module" in output["CCCC_Project"]["structural_summary"]
-        ):
-            for module in output["CCCC_Project"]["structural_summary"]["module"]:
-                if "name" not in module or isinstance(module, str):
-                    break
-                metrics: dict[Any, Any] = {}
-                for field in module:
-                    metrics[field] = {}
-                    if "@value" in module[field]:
-                        metrics[field]["value"] = module[field]["@value"]
-                    if "@level" in module[field]:
-                        metrics[field]["level"] = module[field]["@level"]
-                results[module["name"]] = metrics
+        Args:
+            src: The file to analyze.
+            cache_salt: Hash of the cccc version, options and configuration.
 
-        if (
-            "procedural_summary" in output["CCCC_Project"]
-            and output["CCCC_Project"]["procedural_summary"]
-            and "module" in output["CCCC_Project"]["procedural_summary"]
-        ):
-            for module in output["CCCC_Project"]["procedural_summary"]["module"]:
-                if "name" not in module or isinstance(module, str):
-                    break
-                metrics = results[module["name"]]
-                for field in module:
-                    metrics[field] = {}
-                    if "@value" in module[field]:
-                        metrics[field]["value"] = module[field]["@value"]
-                    if "@level" in module[field]:
-                        metrics[field]["level"] = module[field]["@level"]
-                results[module["name"]] = metrics
+        Returns:
+            Cache key for the file, or None if it can't be read.
+        """
+        digest = hashlib.sha256(cache_salt.encode("utf8"))
+        try:
+            with open(src, "rb") as fid:
+                digest.update(fid.read())
+        except OSError:
+            return None
+        return digest.hexdigest()
 
-        if (
-            "oo_design" in output["CCCC_Project"]
-            and output["CCCC_Project"]["oo_design"]
-            and "module" in output["CCCC_Project"]["oo_design"]
-        ):
-            for module in output["CCCC_Project"]["oo_design"]["module"]:
-                if "name" not in module or isinstance(module, str):
-                    break
-                metrics = results[module["name"]]
-                for field in module:
-                    metrics[field] = {}
-                    if "@value" in module[field]:
-                        metrics[field]["value"] = module[field]["@value"]
-                    if "@level" in module[field]:
-                        metrics[field]["level"] = module[field]["@level"]
-                results[module["name"]] = metrics
-
-        issues: list[Issue] = self.find_issues(config, results, src)
+    @staticmethod
+    def read_cache(cache_file: str) -> Optional[dict[str, Any]]:
+        """Read cached metrics for a file.
 
-        return issues
+        Args:
+            cache_file: Path to the cached metrics.
+
+        Returns:
+            The cached metrics, or None if there are no valid cached metrics.
+        """
+        try:
+            with open(cache_file, encoding="utf8") as fid:
+                metrics = json.load(fid)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(metrics, dict):
+            return None
+        return metrics
+
+    @staticmethod
+    def write_cache(cache_file: str, metrics: dict[str, Any]) -> None:
+        """Write metrics for a file to the cache.
+
+        Args:
+            cache_file: Path to the cached metrics.
+            metrics: Metrics for each module in the file.
+        """
+        try:
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                "w", encoding="utf8", dir=os.path.dirname(cache_file), delete=False
+            ) as fid:
+                json.dump(metrics, fid)
+            os.replace(fid.name, cache_file)
+        except OSError as ex:
+            logging.warning("Unable to write cccc cache %s: %s", cache_file, ex)
+
+    @classmethod
+    def parse_xml_file(
+        cls, xml_file: str, config: dict[Any, Any]
+    ) -> Optional[dict[str, Any]]:
+        """Read the metrics of each module from a cccc report.
+
+        The report is read one element at a time and elements are dropped once they
+        are handled. Only metrics with thresholds in the configuration are kept.
+
+        Args:
+            xml_file: The cccc.xml report.
+            config: The parsed configuration.
+
+        Returns:
+            The metrics for each module, or None if there is no report.
+        """
+        results: dict[str, Any] = {}
+        root: Optional[etree.Element] = None
+        section: Optional[str] = None
+        depth = 0
+        try:
+            for event, elem in etree.iterparse(xml_file, events=("start", "end")):
+                if event == "start":
+                    if root is None:
+                        root = elem
+                    elif elem.tag in SUMMARY_SECTIONS and depth == 1:
+                        section = elem.tag
+                    depth += 1
+                    continue
+                depth -= 1
+                if elem.tag == "module" and section is not None:
+                    name = elem.findtext("name")
+                    if name:
+                        results.setdefault(name, {}).update(
+                            cls.get_module_metrics(elem, config)
+                        )
+                    elem.clear()
+                if depth == 1 and root is not None:
+                    section = None
+                    root.clear()
+        except FileNotFoundError:
+            return None
+        except (OSError, etree.ParseError) as ex:
+            logging.warning("Couldn't parse %s! (%s)", xml_file, ex)
+            return None
+        return results
+
+    @classmethod
+    def get_module_metrics(
+        cls, module: etree.Element, config: dict[Any, Any]
+    ) -> dict[str, Any]:
+        """Get the metrics of a module that have thresholds in the configuration.
+
+        Args:
+            module: A module element of a cccc report.
+            config: The parsed configuration.
+
+        Returns:
+            The value and level of each metric.
+        """
+        metrics: dict[str, Any] = {}
+        for field in module:
+            if "value" in field.attrib and cls.convert_name_to_id(field.tag) in config:
+                metrics[field.tag] = dict(field.attrib)
+        return metrics
 
     @classmethod
     def parse_config(cls, config_file: str) -> dict[str, str]:
@@ -6,8 +6,9 @@ import logging
 import os
 import re
 import subprocess
-from typing import Match, Optional, Pattern
+from typing import Match, Optional, Pattern, Tuple
 
+from statick_tool import version_cache
 from statick_tool.issue import Issue
 from statick_tool.package import Package
 from statick_tool.plugins.tool.clang_format_parser import ClangFormatXMLParser
@@ -25,6 +26,14 @@ class ClangFormatToolPlugin(ToolPlugin):
         """
         return "clang-format"
 
+    def get_file_types(self) -> list[str]:
+        """Return a list of file types the plugin can scan.
+
+        Returns:
+            List of file types.
+        """
+        return ["c_src"]
+
     def gather_args(self, args: argparse.Namespace) -> None:
         """Gather arguments.
 
@@ -88,6 +97,30 @@ class ClangFormatToolPlugin(ToolPlugin):
 
         return binary
 
+    def is_available(self, level: Optional[str] = None) -> bool:
+        """Check if the tool is installed.
+
+        The configuration files are compared here as well. Statick checks tools before
+        workspace packages are scanned in worker processes, so every package reuses
+        the result instead of comparing the files again.
+
+        Args:
+            level: Level at which to run tool.
+
+        Returns:
+            True if the tool can be run, False otherwise.
+        """
+        if not super().is_available(level):
+            return False
+        config_files = self.get_configuration_files()
+        if config_files is not None:
+            try:
+                self.configuration_differs(*config_files)
+            except (IOError, OSError):
+                # Reported when each package is scanned.
+                pass
+        return True
+
     def scan(  # pylint: disable=too-many-return-statements, too-many-branches
         self, package: Package, level: str
     ) -> Optional[
@@ -113,6 +146,9 @@ class ClangFormatToolPlugin(ToolPlugin):
                 files += target["src"]
         if "headers" in package:
             files += package["headers"]
+        files = self.get_file_subset(package, files)
+        if not files:
+            return []
 
         check: Optional[bool] = self.check_configuration(clang_format_bin)
         if check is None:
@@ -184,42 +220,20 @@ class ClangFormatToolPlugin(ToolPlugin):
         if self.plugin_context is None:
             return False
 
-        default_file_name = "_clang-format"
-        format_file_name = self.plugin_context.resources.get_file(default_file_name)
-        if not os.path.isfile(os.path.expanduser("~/" + default_file_name)):
-            default_file_name = ".clang-format"
+        config_files = self.get_configuration_files()
+        if config_files is None:
+            return False
+        format_file_name = config_files[1]
         exc_msg = (
             "_clang-format or .clang-format style is not correct. "
             f"There is one located in {format_file_name}. "
             "Put this file in your home directory."
         )
         try:
-            with (
-                open(
-                    os.path.expanduser("~/" + default_file_name), "r", encoding="utf8"
-                ) as home_format_file,
-                open(
-                    format_file_name, "r", encoding="utf8"  # type: ignore
-                ) as format_file,
-            ):
-                actual_format = home_format_file.read()
-                target_format = format_file.read()
-            diff = difflib.context_diff(
-                actual_format.splitlines(), target_format.splitlines()
-            )
-            for line in diff:
-                if (
-                    line.startswith("+ ")
-                    or line.startswith("- ")
-                    or line.startswith("! ")
-                ) and len(line) > 2:
-                    if line[2:].strip() and line[2:].strip()[0] != "#":
-                        exc = subprocess.CalledProcessError(
-                            -1, clang_format_bin, exc_msg
-                        )
-                        if self.plugin_context.args.clang_format_raise_exception:
-                            raise exc
-
+            if self.configuration_differs(*config_files):
+                exc = subprocess.CalledProcessError(-1, clang_format_bin, exc_msg)
+                if self.plugin_context.args.clang_format_raise_exception:
+                    raise exc
         except (IOError, OSError) as ex:
             logging.warning("%s", exc_msg)
             logging.warning("%s exception: %s", self.get_name(), ex.strerror)
@@ -234,6 +248,77 @@ class ClangFormatToolPlugin(ToolPlugin):
 
         return True
 
+    def get_configuration_files(self) -> Optional[Tuple[str, str]]:
+        """Find the configuration files to compare.
+
+        Returns:
+            The user's configuration file in the home directory and the reference
+            configuration file from the resources, or None without a plugin context.
+        """
+        if self.plugin_context is None:
+            return None
+        default_file_name = "_clang-format"
+        format_file_name = self.plugin_context.resources.get_file(default_file_name)
+        if not os.path.isfile(os.path.expanduser("~/" + default_file_name)):
+            default_file_name = ".clang-format"
+        return (
+            os.path.expanduser("~/" + default_file_name),
+            format_file_name,  # type: ignore
+        )
+
+    @classmethod
+    def configuration_differs(cls, actual_file: str, target_file: str) -> bool:
+        """Check if a configuration file has different settings than the reference.
+
+        The comparison is done once per run for each version of the files, since the
+        same configuration is checked for every package scanned.
+
+        Args:
+            actual_file: The user's configuration file.
+            target_file: The reference configuration file.
+
+        Returns:
+            True if any setting differs, False otherwise.
+        """
+        key = (
+            "clang-format-config",
+            actual_file,
+            str(os.stat(actual_file).st_mtime_ns),
+            target_file,
+            str(os.stat(target_file).st_mtime_ns),
+        )
+        return version_cache.memoize(
+            key, lambda: cls.diff_configuration(actual_file, target_file)
+        )
+
+    @classmethod
+    def diff_configuration(cls, actual_file: str, target_file: str) -> bool:
+        """Compare the settings in two configuration files.
+
+        Args:
+            actual_file: The user's configuration file.
+            target_file: The reference configuration file.
+
+        Returns:
+            True if any setting differs, False otherwise.
+        """
+        with (
+            open(actual_file, "r", encoding="utf8") as home_format_file,
+            open(target_file, "r", encoding="utf8") as format_file,
+        ):
+            actual_format = home_format_file.read()
+            target_format = format_file.read()
+        diff = difflib.context_diff(
+            actual_format.splitlines(), target_format.splitlines()
+        )
+        for line in diff:
+            if (
+                line.startswith("+ ") or line.startswith("- ") or line.startswith("! ")
+            ) and len(line) > 2:
+                if line[2:].strip() and line[2:].strip()[0] != "#":
+                    return True
+        return False
+
     def parse_tool_output(  # pylint: disable=too-many-locals
         self, total_output: list[str], files: list[str]
     ) -> list[Issue]:
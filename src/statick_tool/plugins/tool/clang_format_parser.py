@@ -19,10 +19,14 @@
 # Original code from ament_lint.
 # https://github.com/ament/ament_lint/blob/master/ament_clang_format/ament_clang_format/main.py
 
+import bisect
 import logging
-from typing import Any
+import re
+from typing import Any, Optional
 from xml.etree import ElementTree
 
+LINE_BREAK_RE = re.compile(r"[\r\n]")
+
 
 class ClangFormatXMLParser:
     """Parse XML output from the clang-format tool."""
@@ -39,6 +43,7 @@ class ClangFormatXMLParser:
         """
         report: list[dict[Any, Any]] = []
         xmls = output.split("<?xml version='1.0'?>")[1:]
+        content: Optional[str] = None
         for xml in xmls:
             try:
                 root = ElementTree.fromstring(xml)
@@ -48,10 +53,11 @@ class ClangFormatXMLParser:
 
             replacements = root.findall("replacement")
 
-            with open(filename, "r", encoding="utf8") as fid:
-                content = fid.read()
+            if content is None:
+                with open(filename, "r", encoding="utf8") as fid:
+                    content = fid.read()
 
-            return self.generate_report(content, replacements)
+            report += self.generate_report(content, replacements)
 
         return report
 
@@ -68,6 +74,7 @@ class ClangFormatXMLParser:
             A list of dictionaries containing the report data.
         """
         report: list[dict[Any, Any]] = []
+        line_starts = self.get_line_starts(content)
         for replacement in replacements:
             offset = int(replacement.get("offset", 0))
             length = int(replacement.get("length", 0))
@@ -80,9 +87,10 @@ class ClangFormatXMLParser:
             # to-be-replaced snippet
             original = content[offset : offset + length]
             # map global offset to line number and offset in line
-            index_of_line_start = self.find_index_of_line_start(content, offset)
+            line_no = self.get_line_number(content, offset, line_starts)
+            index_of_line_start = line_starts[line_no - 2] if line_no > 1 else 0
             index_of_line_end = self.find_index_of_line_end(content, offset + length)
-            data["line_no"] = self.get_line_number(content, index_of_line_start)
+            data["line_no"] = line_no
             offset_in_line = offset - index_of_line_start
 
             # generate diff like changes
@@ -152,14 +160,32 @@ class ClangFormatXMLParser:
         return min(index_1, index_2)
 
     @classmethod
-    def get_line_number(cls, data: str, offset: int) -> int:
+    def get_line_starts(cls, data: str) -> list[int]:
+        """Find where each line after the first starts.
+
+        Args:
+            data: The content of the file being scanned.
+
+        Returns:
+            The index after each line break, in order.
+        """
+        return [match.end() for match in LINE_BREAK_RE.finditer(data)]
+
+    @classmethod
+    def get_line_number(
+        cls, data: str, offset: int, line_starts: Optional[list[int]] = None
+    ) -> int:
         """Get line number where violation occurs.
 
         Args:
             data: The content of the file being scanned.
             offset: The offset in the file.
+            line_starts: Line starts of the content from get_line_starts, to avoid
+                finding them again for every offset in the same file.
 
         Returns:
             The line number.
         """
-        return data[0:offset].count("\n") + data[0:offset].count("\r") + 1
+        if line_starts is None:
+            line_starts = cls.get_line_starts(data)
+        return bisect.bisect_right(line_starts, offset) + 1
@@ -1,17 +1,27 @@
 """Apply clang-tidy tool and gather results."""
 
 import argparse
+import bisect
+import hashlib
+import json
 import logging
+import multiprocessing
+import os
 import re
 import subprocess
-from typing import Match, Optional, Pattern
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterable, Iterator, Match, Optional, Pattern, Tuple
 
+import yaml
+
+from statick_tool.compile_commands import CompileCommands
 from statick_tool.issue import Issue
 from statick_tool.package import Package
 from statick_tool.tool_plugin import ToolPlugin
 
 
-class ClangTidyToolPlugin(ToolPlugin):
+class ClangTidyToolPlugin(ToolPlugin):  # pylint: disable=too-many-public-methods
     """Apply clang-tidy tool and gather results."""
 
     def get_name(self) -> str:
@@ -22,6 +32,14 @@ class ClangTidyToolPlugin(ToolPlugin):
         """
         return "clang-tidy"
 
+    def get_input_file_types(self) -> list[str]:
+        """Return the file types the tool depends on.
+
+        Returns:
+            C/C++ files and CMake files, which the build targets come from.
+        """
+        return ["c_src", "cmake_src"]
+
     @classmethod
     def get_tool_dependencies(cls) -> list[str]:
         """Get a list of tools that must run before this one.
@@ -43,7 +61,45 @@ class ClangTidyToolPlugin(ToolPlugin):
             type=str,
             help="clang-tidy binary path",
         )
+        args.add_argument(
+            "--clang-tidy-parallel",
+            dest="clang_tidy_parallel",
+            action="store_true",
+            help="Run clang-tidy on each translation unit in parallel",
+        )
 
+    def get_binary(
+        self, level: Optional[str] = None, package: Optional[Package] = None
+    ) -> str:
+        """Return the name of the tool binary.
+
+        Args:
+            level: The level of the scan.
+            package: The package to scan.
+
+        Returns:
+            The name of the tool binary.
+        """
+        user_version = None
+        if level is not None and self.plugin_context:
+            user_version = self.plugin_context.config.get_tool_config(
+                self.get_name(), level, "version"
+            )
+
+        binary = self.get_name()
+        if user_version is not None:
+            binary = f"{binary}-{user_version}"
+
+        # If the user explicitly specifies a binary, let that override the user_version
+        if (
+            self.plugin_context
+            and "clang_tidy_bin" in self.plugin_context.args
+            and self.plugin_context.args.clang_tidy_bin is not None
+        ):
+            binary = self.plugin_context.args.clang_tidy_bin
+        return binary
+
+    # pylint: disable=too-many-branches, too-many-return-statements
     def scan(self, package: Package, level: str) -> Optional[list[Issue]]:
         """Run tool and gather output.
 
@@ -64,18 +120,7 @@ class ClangTidyToolPlugin(ToolPlugin):
         if self.plugin_context is None:
             return []
 
-        clang_tidy_bin = self.get_binary()
-
-        user_version = self.plugin_context.config.get_tool_config(
-            self.get_name(), level, "version"
-        )
-
-        if user_version is not None:
-            clang_tidy_bin = f"{clang_tidy_bin}-{user_version}"
-
-        # If the user explicitly specifies a binary, let that override the user_version
-        if self.plugin_context.args.clang_tidy_bin is not None:
-            clang_tidy_bin = self.plugin_context.args.clang_tidy_bin
+        clang_tidy_bin = self.get_binary(level=level)
 
         flags: list[str] = [
             "-header-filter=" + package["src_dir"] + "/.*",
@@ -90,6 +135,15 @@ class ClangTidyToolPlugin(ToolPlugin):
             for target in package["make_targets"]:
                 files += target["src"]
 
+        if (
+            "clang_tidy_parallel" in self.plugin_context.args
+            and self.plugin_context.args.clang_tidy_parallel
+        ):
+            return self.scan_parallel(package, clang_tidy_bin, flags, files)
+
+        if self.use_stream_output():
+            return self.scan_streaming([clang_tidy_bin] + flags + files)
+
         try:
             output = subprocess.check_output(
                 [clang_tidy_bin] + flags + files,
@@ -120,6 +174,408 @@ class ClangTidyToolPlugin(ToolPlugin):
         issues: list[Issue] = self.parse_tool_output(output)
         return issues
 
+    # pylint: enable=too-many-branches, too-many-return-statements
+
+    def scan_streaming(self, subproc_args: list[str]) -> Optional[list[Issue]]:
+        """Run clang-tidy and parse its output as it is produced.
+
+        Args:
+            subproc_args: The clang-tidy command line.
+
+        Returns:
+            A list of issues found by the tool.
+        """
+        error_lines: list[str] = []
+
+        def find_errors(lines: Iterable[str]) -> Iterator[str]:
+            for line in lines:
+                if "clang-diagnostic-error" in line:
+                    error_lines.append(line)
+                yield line
+
+        issues: list[Issue] = []
+        try:
+            for issue in self.parse_tool_lines(
+                find_errors(self.stream_output(subproc_args))
+            ):
+                issues.append(issue)
+        except subprocess.CalledProcessError as ex:
+            if ex.returncode != 1:
+                logging.warning("clang-tidy failed! Returncode = %d", ex.returncode)
+                logging.warning("%s exception: %s", self.get_name(), ex.output)
+                return None
+
+        except OSError as ex:
+            logging.warning("Couldn't find %s! (%s)", subproc_args[0], ex)
+            return None
+
+        if error_lines:
+            logging.warning("%s exception: %s", self.get_name(), "\n".join(error_lines))
+            return None
+
+        return issues
+
+    def scan_parallel(  # pylint: disable=too-many-locals
+        self, package: Package, clang_tidy_bin: str, flags: list[str], files: list[str]
+    ) -> Optional[list[Issue]]:
+        """Run clang-tidy on each translation unit in parallel.
+
+        Each translation unit is analyzed by a separate clang-tidy process. Diagnostics
+        are exported as YAML and merged, so that issues in headers included by several
+        translation units are only reported once. Up to --max-procs processes run at a
+        time, or one when scanning a package of a workspace in parallel.
+
+        Args:
+            package: The package to scan.
+            clang_tidy_bin: The clang-tidy binary to run.
+            flags: Flags to pass to clang-tidy.
+            files: Source files to analyze.
+
+        Returns:
+            A list of issues found by the tool.
+        """
+        units: list[str] = []
+        try:
+            compile_commands: Optional[CompileCommands] = CompileCommands(
+                os.path.join(package["bin_dir"], "compile_commands.json")
+            )
+        except (OSError, ValueError) as ex:
+            logging.warning("Unable to read compilation database: %s", ex)
+            compile_commands = None
+        for src in files:
+            src = os.path.abspath(src)
+            if src in units:
+                continue
+            if compile_commands is not None and compile_commands.get_entry(src) is None:
+                logging.debug("Skipping %s, not in compilation database.", src)
+                continue
+            units.append(src)
+
+        cache_dir = self.get_cache_dir()
+        cache_salt = None
+        if cache_dir is not None and compile_commands is not None:
+            cache_salt = self.get_cache_salt(clang_tidy_bin, flags)
+
+        jobs = self.get_num_jobs()
+        # Workspace package workers are daemon processes and already run --max-procs
+        # packages at a time.
+        if multiprocessing.current_process().daemon:
+            jobs = 1
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            results = list(
+                executor.map(
+                    lambda src: self.analyze_unit(
+                        clang_tidy_bin,
+                        flags,
+                        src,
+                        compile_commands,
+                        cache_dir,
+                        cache_salt,
+                    ),
+                    units,
+                )
+            )
+
+        output = ""
+        issues: list[Issue] = []
+        for returncode, unit_output, unit_issues in results:
+            output += unit_output
+            if returncode not in [0, 1]:
+                logging.warning("clang-tidy failed! Returncode = %d", returncode)
+                logging.warning("%s exception: %s", self.get_name(), unit_output)
+                return None
+            if "clang-diagnostic-error" in unit_output:
+                logging.warning("%s exception: %s", self.get_name(), unit_output)
+                return None
+            issues += unit_issues
+
+        logging.debug("%s", output)
+
+        if self.plugin_context and self.plugin_context.args.output_directory:
+            with open(self.get_name() + ".log", "w", encoding="utf8") as fid:
+                fid.write(output)
+
+        # Issues in headers are reported by every translation unit including them.
+        return list(dict.fromkeys(issues))
+
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    def analyze_unit(  # pylint: disable=too-many-locals
+        self,
+        clang_tidy_bin: str,
+        flags: list[str],
+        src: str,
+        compile_commands: Optional[CompileCommands],
+        cache_dir: Optional[str],
+        cache_salt: Optional[str],
+    ) -> Tuple[int, str, list[Issue]]:
+        """Get the issues for a single translation unit.
+
+        If caching is enabled the results are looked up by a hash of the preprocessed
+        translation unit, so clang-tidy is only run if the code it would analyze, the
+        compiler flags, the clang-tidy flags or the clang-tidy version have changed.
+
+        Args:
+            clang_tidy_bin: The clang-tidy binary to run.
+            flags: Flags to pass to clang-tidy.
+            src: Source file to analyze.
+            compile_commands: The compilation database for the package.
+            cache_dir: Directory holding cached results, None to disable caching.
+            cache_salt: Hash of the clang-tidy version and flags.
+
+        Returns:
+            The return code and output of clang-tidy and the issues it found.
+        """
+        cache_file = None
+        if (
+            cache_dir is not None
+            and cache_salt is not None
+            and compile_commands is not None
+        ):
+            entry = compile_commands.get_entry(src)
+            key = None
+            if entry is not None:
+                key = self.get_cache_key(entry, cache_salt)
+            if key is not None:
+                cache_file = os.path.join(cache_dir, key[:2], key + ".json")
+                cached = self.read_cache(cache_file)
+                if cached is not None:
+                    logging.debug("Using cached clang-tidy results for %s", src)
+                    return 0, cached[0], cached[1]
+
+        diagnostics: list[dict[str, Any]] = []
+        with tempfile.TemporaryDirectory() as fixes_dir:
+            fixes_file = os.path.join(fixes_dir, "fixes.yaml")
+            returncode, output = self.run_unit(clang_tidy_bin, flags, src, fixes_file)
+            if os.path.isfile(fixes_file):
+                with open(fixes_file, encoding="utf8") as fid:
+                    diagnostics = self.load_fixes(fid.read())
+        issues = self.parse_fixes(diagnostics)
+
+        if (
+            cache_file is not None
+            and returncode in [0, 1]
+            and "clang-diagnostic-error" not in output
+        ):
+            self.write_cache(cache_file, output, issues)
+
+        return returncode, output, issues
+
+    # pylint: enable=too-many-arguments, too-many-positional-arguments
+
+    def run_unit(
+        self, clang_tidy_bin: str, flags: list[str], src: str, fixes_file: str
+    ) -> Tuple[int, str]:
+        """Run clang-tidy on a single translation unit.
+
+        Args:
+            clang_tidy_bin: The clang-tidy binary to run.
+            flags: Flags to pass to clang-tidy.
+            src: Source file to analyze.
+            fixes_file: File to export diagnostics to.
+
+        Returns:
+            The return code and output of clang-tidy.
+        """
+        try:
+            output = subprocess.check_output(
+                [clang_tidy_bin, "-export-fixes=" + fixes_file] + flags + [src],
+                stderr=subprocess.STDOUT,
+                universal_newlines=True,
+            )
+            return 0, output
+        except subprocess.CalledProcessError as ex:
+            return ex.returncode, ex.output
+        except OSError as ex:
+            logging.warning("Couldn't find %s! (%s)", clang_tidy_bin, ex)
+            return -1, ""
+
+    def get_cache_salt(self, clang_tidy_bin: str, flags: list[str]) -> Optional[str]:
+        """Hash the inputs shared by all translation units of a scan.
+
+        Args:
+            clang_tidy_bin: The clang-tidy binary to run.
+            flags: Flags to pass to clang-tidy.
+
+        Returns:
+            Hash of the clang-tidy version and flags, or None if the version is unknown.
+        """
+        try:
+            version = subprocess.check_output(
+                [clang_tidy_bin, "--version"],
+                stderr=subprocess.STDOUT,
+                universal_newlines=True,
+            )
+        except (subprocess.CalledProcessError, OSError) as ex:
+            logging.warning(
+                "Unable to get %s version, not caching: %s", self.get_name(), ex
+            )
+            return None
+        digest = hashlib.sha256()
+        digest.update(version.encode("utf8"))
+        digest.update("\0".join(flags).encode("utf8"))
+        return digest.hexdigest()
+
+    @classmethod
+    def get_cache_key(cls, entry: dict[str, Any], cache_salt: str) -> Optional[str]:
+        """Hash everything the results for a translation unit depend on.
+
+        Args:
+            entry: Compilation database entry for the translation unit.
+            cache_salt: Hash of the clang-tidy version and flags.
+
+        Returns:
+            Cache key for the translation unit, or None if it can't be preprocessed.
+        """
+        args = CompileCommands.get_arguments(entry)
+        try:
+            preprocessed = subprocess.check_output(
+                cls.get_preprocess_args(args),
+                cwd=entry["directory"],
+                stderr=subprocess.DEVNULL,
+            )
+        except (subprocess.CalledProcessError, OSError) as ex:
+            logging.debug("Unable to preprocess %s: %s", entry["file"], ex)
+            return None
+        digest = hashlib.sha256()
+        digest.update(cache_salt.encode("utf8"))
+        digest.update(CompileCommands.get_file(entry).encode("utf8"))
+        digest.update("\0".join(args).encode("utf8"))
+        digest.update(preprocessed)
+        return digest.hexdigest()
+
+    @staticmethod
+    def get_preprocess_args(args: list[str]) -> list[str]:
+        """Convert a compiler command to one that writes preprocessed output to stdout.
+
+        Args:
+            args: Compiler command from the compilation database.
+
+        Returns:
+            Compiler command to preprocess the translation unit.
+        """
+        return CompileCommands.strip_output_args(args) + ["-E"]
+
+    @staticmethod
+    def read_cache(cache_file: str) -> Optional[Tuple[str, list[Issue]]]:
+        """Read cached results for a translation unit.
+
+        Args:
+            cache_file: Path to the cached results.
+
+        Returns:
+            The cached output and issues, or None if there are no valid cached results.
+        """
+        try:
+            with open(cache_file, encoding="utf8") as fid:
+                data = json.load(fid)
+            return data["output"], [Issue(*issue) for issue in data["issues"]]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    @staticmethod
+    def write_cache(cache_file: str, output: str, issues: list[Issue]) -> None:
+        """Write results for a translation unit to the cache.
+
+        Args:
+            cache_file: Path to the cached results.
+            output: Output from clang-tidy.
+            issues: Issues found by clang-tidy.
+        """
+        try:
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                "w", encoding="utf8", dir=os.path.dirname(cache_file), delete=False
+            ) as fid:
+                json.dump({"output": output, "issues": issues}, fid)
+            os.replace(fid.name, cache_file)
+        except OSError as ex:
+            logging.warning("Unable to write clang-tidy cache %s: %s", cache_file, ex)
+
+    @staticmethod
+    def load_fixes(fixes: str) -> list[dict[str, Any]]:
+        """Load the diagnostics from a clang-tidy export-fixes YAML document.
+
+        Args:
+            fixes: Contents of the export-fixes file.
+
+        Returns:
+            The diagnostics in the document.
+        """
+        loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+        try:
+            data = yaml.load(fixes, Loader=loader)  # nosec
+        except yaml.YAMLError as ex:
+            logging.warning("Unable to parse clang-tidy fixes: %s", ex)
+            return []
+        if not isinstance(data, dict) or not data.get("Diagnostics"):
+            return []
+        return list(data["Diagnostics"])
+
+    def parse_fixes(self, diagnostics: list[dict[str, Any]]) -> list[Issue]:
+        """Convert exported diagnostics to issues.
+
+        Diagnostics are identified by file offset, so each file is read at most once to
+        map offsets to line numbers. Duplicate diagnostics, usually from headers that
+        are included by multiple translation units, are dropped.
+
+        Args:
+            diagnostics: Diagnostics from clang-tidy export-fixes files.
+
+        Returns:
+            A list of issues found by the tool.
+        """
+        warnings_mapping = self.load_mapping()
+        line_starts: dict[str, list[int]] = {}
+        issues: dict[Issue, None] = {}
+        for diagnostic in diagnostics:
+            # Older versions of clang-tidy put the message fields at the top level.
+            message = diagnostic.get("DiagnosticMessage", diagnostic)
+            filename = message.get("FilePath")
+            check = diagnostic.get("DiagnosticName", "")
+            level = str(diagnostic.get("Level", "Warning")).lower()
+            if not filename or level in ["remark", "note"]:
+                continue
+            if self.is_exception(filename, check):
+                continue
+            if filename not in line_starts:
+                line_starts[filename] = self.get_line_starts(filename)
+            line_number = bisect.bisect_right(
+                line_starts[filename], int(message.get("FileOffset", 0))
+            )
+            issue = Issue(
+                filename,
+                line_number,
+                self.get_name(),
+                level + "/" + check,
+                3,
+                message.get("Message", ""),
+                warnings_mapping.get(check),
+            )
+            issues[issue] = None
+        return list(issues)
+
+    @staticmethod
+    def get_line_starts(filename: str) -> list[int]:
+        """Get the byte offset at which each line of a file starts.
+
+        Args:
+            filename: File to index.
+
+        Returns:
+            Offsets of the start of each line, beginning with 0 for the first line.
+        """
+        line_starts = [0]
+        try:
+            with open(filename, "rb") as fid:
+                data = fid.read()
+        except OSError:
+            return line_starts
+        index = data.find(b"\n")
+        while index != -1:
+            line_starts.append(index + 1)
+            index = data.find(b"\n", index + 1)
+        return line_starts
+
     @classmethod
     def check_for_exceptions(cls, match: Match[str]) -> bool:
         """Manual exceptions.
@@ -130,10 +586,23 @@ class ClangTidyToolPlugin(ToolPlugin):
         Returns:
             True if the match is an exception, False otherwise.
         """
+        return cls.is_exception(match.group(1), match.group(6))
+
+    @classmethod
+    def is_exception(cls, filename: str, check: str) -> bool:
+        """Manual exceptions.
+
+        Args:
+            filename: The file the issue was found in.
+            check: The name of the clang-tidy check.
+
+        Returns:
+            True if the issue is an exception, False otherwise.
+        """
         # You are allowed to have 'using namespace' in source files
         if (
-            match.group(1).endswith(".cpp") or match.group(1).endswith(".cc")
-        ) and match.group(6) == "google-build-using-namespace":
+            filename.endswith(".cpp") or filename.endswith(".cc")
+        ) and check == "google-build-using-namespace":
             return True
         return False
 
@@ -146,12 +615,22 @@ class ClangTidyToolPlugin(ToolPlugin):
         Returns:
             A list of issues found by the tool.
         """
+        return list(self.parse_tool_lines(output.splitlines()))
+
+    def parse_tool_lines(self, lines: Iterable[str]) -> Iterator[Issue]:
+        """Parse tool output one line at a time and report issues.
+
+        Args:
+            lines: The lines of output from the tool.
+
+        Yields:
+            Each issue found by the tool.
+        """
         clang_tidy_re = r"(.+):(\d+):(\d+):\s(.+):\s(.+)\s\[(.+)\]"
         parse: Pattern[str] = re.compile(clang_tidy_re)
-        issues: list[Issue] = []
         # Load the plugin mapping if possible
         warnings_mapping = self.load_mapping()
-        for line in output.splitlines():
+        for line in lines:
             match: Optional[Match[str]] = parse.match(line)
             if match and not self.check_for_exceptions(match):
                 if (
@@ -162,15 +641,12 @@ class ClangTidyToolPlugin(ToolPlugin):
                     cert_reference = None
                     if match.group(6) in warnings_mapping:
                         cert_reference = warnings_mapping[match.group(6)]
-                    issues.append(
-                        Issue(
-                            match.group(1),
-                            int(match.group(2)),
-                            self.get_name(),
-                            match.group(4) + "/" + match.group(6),
-                            3,
-                            match.group(5),
-                            cert_reference,
-                        )
+                    yield Issue(
+                        match.group(1),
+                        int(match.group(2)),
+                        self.get_name(),
+                        match.group(4) + "/" + match.group(6),
+                        3,
+                        match.group(5),
+                        cert_reference,
                     )
-        return issues
@@ -5,7 +5,9 @@ import logging
 import os
 import re
 import subprocess
+import tempfile
 from typing import Match, Optional, Pattern
+from xml.etree import ElementTree
 
 from packaging.version import Version
 
@@ -32,6 +34,14 @@ class CppcheckToolPlugin(ToolPlugin):
         """
         return "cppcheck"
 
+    def get_input_file_types(self) -> list[str]:
+        """Return the file types the tool depends on.
+
+        Returns:
+            C/C++ files and CMake files, which the build targets come from.
+        """
+        return ["c_src", "cmake_src"]
+
     def gather_args(self, args: argparse.Namespace) -> None:
         """Gather arguments.
 
@@ -41,6 +51,13 @@ class CppcheckToolPlugin(ToolPlugin):
         args.add_argument(
             "--cppcheck-bin", dest="cppcheck_bin", type=str, help="cppcheck binary path"
         )
+        args.add_argument(
+            "--cppcheck-project",
+            dest="cppcheck_project",
+            action="store_true",
+            help="Run cppcheck on the package files in the compilation database "
+            "instead of a file list",
+        )
 
     def get_binary(  # pylint: disable=unused-argument
         self, level: Optional[str] = None, package: Optional[Package] = None
@@ -129,6 +146,16 @@ class CppcheckToolPlugin(ToolPlugin):
             logging.warning("Cppcheck not found! (%s)", ex)
             return None
 
+        if (
+            "cppcheck_project" in self.plugin_context.args
+            and self.plugin_context.args.cppcheck_project
+            and "bin_dir" in package
+            and os.path.isfile(
+                os.path.join(package["bin_dir"], "compile_commands.json")
+            )
+        ):
+            return self.scan_project(package, level, cppcheck_bin, flags)
+
         files: list[str] = []
         include_dirs: list[str] = []
         if "make_targets" in package:
@@ -150,6 +177,12 @@ class CppcheckToolPlugin(ToolPlugin):
                 include_args.append("-I")
                 include_args.append(include_dir)
 
+        if self.use_structured_output():
+            flags = [flag for flag in flags if not flag.startswith("--template")]
+            return self.run_xml(
+                [cppcheck_bin] + flags + ["--xml"] + include_args + files
+            )
+
         try:
             output = subprocess.check_output(
                 [cppcheck_bin] + flags + include_args + files,
@@ -173,6 +206,126 @@ class CppcheckToolPlugin(ToolPlugin):
 
     # pylint: enable=too-many-locals, too-many-branches, too-many-return-statements
 
+    def scan_project(
+        self, package: Package, level: str, cppcheck_bin: str, flags: list[str]
+    ) -> Optional[list[Issue]]:
+        """Run cppcheck on the compilation database of a package.
+
+        Cppcheck finds the sources, include directories and defines from the
+        compilation database itself and can analyze files in parallel. Only the files
+        in the package are analyzed, since a database can be shared by a workspace. If
+        a cache directory is available then analysis results are kept in a cppcheck
+        build directory, so that unchanged files are skipped on later runs.
+
+        Args:
+            package: The package to scan.
+            level: The level of the scan.
+            cppcheck_bin: The cppcheck binary to run.
+            flags: Flags used when files are passed on the command line, including the
+                level flags.
+
+        Returns:
+            A list of issues found by the tool.
+        """
+        # Results are read from XML, so the text template is not needed.
+        flags = [flag for flag in flags if not flag.startswith("--template")]
+        project_flags: list[str] = [
+            "--project=" + os.path.join(package["bin_dir"], "compile_commands.json"),
+            "--file-filter=" + os.path.join(os.path.abspath(package.path), "*"),
+            "--xml",
+        ]
+        if not any(flag.startswith("-j") for flag in flags):
+            project_flags.append(f"-j{self.get_num_jobs()}")
+        build_dir = self.get_cache_dir(package.name, level)
+        if build_dir is not None:
+            project_flags.append("--cppcheck-build-dir=" + build_dir)
+
+        return self.run_xml([cppcheck_bin] + project_flags + flags)
+
+    def run_xml(self, cppcheck_args: list[str]) -> Optional[list[Issue]]:
+        """Run cppcheck with XML output and parse the results.
+
+        Args:
+            cppcheck_args: Cppcheck command line, including the `--xml` flag.
+
+        Returns:
+            A list of issues found by the tool.
+        """
+        with tempfile.TemporaryDirectory() as output_dir:
+            xml_file = os.path.join(output_dir, "cppcheck.xml")
+            try:
+                output = subprocess.check_output(
+                    cppcheck_args + ["--output-file=" + xml_file],
+                    stderr=subprocess.STDOUT,
+                    universal_newlines=True,
+                )
+            except subprocess.CalledProcessError as ex:
+                logging.warning("cppcheck failed! Returncode = %d", ex.returncode)
+                logging.warning("%s exception: %s", self.get_name(), ex.output)
+                return None
+            except OSError as ex:
+                logging.warning("Cppcheck not found! (%s)", ex)
+                return None
+
+            logging.debug("%s", output)
+
+            if not os.path.isfile(xml_file):
+                logging.warning("cppcheck did not write any results.")
+                return None
+
+            if self.plugin_context and self.plugin_context.args.output_directory:
+                with open(self.get_name() + ".log", "w", encoding="utf8") as fid:
+                    fid.write(output)
+                    with open(xml_file, encoding="utf8") as xml_fid:
+                        for line in xml_fid:
+                            fid.write(line)
+
+            return self.parse_xml_output(xml_file)
+
+    def parse_xml_output(self, xml_file: str) -> Optional[list[Issue]]:
+        """Parse cppcheck XML results and report issues.
+
+        The results are parsed incrementally so that large reports do not have to be
+        held in memory.
+
+        Args:
+            xml_file: Path to the cppcheck XML results.
+
+        Returns:
+            A list of issues found by the tool.
+        """
+        issues: list[Issue] = []
+        warnings_mapping = self.load_mapping()
+        try:
+            for _, element in ElementTree.iterparse(xml_file):  # nosec
+                if element.tag != "error":
+                    continue
+                check = element.get("id", "")
+                severity = element.get("severity", "")
+                location = element.find("location")
+                if location is not None and severity != "information":
+                    filename = location.get("file", "")
+                    dummy, extension = os.path.splitext(filename)
+                    if extension in self.valid_extensions and not self.is_exception(
+                        filename, check
+                    ):
+                        issues.append(
+                            Issue(
+                                filename,
+                                int(location.get("line", "0")),
+                                self.get_name(),
+                                severity + "/" + check,
+                                5,
+                                element.get("msg", ""),
+                                warnings_mapping.get(check),
+                            )
+                        )
+                element.clear()
+        except ElementTree.ParseError as ex:
+            logging.warning("Unable to parse cppcheck results: %s", ex)
+            return None
+        return issues
+
     @classmethod
     def check_for_exceptions(cls, match: Match[str]) -> bool:
         """Manual exceptions.
@@ -183,8 +336,21 @@ class CppcheckToolPlugin(ToolPlugin):
         Returns:
             True if the match is an exception, False otherwise.
         """
+        return cls.is_exception(match.group(1), match.group(4))
+
+    @classmethod
+    def is_exception(cls, filename: str, check: str) -> bool:
+        """Manual exceptions.
+
+        Args:
+            filename: The file the issue was found in.
+            check: The cppcheck error id.
+
+        Returns:
+            True if the issue is an exception, False otherwise.
+        """
         # Sometimes you can't fix variableScope in old c code
-        if match.group(1).endswith(".c") and match.group(4) == "variableScope":
+        if filename.endswith(".c") and check == "variableScope":
             return True
         return False
 
@@ -22,6 +22,14 @@ class CpplintToolPlugin(ToolPlugin):
         """
         return "cpplint"
 
+    def get_file_types(self) -> list[str]:
+        """Return a list of file types the plugin can scan.
+
+        Returns:
+            List of file types.
+        """
+        return ["c_src"]
+
     def get_binary(  # pylint: disable=unused-argument
         self, level: Optional[str] = None, package: Optional[Package] = None
     ) -> str:
@@ -40,7 +48,9 @@ class CpplintToolPlugin(ToolPlugin):
 
         return binary
 
-    def scan(self, package: Package, level: str) -> Optional[list[Issue]]:
+    def scan(  # pylint: disable=too-many-return-statements
+        self, package: Package, level: str
+    ) -> Optional[list[Issue]]:
         """Run tool and gather output.
 
         Args:
@@ -68,13 +78,12 @@ class CpplintToolPlugin(ToolPlugin):
         if "make_targets" in package:
             for target in package["make_targets"]:
                 files += target["src"]
+        files = self.get_file_subset(package, files)
+        if not files:
+            return []
 
         try:
-            output = subprocess.check_output(
-                [cpplint] + flags + files,
-                stderr=subprocess.STDOUT,
-                universal_newlines=True,
-            )
+            output = self.check_output([cpplint] + flags + files)
         except subprocess.CalledProcessError as ex:
             output = ex.output
             if ex.returncode != 1:
@@ -31,6 +31,14 @@ class DocformatterToolPlugin(ToolPlugin):
         return ["python_src"]
 
     # pylint: disable=too-many-locals, too-many-branches, too-many-return-statements
+    def is_package_agnostic(self) -> bool:
+        """Check if the tool reports the same issues for a file in any package.
+
+        Returns:
+            True, docformatter only looks at the files it is given.
+        """
+        return True
+
     def process_files(
         self, package: Package, level: str, files: list[str], user_flags: list[str]
     ) -> Optional[list[str]]:
@@ -52,9 +60,7 @@ class DocformatterToolPlugin(ToolPlugin):
 
         try:
             subproc_args = [tool_bin] + flags + files
-            output = subprocess.check_output(
-                subproc_args, stderr=subprocess.STDOUT, universal_newlines=True
-            )
+            output = self.check_output(subproc_args)
 
         except (IOError, OSError) as ex:
             logging.warning("docformatter binary failed: %s", tool_bin)
@@ -99,13 +99,24 @@ class ESLintToolPlugin(ToolPlugin):
         """
         tool_bin = self.get_binary()
 
-        (format_file_name, copied_file) = self.get_format_file(level)
+        format_file_name, copied_file = self.get_format_file(level)
 
         flags: list[str] = ["-f", "json"]
         if format_file_name is not None:
             flags += ["-c", format_file_name]
-        flags += []
         flags += user_flags
+        config_files: list[str] = []
+        if format_file_name is not None:
+            config_files.append(format_file_name)
+        cache_file = self.get_cache_file(package.name, level, flags, config_files)
+        if cache_file is not None:
+            flags += [
+                "--cache",
+                "--cache-location",
+                cache_file,
+                "--cache-strategy",
+                "content",
+            ]
 
         total_output: list[str] = []
 
@@ -49,6 +49,14 @@ class HadolintToolPlugin(ToolPlugin):
         """
         return ["dockerfile_src"]
 
+    def is_package_agnostic(self) -> bool:
+        """Check if the tool reports the same issues for a file in any package.
+
+        Returns:
+            True, hadolint only looks at the files it is given.
+        """
+        return True
+
     def get_binary(  # pylint: disable=unused-argument
         self, level: Optional[str] = None, package: Optional[Package] = None
     ) -> str:
@@ -67,6 +75,23 @@ class HadolintToolPlugin(ToolPlugin):
             binary = self.plugin_context.args.hadolint_bin
         return binary
 
+    def is_available(self, level: Optional[str] = None) -> bool:
+        """Check if the tool is installed.
+
+        Args:
+            level: Level at which to run tool.
+
+        Returns:
+            True if the tool or Docker, when running in Docker, is installed.
+        """
+        if (
+            self.plugin_context
+            and self.plugin_context.args.hadolint_docker is not None
+            and self.plugin_context.args.hadolint_docker
+        ):
+            return self.command_exists("docker")
+        return super().is_available(level)
+
     def get_version(self) -> str:
         """Figure out and return the version of the tool that's installed.
 
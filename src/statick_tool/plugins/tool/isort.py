@@ -32,6 +32,14 @@ class IsortToolPlugin(ToolPlugin):
         """
         return ["python_src"]
 
+    def is_package_agnostic(self) -> bool:
+        """Check if the tool reports the same issues for a file in any package.
+
+        Returns:
+            True, isort only looks at the files it is given.
+        """
+        return True
+
     def process_files(
         self, package: Package, level: str, files: list[str], user_flags: list[str]
     ) -> Optional[list[str]]:
@@ -54,9 +62,7 @@ class IsortToolPlugin(ToolPlugin):
 
         try:
             subproc_args = [tool_bin] + flags + files
-            output = subprocess.check_output(
-                subproc_args, stderr=subprocess.STDOUT, universal_newlines=True
-            )
+            output = self.check_output(subproc_args)
             total_output.append(output)
 
         except (IOError, OSError) as ex:
@@ -1,10 +1,10 @@
 """Apply lizard tool and gather results."""
 
-import io
 import logging
-import re
-from contextlib import redirect_stdout
-from typing import Match, Optional, Pattern
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from fnmatch import fnmatch
+from typing import Any, Iterable, Optional
 
 import lizard
 
@@ -20,6 +20,14 @@ class LizardToolPlugin(ToolPlugin):
     options are unsupported.
     """
 
+    # Lizard languages of the file types found by Statick discovery plugins.
+    DISCOVERED_LANGUAGES = {
+        "c_src": "c",
+        "java_src": "java",
+        "javascript_src": "javascript",
+        "python_src": "python",
+    }
+
     def get_name(self) -> str:
         """Get name of tool.
 
@@ -28,6 +36,28 @@ class LizardToolPlugin(ToolPlugin):
         """
         return "lizard"
 
+    def get_file_types(self) -> list[str]:
+        """Return a list of file types the plugin can scan.
+
+        Returns:
+            List of file types the plugin can scan.
+        """
+        return ["c_src", "java_src", "javascript_src", "python_src"]
+
+    def is_available(self, level: Optional[str] = None) -> bool:
+        """Check if the tool is installed.
+
+        The tool is run through the lizard Python API, which is always installed with
+        Statick.
+
+        Args:
+            level: Level at which to run tool.
+
+        Returns:
+            True, since the tool can always be run.
+        """
+        return True
+
     def scan(self, package: Package, level: str) -> Optional[list[Issue]]:
         """Run tool and gather output.
 
@@ -38,69 +68,141 @@ class LizardToolPlugin(ToolPlugin):
         Returns:
             List of issues found or None.
         """
-        if not package.path:
+        # Leading lizard file name is required.
+        user_flags = self.remove_invalid_flags(
+            [lizard.__file__] + self.get_user_flags(level)
+        )
+        options = lizard.parse_args(user_flags)
+        files = self.get_files(package, options)
+        if not files:
             return []
 
-        # The following is a modification of lizard.py's main().
-        raw_user_flags = (
-            [lizard.__file__] + [package.path] + self.get_user_flags(level)
-        )  # Leading lizard file name is required.
-
-        # Make sure we log warnings.
-        if "-w" not in raw_user_flags:
-            raw_user_flags += ["-w"]
-
-        # Make sure unsupported arguments are not included.
-        user_flags = self.remove_invalid_flags(raw_user_flags)
-
-        options = lizard.parse_args(user_flags)
-        printer = options.printer or lizard.print_result
-        schema = lizard.OutputScheme(options.extensions)
-        schema.patch_for_extensions()
-
-        result = lizard.analyze(
-            options.paths,
-            options.exclude,
-            options.working_threads,
-            options.extensions,
-            options.languages,
-        )
-        lizard_output = io.StringIO()
-        with redirect_stdout(lizard_output):
-            printer(result, options, schema, lizard.AllResult)
-        output = lizard_output.getvalue()
+        file_infos = self.analyze_files(files, options.extensions)
+        warnings = list(lizard.get_warnings(file_infos, options))
         lizard.print_extension_results(options.extensions)
 
+        output = "".join(
+            f"{warning.filename}:{warning.start_line}: warning: "
+            f"{self.get_message(warning)}\n"
+            for warning in warnings
+        )
         logging.debug("%s", output)
         if self.plugin_context and self.plugin_context.args.output_directory:
             with open(self.get_name() + ".log", "w", encoding="utf8") as fid:
                 fid.write(output)
 
-        issues: list[Issue] = self.parse_tool_output(output)
+        return self.parse_warnings(warnings)
 
-        return issues
+    def get_files(self, package: Package, options: Any) -> list[str]:
+        """Find the source files to analyze.
 
-    def parse_tool_output(self, output: str) -> list[Issue]:
-        """Parse tool output and report issues.
+        Files of the types found by discovery are taken from the package, so that
+        discovery exceptions apply to them. Files of the other languages lizard
+        supports, like Go or Rust, are taken from the files discovery walked, so the
+        package is not walked again. Only the languages selected with
+        `-l/--languages` are analyzed, and excluded files are skipped.
 
         Args:
-            output: The output from the tool.
+            package: The package to process.
+            options: Parsed lizard options.
 
         Returns:
-            List of issues found.
+            Paths of the files to analyze.
+        """
+        languages = set(options.languages)
+        discovered_languages: set[str] = set()
+        files: list[str] = []
+        for file_type in self.get_file_types():
+            if file_type not in package:
+                continue
+            discovered_languages.add(self.DISCOVERED_LANGUAGES[file_type])
+            for src in package[file_type]:
+                # Files without a known extension are analyzed like C files.
+                reader = lizard.get_reader_for(src)
+                language_names = reader.language_names if reader else ["c"]
+                if languages and not languages.intersection(language_names):
+                    continue
+                if not any(fnmatch(src, pattern) for pattern in options.exclude):
+                    files.append(src)
+
+        for src in sorted(package.files):
+            reader = lizard.get_reader_for(src)
+            if reader is None or discovered_languages.intersection(
+                reader.language_names
+            ):
+                continue
+            if languages and not languages.intersection(reader.language_names):
+                continue
+            if not any(fnmatch(src, pattern) for pattern in options.exclude):
+                files.append(src)
+
+        return self.get_file_subset(package, list(dict.fromkeys(files)))
+
+    def analyze_files(self, files: list[str], extensions: list[Any]) -> list[Any]:
+        """Analyze source files with lizard, in parallel if possible.
+
+        Args:
+            files: Source files to analyze.
+            extensions: Lizard extensions to apply.
+
+        Returns:
+            Lizard file information for each file.
+        """
+        analyzer = lizard.FileAnalyzer(extensions)
+        jobs = min(self.get_num_jobs(), len(files))
+        # Daemon processes, like workspace package workers, can't start a pool.
+        if jobs > 1 and not multiprocessing.current_process().daemon:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                file_infos: Iterable[Any] = list(
+                    executor.map(
+                        analyzer, files, chunksize=max(1, len(files) // (jobs * 4))
+                    )
+                )
+        else:
+            file_infos = [analyzer(src) for src in files]
+        for extension in extensions:
+            if hasattr(extension, "cross_file_process"):
+                file_infos = extension.cross_file_process(file_infos)
+        return list(file_infos)
+
+    @staticmethod
+    def get_message(function_info: Any) -> str:
+        """Describe the metrics of a function the way lizard warnings do.
+
+        Args:
+            function_info: Lizard function information.
+
+        Returns:
+            Warning message for the function.
         """
-        lizard_re = r"(.+):(\d+):\s(.+):\s(.+)"
-        parse: Pattern[str] = re.compile(lizard_re)
-        matches = []
-        for line in output.splitlines():
-            match: Optional[Match[str]] = parse.match(line)
-            if match:
-                matches.append(match.groups())
+        return (
+            f"{function_info.name} has {function_info.nloc} NLOC, "
+            f"{function_info.cyclomatic_complexity} CCN, "
+            f"{function_info.token_count} token, "
+            f"{function_info.parameter_count} PARAM, "
+            f"{function_info.length} length, "
+            f"{function_info.max_nesting_depth} ND"
+        )
+
+    def parse_warnings(self, warnings: Iterable[Any]) -> list[Issue]:
+        """Convert functions exceeding lizard thresholds to issues.
 
+        Args:
+            warnings: Lizard function information for each warning.
+
+        Returns:
+            List of issues found.
+        """
         issues: list[Issue] = []
-        for item in matches:
+        for warning in warnings:
             issue = Issue(
-                item[0], int(item[1]), self.get_name(), item[2], 5, item[3], None
+                warning.filename,
+                int(warning.start_line),
+                self.get_name(),
+                "warning",
+                5,
+                self.get_message(warning),
+                None,
             )
             if issue not in issues:
                 issues.append(issue)
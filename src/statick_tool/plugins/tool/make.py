@@ -1,10 +1,15 @@
 """Apply make tool and gather results."""
 
+import argparse
+import json
 import logging
+import os
 import re
 import subprocess
-from typing import Any, Match, Optional, Pattern
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterable, Match, Optional, Pattern, Tuple
 
+from statick_tool.compile_commands import CompileCommands
 from statick_tool.issue import Issue
 from statick_tool.package import Package
 from statick_tool.tool_plugin import ToolPlugin
@@ -13,6 +18,8 @@ from statick_tool.tool_plugin import ToolPlugin
 class MakeToolPlugin(ToolPlugin):
     """Apply Make tool and gather results."""
 
+    WARNINGS_CACHE = "statick_make_warnings.json"
+
     def get_name(self) -> str:
         """Get name of tool.
 
@@ -21,6 +28,34 @@ class MakeToolPlugin(ToolPlugin):
         """
         return "make"
 
+    def get_input_file_types(self) -> list[str]:
+        """Return the file types the tool depends on.
+
+        Returns:
+            C/C++ files and CMake files, which the build targets come from.
+        """
+        return ["c_src", "cmake_src"]
+
+    def gather_args(self, args: argparse.Namespace) -> None:
+        """Gather arguments.
+
+        Args:
+            args: Flags for this plugin will be added to these existing arguments.
+        """
+        args.add_argument(
+            "--make-incremental",
+            dest="make_incremental",
+            action="store_true",
+            help="Keep the build tree between scans and only rebuild changed files",
+        )
+        args.add_argument(
+            "--make-syntax-only",
+            dest="make_syntax_only",
+            action="store_true",
+            help="Collect compiler warnings by running the package entries in "
+            "compile_commands.json with -fsyntax-only instead of building",
+        )
+
     def scan(self, package: Package, level: str) -> Optional[list[Issue]]:
         """Run tool and gather output.
 
@@ -35,17 +70,59 @@ class MakeToolPlugin(ToolPlugin):
             logging.info("  Skipping make. No targets.")
             return []
 
+        # Packages discovered from an existing compilation database have no Statick
+        # build target to run.
+        if "compile_commands" in package or (
+            self.plugin_context is not None
+            and "make_syntax_only" in self.plugin_context.args
+            and self.plugin_context.args.make_syntax_only
+        ):
+            return self.scan_syntax_only(package, level)
+
         tool_bin = self.get_binary()
+        clean_args: list[str] = [tool_bin, "clean"]
+        ninja = "Ninja" in package.get("cmake_generator", "")
+        if ninja:
+            tool_bin = "ninja"
+            clean_args = [tool_bin, "-t", "clean"]
+        build_dir = package.get("bin_dir", os.getcwd())
+
+        incremental = (
+            self.plugin_context is not None
+            and "make_incremental" in self.plugin_context.args
+            and self.plugin_context.args.make_incremental
+        )
 
         output = None
         make_args: list[str] = [tool_bin, "statick_cmake_target"]
+        if incremental:
+            make_args[1:1] = [f"-j{self.get_num_jobs()}"]
+            if not ninja:
+                # Keep the output of each target together so warnings can be
+                # attributed to the object file being compiled. Ninja always does.
+                make_args[2:2] = ["--output-sync=target"]
+
+        # Objects built without the warnings cache would never report their warnings.
+        clean = not incremental
+        if incremental and self.read_warnings_cache(build_dir) is None:
+            logging.info("  No cached make warnings in %s, building all.", build_dir)
+            clean = True
 
         try:
+            if clean:
+                output = subprocess.check_output(
+                    clean_args, cwd=build_dir, universal_newlines=True
+                )
+            # The incremental build needs the whole output to cache warnings.
+            if self.use_stream_output() and not incremental:
+                return self.parse_package_lines(
+                    package, self.stream_output(make_args, cwd=build_dir)
+                )
             output = subprocess.check_output(
-                [tool_bin, "clean"], universal_newlines=True
-            )
-            output = subprocess.check_output(
-                make_args, stderr=subprocess.STDOUT, universal_newlines=True
+                make_args,
+                cwd=build_dir,
+                stderr=subprocess.STDOUT,
+                universal_newlines=True,
             )
 
         except subprocess.CalledProcessError as ex:
@@ -64,9 +141,196 @@ class MakeToolPlugin(ToolPlugin):
             with open(self.get_name() + ".log", "w", encoding="utf8") as fid:
                 fid.write(output)
 
+        if incremental:
+            output = self.merge_cached_warnings(output, build_dir)
+
         issues: list[Issue] = self.parse_package_output(package, output)
         return issues
 
+    def scan_syntax_only(self, package: Package, level: str) -> Optional[list[Issue]]:
+        """Collect compiler warnings without building the package.
+
+        The compilation database entries for the sources of the package's targets are
+        compiled with `-fsyntax-only` in parallel. No object files are written and
+        nothing is linked. A database shared by a workspace also has entries for other
+        packages, which are left to those packages.
+
+        Args:
+            package: The package to process.
+            level: The level to run the tool at.
+
+        Returns:
+            List of issues found or None.
+        """
+        try:
+            if "compile_commands" in package:
+                filename = package["compile_commands"]
+            else:
+                filename = os.path.join(package["bin_dir"], "compile_commands.json")
+            compile_commands = CompileCommands(filename)
+        except (KeyError, OSError, ValueError) as ex:
+            logging.warning("Unable to read compilation database: %s", ex)
+            return None
+
+        sources = {
+            os.path.normpath(os.path.abspath(src))
+            for target in package["make_targets"]
+            for src in target["src"]
+        }
+        entries = [
+            entry
+            for entry in compile_commands.entries
+            if CompileCommands.get_file(entry) in sources
+        ]
+
+        # The flags are stored as one quoted string for the CMake template.
+        flags: list[str] = [
+            flag for flags in self.get_user_flags(level) for flag in flags.split()
+        ]
+        with ThreadPoolExecutor(max_workers=self.get_num_jobs()) as executor:
+            results = list(
+                executor.map(
+                    lambda entry: self.check_syntax(entry, flags),
+                    entries,
+                )
+            )
+
+        output = ""
+        for returncode, entry_output in results:
+            output += entry_output
+            if returncode != 0:
+                logging.warning("Make failed! Returncode = %d", returncode)
+                logging.warning("%s exception: %s", self.get_name(), entry_output)
+                return None
+
+        logging.debug("%s", output)
+
+        if self.plugin_context and self.plugin_context.args.output_directory:
+            with open(self.get_name() + ".log", "w", encoding="utf8") as fid:
+                fid.write(output)
+
+        return self.parse_package_output(package, output)
+
+    @staticmethod
+    def check_syntax(entry: dict[str, Any], flags: list[str]) -> Tuple[int, str]:
+        """Run the compiler for one compilation database entry with -fsyntax-only.
+
+        Args:
+            entry: Compilation database entry.
+            flags: Extra warning flags to pass to the compiler.
+
+        Returns:
+            The return code and output of the compiler.
+        """
+        args = CompileCommands.get_arguments(entry)
+        if not args:
+            return 0, ""
+        args = CompileCommands.strip_output_args(args)
+        # Flags go before the source file so they apply to it.
+        args = args[:1] + flags + ["-fsyntax-only"] + args[1:]
+        try:
+            output = subprocess.check_output(
+                args,
+                cwd=entry["directory"],
+                stderr=subprocess.STDOUT,
+                universal_newlines=True,
+            )
+            return 0, output
+        except subprocess.CalledProcessError as ex:
+            return ex.returncode, ex.output
+        except OSError as ex:
+            logging.warning("Couldn't find compiler %s! (%s)", args[0], ex)
+            return -1, ""
+
+    def merge_cached_warnings(self, output: str, build_dir: str) -> str:
+        """Add cached compiler output for objects that were not rebuilt.
+
+        An incremental build only prints warnings for the objects it compiles. The
+        output for each object is saved in the build directory, and the saved output is
+        replayed for objects that are up to date so their warnings are not lost.
+
+        Args:
+            output: The output from the incremental build.
+            build_dir: The directory the build was run in.
+
+        Returns:
+            The build output followed by the cached output of objects not rebuilt.
+        """
+        cache_file = os.path.join(build_dir, self.WARNINGS_CACHE)
+        cached = self.read_warnings_cache(build_dir) or {}
+
+        rebuilt = self.split_output_by_object(output)
+        cached.update(rebuilt)
+        # Objects that no longer exist were removed from the build.
+        cached = {
+            obj: lines
+            for obj, lines in cached.items()
+            if os.path.exists(os.path.join(build_dir, obj))
+        }
+        try:
+            with open(cache_file, "w", encoding="utf8") as fid:
+                json.dump(cached, fid)
+        except OSError as ex:
+            logging.warning("Unable to save make warnings to %s: %s", cache_file, ex)
+
+        replayed: list[str] = []
+        for obj, lines in cached.items():
+            if obj not in rebuilt:
+                replayed += lines
+        if replayed:
+            logging.info("  Replaying cached warnings for objects not rebuilt.")
+            output = output + "\n" + "\n".join(replayed)
+        return output
+
+    @classmethod
+    def read_warnings_cache(cls, build_dir: str) -> Optional[dict[str, list[str]]]:
+        """Read the compiler output saved for each object of the build directory.
+
+        Args:
+            build_dir: The directory the build is run in.
+
+        Returns:
+            Saved compiler output for each object file, or None if there is no
+            readable cache.
+        """
+        try:
+            with open(
+                os.path.join(build_dir, cls.WARNINGS_CACHE), encoding="utf8"
+            ) as fid:
+                cached = json.load(fid)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(cached, dict):
+            return None
+        return cached
+
+    @classmethod
+    def split_output_by_object(cls, output: str) -> dict[str, list[str]]:
+        """Split build output into the compiler output for each object file.
+
+        Args:
+            output: The output from the build.
+
+        Returns:
+            Compiler output lines for each object file built.
+        """
+        building_p: Pattern[str] = re.compile(r".*Building \S+ object (\S+)")
+        status_p: Pattern[str] = re.compile(
+            r"^(\[\s*\d+%\]|\[\d+/\d+\]|make(\[\d+\])?:)"
+        )
+        objects: dict[str, list[str]] = {}
+        current: Optional[str] = None
+        for line in output.splitlines():
+            match: Optional[Match[str]] = building_p.match(line)
+            if match:
+                current = match.group(1)
+                objects[current] = []
+            elif status_p.match(line):
+                current = None
+            elif current is not None:
+                objects[current].append(line)
+        return objects
+
     @classmethod
     def check_for_exceptions(cls, match: Match[str]) -> bool:
         """Manual exceptions.
@@ -112,15 +376,29 @@ class MakeToolPlugin(ToolPlugin):
             i += 1
         return result
 
-    def parse_package_output(  # pylint: disable=too-many-locals, too-many-branches
-        self, package: Package, output: str
-    ) -> list[Issue]:
+    def parse_package_output(self, package: Package, output: str) -> list[Issue]:
         """Parse tool output and report issues.
 
         Args:
             package: The package being processed.
             output: The output from the tool.
 
+        Returns:
+            List of issues found.
+        """
+        return self.parse_package_lines(package, output.splitlines())
+
+    def parse_package_lines(  # pylint: disable=too-many-locals, too-many-branches
+        self, package: Package, lines: Iterable[str]
+    ) -> list[Issue]:
+        """Parse tool output one line at a time and report issues.
+
+        Only the lines matching a compiler diagnostic are kept while reading.
+
+        Args:
+            package: The package being processed.
+            lines: The lines of output from the tool.
+
         Returns:
             List of issues found.
         """
@@ -129,15 +407,18 @@ class MakeToolPlugin(ToolPlugin):
         parse: Pattern[str] = re.compile(make_re)
         warning_parse: Pattern[str] = re.compile(make_warning_re)
         matches: Any = []
+        linker_failed = False
         # Load the plugin mapping if possible
         warnings_mapping = self.load_mapping()
-        for line in output.splitlines():
+        for line in lines:
+            if line == "collect2: ld returned 1 exit status":
+                linker_failed = True
             match: Optional[Match[str]] = parse.match(line)
             if match and not self.check_for_exceptions(match):
                 matches.append(match.groups())
 
         filtered_matches = self.filter_matches(matches, package)
-        issues: list[Issue] = []
+        issues: dict[Issue, None] = {}
         for item in filtered_matches:
             cert_reference = None
             warning_list = warning_parse.match(item[4])
@@ -174,12 +455,11 @@ class MakeToolPlugin(ToolPlugin):
                 item[4],
                 cert_reference,
             )
-            if issue not in issues:
-                issues.append(issue)
+            issues[issue] = None
 
-        lines = output.splitlines()
-        if "collect2: ld returned 1 exit status" in lines:
-            issues.append(
+        result = list(issues)
+        if linker_failed:
+            result.append(
                 Issue(
                     "Linker",
                     0,
@@ -190,4 +470,4 @@ class MakeToolPlugin(ToolPlugin):
                     None,
                 )
             )
-        return issues
+        return result
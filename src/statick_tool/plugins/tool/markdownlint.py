@@ -30,6 +30,14 @@ class MarkdownlintToolPlugin(ToolPlugin):
         return ["md_src"]
 
     # pylint: disable=too-many-locals
+    def is_package_agnostic(self) -> bool:
+        """Check if the tool reports the same issues for a file in any package.
+
+        Returns:
+            True, markdownlint only looks at the files it is given.
+        """
+        return True
+
     def process_files(
         self, package: Package, level: str, files: list[str], user_flags: list[str]
     ) -> Optional[list[str]]:
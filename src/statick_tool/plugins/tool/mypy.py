@@ -1,6 +1,8 @@
 """Apply mypy tool and gather results."""
 
+import argparse
 import logging
+import os
 import re
 import subprocess
 import sys
@@ -22,6 +24,50 @@ class MypyToolPlugin(ToolPlugin):
         """
         return "mypy"
 
+    def gather_args(self, args: argparse.Namespace) -> None:
+        """Gather arguments.
+
+        Args:
+            args: Flags for this plugin will be added to these existing arguments.
+        """
+        args.add_argument(
+            "--mypy-sqlite-cache",
+            dest="mypy_sqlite_cache",
+            action="store_true",
+            help="Keep the mypy cache in an SQLite database in --cache-dir",
+        )
+        args.add_argument(
+            "--mypy-daemon",
+            dest="mypy_daemon",
+            action="store_true",
+            help="Run mypy through a dmypy daemon for each package that stays running "
+            "between scans",
+        )
+        args.add_argument(
+            "--dmypy-bin",
+            dest="dmypy_bin",
+            type=str,
+            help="dmypy binary path, used with --mypy-daemon",
+        )
+
+    def get_daemon_binary(self) -> str:
+        """Get the dmypy binary to run the daemon with.
+
+        Without --dmypy-bin, dmypy is taken from the same directory as the mypy
+        binary, so the daemon and mypy come from the same installation.
+
+        Returns:
+            The dmypy binary name.
+        """
+        if (
+            self.plugin_context is not None
+            and "dmypy_bin" in self.plugin_context.args
+            and self.plugin_context.args.dmypy_bin is not None
+        ):
+            return str(self.plugin_context.args.dmypy_bin)
+        tool_bin = self.get_binary()
+        return os.path.join(os.path.dirname(tool_bin), "d" + os.path.basename(tool_bin))
+
     def get_file_types(self) -> list[str]:
         """Return a list of file types the plugin can scan.
 
@@ -50,12 +96,34 @@ class MypyToolPlugin(ToolPlugin):
             "--show-error-codes",
             "--no-error-summary",
         ]
+        if self.use_structured_output():
+            flags += ["--output=json"]
+        cache_dir = self.get_cache_dir(package.name, level)
+        if cache_dir is not None and not any(
+            flag.startswith("--cache-dir") for flag in user_flags
+        ):
+            flags += ["--cache-dir", os.path.join(cache_dir, "cache")]
+            if (
+                self.plugin_context is not None
+                and "mypy_sqlite_cache" in self.plugin_context.args
+                and self.plugin_context.args.mypy_sqlite_cache
+            ):
+                flags += ["--sqlite-cache"]
         flags += user_flags
         tool_bin = self.get_binary()
         total_output: list[str] = []
 
         try:
             subproc_args = [tool_bin] + flags + files
+            if (
+                self.plugin_context is not None
+                and "mypy_daemon" in self.plugin_context.args
+                and self.plugin_context.args.mypy_daemon
+            ):
+                status_file = self.get_status_file(cache_dir, package.name, level)
+                subproc_args = self.get_daemon_args(
+                    self.get_daemon_binary(), status_file, flags, files
+                )
             output = subprocess.check_output(
                 subproc_args, stderr=subprocess.STDOUT, universal_newlines=True
             )
@@ -77,6 +145,47 @@ class MypyToolPlugin(ToolPlugin):
 
         return total_output
 
+    @staticmethod
+    def get_status_file(cache_dir: Optional[str], package_name: str, level: str) -> str:
+        """Get the status file of the mypy daemon for a package and level.
+
+        The status file is kept in the cache directory, or in the working directory
+        if there is no cache directory.
+
+        Args:
+            cache_dir: Cache directory for the package and level, if any.
+            package_name: Name of the package.
+            level: Level the package is scanned at.
+
+        Returns:
+            Path to the status file.
+        """
+        if cache_dir is not None:
+            return os.path.join(cache_dir, "dmypy.json")
+        return os.path.abspath(f".dmypy-{package_name}-{level}.json")
+
+    @staticmethod
+    def get_daemon_args(
+        dmypy_bin: str, status_file: str, flags: list[str], files: list[str]
+    ) -> list[str]:
+        """Get the command to check files with a mypy daemon.
+
+        The daemon keeps the type information from earlier runs in memory, so only
+        changed files are checked again. `dmypy run` starts the daemon if it is not
+        running, and restarts it if the flags have changed. Each package and level
+        has its own daemon, found through its status file.
+
+        Args:
+            dmypy_bin: The dmypy binary.
+            status_file: Status file of the daemon.
+            flags: Flags to pass to mypy.
+            files: Files to check.
+
+        Returns:
+            The dmypy command.
+        """
+        return [dmypy_bin, "--status-file", status_file, "run", "--"] + flags + files
+
     # pylint: disable=too-many-locals, too-many-branches, too-many-return-statements
 
     def parse_output(
@@ -91,6 +200,9 @@ class MypyToolPlugin(ToolPlugin):
         Returns:
             List of issues found.
         """
+        if self.use_structured_output():
+            return self.parse_json_output(total_output)
+
         # file:line: severity: msg type
         tool_re = r"(.+):(\d+):\s(.+):\s(.+)\s(.+)"
         parse: Pattern[str] = re.compile(tool_re)
@@ -116,3 +228,30 @@ class MypyToolPlugin(ToolPlugin):
                         )
                     )
         return issues
+
+    def parse_json_output(self, total_output: list[str]) -> list[Issue]:
+        """Parse mypy JSON lines output and report issues.
+
+        Args:
+            total_output: List of output strings.
+
+        Returns:
+            List of issues found.
+        """
+        issues: list[Issue] = []
+        for output in total_output:
+            for error in self.iter_json(output):
+                if not isinstance(error, dict) or error.get("severity") == "note":
+                    continue
+                issues.append(
+                    Issue(
+                        error["file"],
+                        int(error["line"]),
+                        self.get_name(),
+                        error.get("code") or error.get("severity", "error"),
+                        5,
+                        error["message"],
+                        None,
+                    )
+                )
+        return issues
@@ -51,9 +51,7 @@ class PydocstyleToolPlugin(ToolPlugin):
 
         try:
             subproc_args = [tool_bin] + flags + files
-            output = subprocess.check_output(
-                subproc_args, stderr=subprocess.STDOUT, universal_newlines=True
-            )
+            output = self.check_output(subproc_args)
 
         except subprocess.CalledProcessError as ex:
             # Return code 1 just means "found problems"
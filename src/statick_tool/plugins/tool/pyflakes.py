@@ -29,6 +29,14 @@ class PyflakesToolPlugin(ToolPlugin):
         """
         return ["python_src"]
 
+    def is_package_agnostic(self) -> bool:
+        """Check if the tool reports the same issues for a file in any package.
+
+        Returns:
+            True, pyflakes only looks at the files it is given.
+        """
+        return True
+
     def process_files(
         self, package: Package, level: str, files: list[str], user_flags: list[str]
     ) -> Optional[list[str]]:
@@ -51,9 +59,7 @@ class PyflakesToolPlugin(ToolPlugin):
 
         try:
             subproc_args = [tool_bin] + flags + files
-            output = subprocess.check_output(
-                subproc_args, stderr=subprocess.STDOUT, universal_newlines=True
-            )
+            output = self.check_output(subproc_args)
 
         except subprocess.CalledProcessError as ex:
             # Return code 1 just means "found problems"
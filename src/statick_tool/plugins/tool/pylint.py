@@ -47,6 +47,8 @@ class PylintToolPlugin(ToolPlugin):
             "--msg-template='{abspath}:{line}: [{msg_id}({symbol}), {obj}] {msg}'",
             "--reports=no",
         ]
+        if self.use_structured_output():
+            flags[0] = "--output-format=json2"
         flags += user_flags
         if self.plugin_context and self.plugin_context.args.max_procs is not None:
             flags += [f"-j {self.plugin_context.args.max_procs}"]
@@ -91,6 +93,9 @@ class PylintToolPlugin(ToolPlugin):
         Returns:
             A list of issues parsed from the output.
         """
+        if self.use_structured_output():
+            return self.parse_json_output(total_output)
+
         pylint_re = r"(.+):(\d+):\s\[(.+)\]\s(.+)"
         parse: Pattern[str] = re.compile(pylint_re)
         issues: list[Issue] = []
@@ -139,3 +144,34 @@ class PylintToolPlugin(ToolPlugin):
                         )
 
         return issues
+
+    def parse_json_output(self, total_output: list[str]) -> list[Issue]:
+        """Parse pylint json2 output and report issues.
+
+        Args:
+            total_output: The output from the tool.
+
+        Returns:
+            A list of issues parsed from the output.
+        """
+        issues: list[Issue] = []
+        for output in total_output:
+            for report in self.iter_json(output):
+                if not isinstance(report, dict):
+                    continue
+                for message in report.get("messages", []):
+                    text = message["message"]
+                    if message.get("obj"):
+                        text = message["obj"] + ": " + text
+                    issues.append(
+                        Issue(
+                            message["absolutePath"],
+                            int(message["line"]),
+                            self.get_name(),
+                            f"{message['messageId']}({message['symbol']})",
+                            5,
+                            text,
+                            None,
+                        )
+                    )
+        return issues
@@ -53,9 +53,7 @@ class RstcheckToolPlugin(ToolPlugin):
 
         try:
             exe = [tool_bin] + flags + files
-            output = subprocess.check_output(
-                exe, stderr=subprocess.STDOUT, universal_newlines=True
-            )
+            output = self.check_output(exe)
             total_output.append(output)
 
         except subprocess.CalledProcessError as ex:
@@ -22,6 +22,14 @@ class RstlintToolPlugin(ToolPlugin):
         """
         return "rstlint"
 
+    def get_input_file_types(self) -> list[str]:
+        """Return the file types the tool depends on.
+
+        Returns:
+            reStructuredText files.
+        """
+        return ["rst_src"]
+
     def get_binary(  # pylint: disable=unused-argument
         self, level: Optional[str] = None, package: Optional[Package] = None
     ) -> str:
@@ -37,6 +45,20 @@ class RstlintToolPlugin(ToolPlugin):
         return "rst-lint"
 
     # pylint: disable=too-many-locals
+    def is_available(self, level: Optional[str] = None) -> bool:
+        """Check if the tool is installed.
+
+        The tool is run through the restructuredtext_lint Python API, which is always installed with
+        Statick.
+
+        Args:
+            level: Level at which to run tool.
+
+        Returns:
+            True, since the tool can always be run.
+        """
+        return True
+
     def scan(self, package: Package, level: str) -> Optional[list[Issue]]:
         """Run tool and gather output.
 
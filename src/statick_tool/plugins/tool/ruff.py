@@ -29,6 +29,14 @@ class RuffToolPlugin(ToolPlugin):
         """
         return ["python_src"]
 
+    def is_package_agnostic(self) -> bool:
+        """Check if the tool reports the same issues for a file in any package.
+
+        Returns:
+            True, ruff only looks at the files it is given.
+        """
+        return True
+
     def process_files(
         self, package: Package, level: str, files: list[str], user_flags: list[str]
     ) -> Optional[list[str]]:
@@ -44,6 +52,8 @@ class RuffToolPlugin(ToolPlugin):
             The output from the tool.
         """
         flags: list[str] = ["check"]
+        if self.use_structured_output():
+            flags += ["--output-format=json-lines"]
         flags += user_flags
         total_output: list[str] = []
 
@@ -76,6 +86,9 @@ class RuffToolPlugin(ToolPlugin):
         Returns:
             A list of issues parsed from the output.
         """
+        if self.use_structured_output():
+            return self.parse_json_output(total_output)
+
         issues: list[Issue] = []
         ruff_re = r"(.+):(\d+):(\d+):\s(.+)"
         parse: Pattern[str] = re.compile(ruff_re)
@@ -99,3 +112,30 @@ class RuffToolPlugin(ToolPlugin):
                     )
 
         return issues
+
+    def parse_json_output(self, total_output: list[str]) -> list[Issue]:
+        """Parse ruff JSON lines output and report issues.
+
+        Args:
+            total_output: The output from the tool.
+
+        Returns:
+            A list of issues parsed from the output.
+        """
+        issues: list[Issue] = []
+        for output in total_output:
+            for violation in self.iter_json(output):
+                if not isinstance(violation, dict):
+                    continue
+                issues.append(
+                    Issue(
+                        violation["filename"],
+                        int(violation["location"]["row"]),
+                        self.get_name(),
+                        violation.get("code") or "SyntaxError",
+                        5,
+                        violation["message"],
+                        None,
+                    )
+                )
+        return issues
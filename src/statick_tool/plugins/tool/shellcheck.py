@@ -38,6 +38,22 @@ class ShellcheckToolPlugin(ToolPlugin):
             help="shellcheck binary path",
         )
 
+    def get_file_types(self) -> list[str]:
+        """Return a list of file types the plugin can scan.
+
+        Returns:
+            A list of file types.
+        """
+        return ["shell_src"]
+
+    def is_package_agnostic(self) -> bool:
+        """Check if the tool reports the same issues for a file in any package.
+
+        Returns:
+            True, shellcheck only looks at the files it is given.
+        """
+        return True
+
     def get_binary(  # pylint: disable=unused-argument
         self, level: Optional[str] = None, package: Optional[Package] = None
     ) -> str:
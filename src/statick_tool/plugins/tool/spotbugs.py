@@ -1,10 +1,12 @@
 """Apply spotbugs tool and gather results."""
 
+import argparse
+import io
 import logging
 import os
 import subprocess
 import xml.etree.ElementTree as etree
-from typing import Optional
+from typing import IO, Optional, Union
 
 from statick_tool.issue import Issue
 from statick_tool.package import Package
@@ -22,6 +24,34 @@ class SpotbugsToolPlugin(ToolPlugin):
         """
         return "spotbugs"
 
+    def get_input_file_types(self) -> list[str]:
+        """Return the file types the tool depends on.
+
+        Returns:
+            Java files and Maven project files.
+        """
+        return ["java_src", "all_poms"]
+
+    def gather_args(self, args: argparse.Namespace) -> None:
+        """Gather arguments.
+
+        Args:
+            args: Flags for this plugin will be added to these existing arguments.
+        """
+        args.add_argument(
+            "--spotbugs-parallel",
+            dest="spotbugs_parallel",
+            action="store_true",
+            help="Build the modules of each Maven reactor in parallel, with as many "
+            "threads as --max-procs",
+        )
+        args.add_argument(
+            "--spotbugs-offline",
+            dest="spotbugs_offline",
+            action="store_true",
+            help="Run Maven offline so it does not check remote repositories",
+        )
+
     @classmethod
     def get_tool_dependencies(cls) -> list[str]:
         """Get a list of tools that must run before this one.
@@ -31,6 +61,19 @@ class SpotbugsToolPlugin(ToolPlugin):
         """
         return ["make"]
 
+    def is_available(self, level: Optional[str] = None) -> bool:
+        """Check if the tool is installed.
+
+        Spotbugs is run through its Maven plugin.
+
+        Args:
+            level: Level at which to run tool.
+
+        Returns:
+            True if Maven is installed, False otherwise.
+        """
+        return self.command_exists("mvn")
+
     def scan(self, package: Package, level: str) -> Optional[list[Issue]]:
         """Run tool and gather output.
 
@@ -56,6 +99,16 @@ class SpotbugsToolPlugin(ToolPlugin):
             "-Dspotbugs.threshold=Low",
             "-Dspotbugs.xmlOutput=true",
         ]
+        if (
+            "spotbugs_parallel" in self.plugin_context.args
+            and self.plugin_context.args.spotbugs_parallel
+        ):
+            flags += ["-T", str(self.get_num_jobs())]
+        if (
+            "spotbugs_offline" in self.plugin_context.args
+            and self.plugin_context.args.spotbugs_offline
+        ):
+            flags += ["-o"]
         flags += self.get_user_flags(level)
 
         include_file: Optional[str] = self.plugin_context.config.get_tool_config(
@@ -99,20 +152,13 @@ class SpotbugsToolPlugin(ToolPlugin):
 
         # The results will be output to (pom path)/target/spotbugs.xml for each pom
         for pom in package["all_poms"]:
-            if os.path.exists(
-                os.path.join(os.path.dirname(pom), "target", "spotbugs.xml")
-            ):
-                with open(
-                    os.path.join(os.path.dirname(pom), "target", "spotbugs.xml"),
-                    encoding="utf8",
-                ) as outfile:
-                    issues += self.parse_file_output(outfile.read())  # type: ignore
+            xml_file = os.path.join(os.path.dirname(pom), "target", "spotbugs.xml")
+            if os.path.exists(xml_file):
+                issues += self.parse_xml(xml_file) or []
 
         return issues
 
-    def parse_file_output(  # pylint: disable=too-many-locals
-        self, output: str
-    ) -> Optional[list[Issue]]:
+    def parse_file_output(self, output: str) -> Optional[list[Issue]]:
         """Parse tool output and report issues.
 
         Args:
@@ -121,53 +167,94 @@ class SpotbugsToolPlugin(ToolPlugin):
         Returns:
             List of issues or None.
         """
-        issues: list[Issue] = []
+        return self.parse_xml(io.BytesIO(output.encode("utf8")))
+
+    @classmethod
+    def get_file_path(cls, classname: str, source_dirs: list[str]) -> str:
+        """Find the source file of a Java class.
+
+        Args:
+            classname: Fully qualified name of the class.
+            source_dirs: Source directories listed in the report.
+
+        Returns:
+            Path to the source file, or the path relative to its source directory if
+            it can't be found.
+        """
+        java_path_string = f"{classname.replace('.', os.sep)}.java"
+        for source_dir in source_dirs:
+            joined_path = os.path.join(source_dir, java_path_string)
+            if os.path.exists(joined_path):
+                return joined_path
+        logging.warning("Couldn't find file for class %s", classname)
+        return java_path_string
+
+    def parse_xml(  # pylint: disable=too-many-locals
+        self, source: Union[str, IO[bytes]]
+    ) -> Optional[list[Issue]]:
+        """Parse a Spotbugs XML report and report issues.
+
+        The report is read one element at a time and elements are dropped once they
+        are handled, so large reports are not loaded into memory all at once.
+
+        Args:
+            source: Path to the report, or a binary file object to read it from.
+
+        Returns:
+            List of issues or None.
+        """
         # Load the plugin mapping if possible
         warnings_mapping = self.load_mapping()
+        file_entries: list[tuple[str, list[dict[str, str]]]] = []
+        source_dirs: list[str] = []
+        root: Optional[etree.Element] = None
         try:
-            output_xml = etree.fromstring(output)
+            for event, elem in etree.iterparse(source, events=("start", "end")):
+                if root is None:
+                    root = elem
+                if event != "end":
+                    continue
+                if elem.tag == "file":
+                    file_entries.append(
+                        (
+                            elem.attrib["classname"],
+                            [
+                                dict(issue.attrib)
+                                for issue in elem.findall("BugInstance")
+                            ],
+                        )
+                    )
+                elif elem.tag == "SrcDir" and elem.text is not None:
+                    source_dirs.append(os.path.normpath(elem.text))
+                if elem.tag in ("file", "Project") and root is not None:
+                    # Drop handled entries so the tree does not grow with the report.
+                    elem.clear()
+                    root.clear()
         except etree.ParseError as ex:
-            logging.warning(
-                "Couldn't parse Spotbugs output (%s)! Provided output was:\n%s",
-                ex,
-                output,
-            )
+            logging.warning("Couldn't parse Spotbugs output (%s)!", ex)
             return None  # This might be better to return empty issues list here.
-        for file_entry in output_xml.findall("file"):
-            # Generate the filename
-            file_base = file_entry.attrib["classname"].replace(".", os.sep)
-            java_path_string = f"{file_base}.java"
-            file_path = ""
-            for source_dir in output_xml.findall("Project/SrcDir"):
-                if source_dir.text is not None:
-                    norm_src_path = os.path.normpath(source_dir.text)
-                    joined_path = os.path.join(norm_src_path, java_path_string)
-                    if os.path.exists(joined_path):
-                        file_path = joined_path
-                        break
-            if not file_path:
-                logging.warning(
-                    "Couldn't find file for class %s", file_entry.attrib["classname"]
-                )
-                file_path = java_path_string
-            for issue in file_entry.findall("BugInstance"):
+
+        issues: list[Issue] = []
+        for classname, bug_instances in file_entries:
+            file_path = self.get_file_path(classname, source_dirs)
+            for issue in bug_instances:
                 severity = 1
-                if issue.attrib["priority"] == "Normal":
+                if issue["priority"] == "Normal":
                     severity = 3
-                elif issue.attrib["priority"] == "High":
+                elif issue["priority"] == "High":
                     severity = 5
 
                 cert_reference = None
-                if issue.attrib["type"] in warnings_mapping:
-                    cert_reference = warnings_mapping[issue.attrib["type"]]
+                if issue["type"] in warnings_mapping:
+                    cert_reference = warnings_mapping[issue["type"]]
                 issues.append(
                     Issue(
                         file_path,
-                        int(issue.attrib["lineNumber"]),
+                        int(issue["lineNumber"]),
                         self.get_name(),
-                        issue.attrib["type"],
+                        issue["type"],
                         severity,
-                        issue.attrib["message"],
+                        issue["message"],
                         cert_reference,
                     )
                 )
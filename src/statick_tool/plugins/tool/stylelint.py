@@ -63,6 +63,18 @@ class StylelintToolPlugin(ToolPlugin):
             flags += ["--config", format_file_name]
         flags += ["-f", "json"]
         flags += user_flags
+        config_files: list[str] = []
+        if format_file_name is not None:
+            config_files.append(format_file_name)
+        cache_file = self.get_cache_file(package.name, level, flags, config_files)
+        if cache_file is not None:
+            flags += [
+                "--cache",
+                "--cache-location",
+                cache_file,
+                "--cache-strategy",
+                "content",
+            ]
 
         total_output: list[str] = []
 
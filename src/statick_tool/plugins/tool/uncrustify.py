@@ -22,6 +22,14 @@ class UncrustifyToolPlugin(ToolPlugin):
         """
         return "uncrustify"
 
+    def get_file_types(self) -> list[str]:
+        """Return a list of file types the plugin can scan.
+
+        Returns:
+            List of file types.
+        """
+        return ["c_src"]
+
     def gather_args(self, args: argparse.Namespace) -> None:
         """Gather arguments.
 
@@ -85,6 +93,9 @@ class UncrustifyToolPlugin(ToolPlugin):
                 files += target["src"]
         if "headers" in package:
             files += package["headers"]
+        files = self.get_file_subset(package, files)
+        if not files:
+            return []
 
         total_output: list[str] = []
 
@@ -13,11 +13,11 @@ https://github.com/KCL-Planning/VAL/tree/master/applications#parser
 import argparse
 import logging
 import re
-import subprocess
 from typing import Match, Optional, Pattern
 
 from statick_tool.issue import Issue
 from statick_tool.package import Package
+from statick_tool.plugins.tool import val_runner
 from statick_tool.tool_plugin import ToolPlugin
 
 
@@ -32,6 +32,14 @@ class ValParserToolPlugin(ToolPlugin):
         """
         return "val_parser"
 
+    def get_input_file_types(self) -> list[str]:
+        """Return the file types the tool depends on.
+
+        Returns:
+            PDDL domain and problem files.
+        """
+        return ["pddl_domain_src", "pddl_problem_src"]
+
     def gather_args(self, args: argparse.Namespace) -> None:
         """Gather arguments.
 
@@ -44,6 +52,14 @@ class ValParserToolPlugin(ToolPlugin):
             type=str,
             help="VAL Parser binary path",
         )
+        args.add_argument(
+            "--val-parser-timeout",
+            dest="val_parser_timeout",
+            type=float,
+            default=60.0,
+            help="Seconds to wait for VAL Parser to check each PDDL domain and problem "
+            "pair",
+        )
 
     def get_binary(  # pylint: disable=unused-argument
         self, level: Optional[str] = None, package: Optional[Package] = None
@@ -65,6 +81,20 @@ class ValParserToolPlugin(ToolPlugin):
             binary = self.plugin_context.args.val_parser_bin
         return binary
 
+    def get_timeout(self) -> Optional[float]:
+        """Get the number of seconds to wait for each domain and problem pair.
+
+        Returns:
+            Timeout in seconds, or None to wait as long as it takes.
+        """
+        if (
+            self.plugin_context is None
+            or "val_parser_timeout" not in self.plugin_context.args
+            or not self.plugin_context.args.val_parser_timeout
+        ):
+            return None
+        return float(self.plugin_context.args.val_parser_timeout)
+
     def scan(self, package: Package, level: str) -> Optional[list[Issue]]:
         """Run tool and gather output.
 
@@ -83,35 +113,33 @@ class ValParserToolPlugin(ToolPlugin):
 
         parser_bin = self.get_binary()
 
-        try:
-            subproc_args: list[str] = (
-                [parser_bin]
-                + flags
-                + package["pddl_domain_src"]
-                + package["pddl_problem_src"]
-            )
-            output = subprocess.check_output(
-                subproc_args, stderr=subprocess.STDOUT, universal_newlines=True
-            )
-
-        except subprocess.CalledProcessError as ex:
-            output = ex.output
-            if ex.returncode != 255:
-                logging.warning("VAL Parser failed! Returncode = %d", ex.returncode)
-                logging.warning("%s exception: %s", self.get_name(), ex.output)
-                return None
-
-        except OSError as ex:
-            logging.warning("Couldn't find %s! (%s)", parser_bin, ex)
+        problems: list[str] = []
+        if "pddl_problem_src" in package:
+            problems = package["pddl_problem_src"]
+        pairs = val_runner.get_pairs(package["pddl_domain_src"], problems)
+        outputs = val_runner.run(
+            [parser_bin] + flags, pairs, self.get_num_jobs(), self.get_timeout()
+        )
+        if outputs is None:
             return None
-
+        output = "".join(out for out in outputs if out is not None)
         logging.debug("%s", output)
 
         if self.plugin_context and self.plugin_context.args.output_directory:
             with open(self.get_name() + ".log", "w", encoding="utf-8") as fid:
                 fid.write(output)
 
-        issues: list[Issue] = self.parse_tool_output(output)
+        issues: list[Issue] = []
+
+        for files, pair_output in zip(pairs, outputs):
+            if pair_output is None:
+                issues.append(
+                    val_runner.get_timeout_issue(
+                        self.get_name(), files, self.get_timeout()
+                    )
+                )
+                continue
+            issues += self.parse_tool_output(pair_output)
         return issues
 
     def parse_tool_output(self, output: str) -> list[Issue]:
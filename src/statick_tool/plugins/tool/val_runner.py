@@ -0,0 +1,162 @@
+"""Run VAL tools on PDDL domain and problem pairs in parallel.
+
+Each problem is checked together with the domain it declares, in a separate VAL
+process. Pairs are run in a pool of worker threads, and each run has a timeout since
+VAL can hang on malformed input. Output is returned in the order of the pairs, so
+results do not depend on which run finishes first. Runs that time out are reported as
+issues on the files they were checking.
+"""
+
+import logging
+import re
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from statick_tool.issue import Issue
+
+COMMENT_RE = re.compile(r";[^\n]*")
+DOMAIN_RE = re.compile(r"\(\s*:?domain\s+([^\s()]+)", re.IGNORECASE)
+
+
+def get_domain_name(filename: str) -> Optional[str]:
+    """Find the name of the domain defined or used by a PDDL file.
+
+    Args:
+        filename: PDDL domain or problem file.
+
+    Returns:
+        Name of the domain, or None if it can't be found.
+    """
+    try:
+        with open(filename, "r", encoding="utf8") as fid:
+            match = DOMAIN_RE.search(COMMENT_RE.sub("", fid.read()))
+    except (OSError, UnicodeDecodeError):
+        return None
+    if match is None:
+        return None
+    return match.group(1).lower()
+
+
+def get_pairs(domains: list[str], problems: list[str]) -> list[list[str]]:
+    """Pair each problem with its domain.
+
+    With a single domain every problem is paired with it. Otherwise problems are
+    paired with the domain of the same name. Domains without problems are checked on
+    their own.
+
+    Args:
+        domains: PDDL domain files.
+        problems: PDDL problem files.
+
+    Returns:
+        Files to check together, domain first.
+    """
+    if len(domains) == 1:
+        return [[domains[0], problem] for problem in problems] or [[domains[0]]]
+
+    domain_files: dict[str, str] = {}
+    for domain in domains:
+        name = get_domain_name(domain)
+        if name is not None:
+            domain_files.setdefault(name, domain)
+    pairs: list[list[str]] = []
+    paired_domains: set[str] = set()
+    for problem in problems:
+        name = get_domain_name(problem)
+        if name is None or name not in domain_files:
+            logging.warning("No PDDL domain found for problem %s.", problem)
+            continue
+        pairs.append([domain_files[name], problem])
+        paired_domains.add(domain_files[name])
+    pairs += [[domain] for domain in domains if domain not in paired_domains]
+    return pairs
+
+
+def run(
+    subproc_args: list[str],
+    pairs: list[list[str]],
+    max_workers: int = 1,
+    timeout: Optional[float] = None,
+) -> Optional[list[Optional[str]]]:
+    """Run a VAL tool on each pair of files.
+
+    Args:
+        subproc_args: Tool binary and flags.
+        pairs: Files to check together in each run.
+        max_workers: Number of runs to do at a time.
+        timeout: Seconds to wait for each run, None to wait as long as it takes.
+
+    Returns:
+        Output of each run in the order of the pairs, or None if the tool failed. Runs
+        that timed out have None as their output.
+    """
+
+    def run_pair(
+        files: list[str],
+    ) -> Tuple[Optional[str], Optional[Exception], bool]:
+        try:
+            output = subprocess.check_output(
+                subproc_args + files,
+                stderr=subprocess.STDOUT,
+                universal_newlines=True,
+                timeout=timeout,
+            )
+        except subprocess.TimeoutExpired:
+            logging.warning(
+                "%s timed out after %s seconds on %s.",
+                subproc_args[0],
+                timeout,
+                " ".join(files),
+            )
+            return None, None, True
+        except subprocess.CalledProcessError as ex:
+            # VAL returns 255 when it finds problems in the files.
+            if ex.returncode != 255:
+                return None, ex, False
+            return str(ex.output), None, False
+        except OSError as ex:
+            return None, ex, False
+        return output, None, False
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        results = list(executor.map(run_pair, pairs))
+
+    outputs: list[Optional[str]] = []
+    for output, ex, timed_out in results:
+        if isinstance(ex, subprocess.CalledProcessError):
+            logging.warning(
+                "%s failed! Returncode = %d", subproc_args[0], ex.returncode
+            )
+            logging.warning("%s exception: %s", subproc_args[0], ex.output)
+            return None
+        if timed_out:
+            outputs.append(None)
+            continue
+        if ex is not None or output is None:
+            logging.warning("Couldn't find %s! (%s)", subproc_args[0], ex)
+            return None
+        outputs.append(output)
+    return outputs
+
+
+def get_timeout_issue(tool: str, files: list[str], timeout: Optional[float]) -> Issue:
+    """Make an issue for a run that timed out.
+
+    Args:
+        tool: Name of the tool plugin.
+        files: Files checked together in the run, domain first.
+        timeout: Seconds the run was given.
+
+    Returns:
+        Issue on the problem file, or the domain file if there is no problem.
+    """
+    return Issue(
+        files[-1],
+        0,
+        tool,
+        "timeout",
+        3,
+        f"Check of {' '.join(files)} timed out after {timeout} seconds.",
+        None,
+    )
@@ -0,0 +1,312 @@
+"""Serve scan requests from a long-running Statick process.
+
+Starting Statick loads every plugin, parses the configuration and checks which tools
+are installed. `statick serve` does this once and then scans packages for clients
+connecting on a Unix socket, so pre-commit hooks and CI steps only pay for the scan.
+A client sends the same arguments it would give the `statick` command and gets the
+output of the scan streamed back, followed by the exit code.
+
+Requests and replies are JSON objects, one per line. A request looks like
+`{"args": [...], "cwd": "..."}`. Replies are `{"stdout": "..."}` and
+`{"stderr": "..."}` while the scan runs, and `{"exit": 0}` when it is done.
+"""
+
+import argparse
+import json
+import logging
+import os
+import socket
+import socketserver
+import sys
+import time
+from contextlib import redirect_stderr, redirect_stdout
+from typing import Any, Callable, Optional, TextIO, Tuple
+
+from statick_tool import version_cache
+from statick_tool.args import Args
+from statick_tool.statick_tool import Statick
+
+ERROR_EXIT_CODE = 2
+
+Reply = Callable[[dict[str, Any]], None]
+Scan = Callable[[Statick, argparse.Namespace, float], int]
+
+
+class ReplyStream:
+    """File-like object sending everything written to it to the client."""
+
+    def __init__(self, reply: Reply, name: str) -> None:
+        """Initialize the stream.
+
+        Args:
+            reply: Function sending a reply to the client.
+            name: Name of the stream in the replies, stdout or stderr.
+        """
+        self.reply = reply
+        self.name = name
+
+    def write(self, text: str) -> int:
+        """Send text to the client.
+
+        Args:
+            text: Text to send.
+
+        Returns:
+            Number of characters written.
+        """
+        if text:
+            self.reply({self.name: text})
+        return len(text)
+
+    def flush(self) -> None:
+        """Flush the stream, replies are not buffered."""
+
+
+def get_server(argv: list[str]) -> Tuple[Optional[str], list[str]]:
+    """Find the socket of a server to send a scan to.
+
+    This only looks at the `--server` argument, so a client does not need to load any
+    plugins.
+
+    Args:
+        argv: Command line arguments.
+
+    Returns:
+        The server socket, or None to scan in this process, and the other arguments.
+    """
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--server", dest="server", type=str)
+    parsed_args, other_args = parser.parse_known_args(argv)
+    return parsed_args.server, other_args
+
+
+def request(
+    socket_path: str,
+    argv: list[str],
+    cwd: Optional[str] = None,
+    output: Optional[Tuple[TextIO, TextIO]] = None,
+) -> int:
+    """Send a scan to a server and print its output.
+
+    Args:
+        socket_path: Unix socket the server listens on.
+        argv: Arguments for the scan, as given to the `statick` command.
+        cwd: Directory relative paths in the arguments are relative to.
+        output: Streams to print the standard output and error of the scan to,
+            instead of the standard streams of this process.
+
+    Returns:
+        Exit code of the scan.
+    """
+    stdout, stderr = output or (sys.stdout, sys.stderr)
+    message = {"args": argv, "cwd": cwd or os.getcwd()}
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(socket_path)
+            sock.sendall((json.dumps(message) + "\n").encode("utf8"))
+            with sock.makefile("r", encoding="utf8") as replies:
+                for line in replies:
+                    reply = json.loads(line)
+                    if "stdout" in reply:
+                        stdout.write(reply["stdout"])
+                    elif "stderr" in reply:
+                        stderr.write(reply["stderr"])
+                    elif "exit" in reply:
+                        return int(reply["exit"])
+    except (OSError, ValueError) as ex:
+        logging.error("Unable to scan with Statick server at %s: %s", socket_path, ex)
+        return ERROR_EXIT_CODE
+    logging.error("Statick server at %s stopped before the scan finished.", socket_path)
+    return ERROR_EXIT_CODE
+
+
+def is_server_running(socket_path: str) -> bool:
+    """Check if a server is listening on a socket.
+
+    Args:
+        socket_path: Unix socket to check.
+
+    Returns:
+        True if a server accepted a connection.
+    """
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(socket_path)
+    except OSError:
+        return False
+    return True
+
+
+class Server:
+    """Scan packages for clients with plugins, configuration and caches kept loaded."""
+
+    def __init__(self, statick: Statick, args: Args, scan: Scan) -> None:
+        """Initialize the server.
+
+        Args:
+            statick: Statick object with all plugins loaded.
+            args: Arguments with the options of Statick and all plugins added.
+            scan: Function scanning with parsed arguments and returning the exit code.
+        """
+        self.statick = statick
+        self.args = args
+        self.scan = scan
+        # The last resource path is the directory of the built-in resources.
+        self.user_paths = statick.resources.paths[:-1]
+        self.config_key: Optional[Tuple[Any, ...]] = None
+        self.socket_server: Optional[socketserver.UnixStreamServer] = None
+
+    def get_config_key(self, parsed_args: argparse.Namespace) -> Tuple[Any, ...]:
+        """Identify the configuration and exceptions files a scan uses.
+
+        Args:
+            parsed_args: Arguments of the scan.
+
+        Returns:
+            The files and their modification times.
+        """
+        filenames = [
+            self.statick.resources.get_file("config.yaml"),
+            self.statick.resources.get_file(parsed_args.config or ""),
+            self.statick.resources.get_file(
+                parsed_args.exceptions or "exceptions.yaml"
+            ),
+        ]
+        key: list[Any] = [parsed_args.config, parsed_args.exceptions]
+        for filename in filenames:
+            try:
+                key.append((filename, os.stat(filename).st_mtime_ns))  # type: ignore
+            except (OSError, TypeError):
+                key.append((filename, None))
+        return tuple(key)
+
+    def load_config(self, parsed_args: argparse.Namespace) -> None:
+        """Load the configuration and exceptions if they changed since the last scan.
+
+        Args:
+            parsed_args: Arguments of the scan.
+        """
+        key = self.get_config_key(parsed_args)
+        if key == self.config_key:
+            return
+        self.statick.get_config(parsed_args)
+        self.statick.get_exceptions(parsed_args)
+        self.config_key = key
+
+    def reset(self) -> None:
+        """Forget the results of the last scan.
+
+        Which tools are installed is checked again, since tools may have been
+        installed or enabled since the last scan, and package managers are asked for
+        the installed packages again. Plugin caches such as the tool versions are
+        kept.
+        """
+        self.statick.timings = []
+        self.statick.missing_tools = {}
+        version_cache.clear_queries()
+        self.statick.tool_versions = []
+        self.statick.discovered_packages = {}
+        self.statick.workspace_issues = {}
+
+    def handle(self, message: dict[str, Any], reply: Reply) -> int:
+        """Run a scan requested by a client.
+
+        Args:
+            message: Request from the client.
+            reply: Function sending a reply to the client.
+
+        Returns:
+            Exit code of the scan.
+        """
+        start_time = time.time()
+        orig_path = os.getcwd()
+        stderr = ReplyStream(reply, "stderr")
+        handler = logging.StreamHandler(stderr)
+        handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+        logging.root.addHandler(handler)
+        try:
+            with redirect_stdout(ReplyStream(reply, "stdout")):
+                with redirect_stderr(stderr):
+                    os.chdir(message["cwd"])
+                    argv = [str(arg) for arg in message["args"]]
+                    user_paths = self.args.get_user_paths(argv)
+                    if [
+                        os.path.abspath(path) for path in user_paths
+                    ] != self.user_paths:
+                        logging.error(
+                            "User paths differ from the ones the server was started "
+                            "with. Restart the server to change them."
+                        )
+                        return ERROR_EXIT_CODE
+                    parsed_args = self.args.get_args(argv)
+                    Statick.set_logging_level(parsed_args)
+                    self.load_config(parsed_args)
+                    self.reset()
+                    return self.scan(self.statick, parsed_args, start_time)
+        except SystemExit as ex:
+            # Raised by argparse for --help and invalid arguments.
+            return ex.code if isinstance(ex.code, int) else ERROR_EXIT_CODE
+        except (OSError, KeyError, TypeError) as ex:
+            logging.error("Invalid scan request: %s", ex)
+            return ERROR_EXIT_CODE
+        finally:
+            logging.root.removeHandler(handler)
+            os.chdir(orig_path)
+
+    def serve(self, socket_path: str) -> None:
+        """Scan packages for clients until interrupted.
+
+        Requests are handled one at a time, since scans change the current directory.
+
+        Args:
+            socket_path: Unix socket to listen on.
+        """
+        server = self
+
+        class RequestHandler(socketserver.StreamRequestHandler):
+            """Read a request and stream the replies back."""
+
+            def handle(self) -> None:
+                """Handle a request."""
+
+                def reply(data: dict[str, Any]) -> None:
+                    self.wfile.write((json.dumps(data) + "\n").encode("utf8"))
+                    self.wfile.flush()
+
+                try:
+                    line = self.rfile.readline()
+                    if not line.strip():
+                        return
+                    message = json.loads(line)
+                    exit_code = server.handle(message, reply)
+                    reply({"exit": exit_code})
+                except ValueError as ex:
+                    logging.warning("Invalid scan request: %s", ex)
+                except OSError as ex:
+                    logging.warning("Client went away: %s", ex)
+
+        if os.path.exists(socket_path):
+            if is_server_running(socket_path):
+                logging.error("A Statick server is already running at %s.", socket_path)
+                return
+            os.remove(socket_path)
+        with socketserver.UnixStreamServer(
+            socket_path, RequestHandler
+        ) as socket_server:
+            # Scans run tools on any path given, so only allow the owner to connect.
+            os.chmod(socket_path, 0o600)
+            self.socket_server = socket_server
+            logging.info("Statick server listening on %s", socket_path)
+            try:
+                socket_server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                self.socket_server = None
+                if os.path.exists(socket_path):
+                    os.remove(socket_path)
+
+    def shutdown(self) -> None:
+        """Stop serving, from another thread."""
+        if self.socket_server is not None:
+            self.socket_server.shutdown()
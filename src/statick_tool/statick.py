@@ -2,11 +2,16 @@
 """Executable script for running Statick against one or more packages."""
 
 import argparse
+import contextlib
+import logging
+import os
 import sys
+import tempfile
 import time
 
 from tabulate import tabulate
 
+from statick_tool import lsp, server, watch
 from statick_tool.args import Args
 from statick_tool.statick_tool import Statick
 
@@ -35,22 +40,51 @@ def run(
     return success
 
 
-def main() -> None:  # pragma: no cover
-    """Run Statick."""
-    start_time: float = time.time()
+def get_args() -> Args:  # pragma: no cover
+    """Get the arguments of the statick command, without plugin arguments.
+
+    Returns:
+        Argument handling for the statick command.
+    """
     args = Args("Statick tool")
-    args.parser.add_argument("path", help="Path of package or workspace to scan")
+    args.parser.add_argument(
+        "path",
+        help="Path of package or workspace to scan. Use ./serve or ./lsp for a "
+        "directory with the name of a command",
+    )
+    args.parser.add_argument(
+        "--server",
+        dest="server",
+        type=str,
+        help="Unix socket of a Statick server started with `statick serve` to run "
+        "the scan in",
+    )
+    return args
+
+
+def scan(
+    statick: Statick, parsed_args: argparse.Namespace, start_time: float
+) -> int:  # pragma: no cover
+    """Scan with Statick set up and report the results.
 
-    statick = Statick(args.get_user_paths())
-    statick.gather_args(args.parser)
-    parsed_args = args.get_args()
-    statick.set_logging_level(parsed_args)
-    statick.get_config(parsed_args)
-    statick.get_exceptions(parsed_args)
+    Args:
+        statick: Statick object with configuration and exceptions loaded.
+        parsed_args: Arguments from the command line.
+        start_time: Start time of the scan.
 
+    Returns:
+        Exit code of the scan.
+    """
     if parsed_args.show_all_tool_versions:
         success = statick.collect_tool_versions(parsed_args)
+    elif parsed_args.watch:
+        success = watch.Watcher(statick, parsed_args).run(start_time)
     elif parsed_args.workspace:
+        if parsed_args.in_process:
+            logging.warning(
+                "--in-process is not used for workspaces, since packages are scanned "
+                "in separate processes."
+            )
         _, success = statick.run_workspace(parsed_args, start_time)
     else:
         success = run(statick, parsed_args, start_time)
@@ -65,10 +99,125 @@ def main() -> None:  # pragma: no cover
 
     if parsed_args.check and not success:
         statick.print_exit_status(False)
-        sys.exit(1)
-    else:
-        statick.print_exit_status(True)
-        sys.exit(0)
+        return 1
+    statick.print_exit_status(True)
+    return 0
+
+
+def serve(argv: list[str]) -> None:  # pragma: no cover
+    """Run a Statick server.
+
+    Args:
+        argv: Arguments of the serve command.
+    """
+    parser = argparse.ArgumentParser(
+        prog="statick serve",
+        description="Scan packages for clients using `statick --server`, with plugins "
+        "and configuration kept loaded between scans",
+    )
+    parser.add_argument(
+        "--socket",
+        dest="socket",
+        type=os.path.abspath,
+        default=".statick.sock",
+        help="Unix socket to listen on",
+    )
+    parser.add_argument(
+        "--user-paths",
+        "-u",
+        dest="user_paths",
+        type=str,
+        help="Comma separated list of paths containing configuration or plugins",
+    )
+    parser.add_argument(
+        "--log",
+        dest="log_level",
+        type=str,
+        default="WARNING",
+        help="Verbosity level of output to show (DEBUG, INFO, WARNING, ERROR"
+        ", CRITICAL)",
+    )
+    serve_args = parser.parse_args(argv)
+    Statick.set_logging_level(serve_args)
+
+    args = get_args()
+    user_paths_args = []
+    if serve_args.user_paths is not None:
+        user_paths_args = ["--user-paths", serve_args.user_paths]
+    statick = Statick(args.get_user_paths(user_paths_args))
+    statick.gather_args(args.parser)
+    server.Server(statick, args, scan).serve(serve_args.socket)
+
+
+def serve_lsp(argv: list[str]) -> None:  # pragma: no cover
+    """Run a language server for editors on standard input and output.
+
+    Args:
+        argv: Arguments of the lsp command, the same as for a scan.
+    """
+    args = Args("Statick language server")
+    args.parser.add_argument(
+        "path",
+        nargs="?",
+        help="Package to lint files of, if the editor does not send workspace folders",
+    )
+    args.parser.add_argument(
+        "--debounce",
+        dest="debounce",
+        type=float,
+        default=0.2,
+        help="Seconds to wait after a file is saved before linting it",
+    )
+    statick = Statick(args.get_user_paths(argv))
+    statick.gather_args(args.parser)
+    parsed_args = args.get_args(argv)
+    statick.set_logging_level(parsed_args)
+    statick.get_config(parsed_args)
+    statick.get_exceptions(parsed_args)
+
+    roots = [os.path.abspath(parsed_args.path or os.getcwd())]
+    with tempfile.TemporaryDirectory(prefix="statick-lsp-") as tmp_dir:
+        # Keep tool output and build files out of the packages being edited.
+        if not parsed_args.output_directory:
+            parsed_args.output_directory = tmp_dir
+        server_output = sys.stdout.buffer
+        # Messages are sent on standard output, so anything printed goes to stderr.
+        with contextlib.redirect_stdout(sys.stderr):
+            linter = lsp.Linter(statick, parsed_args)
+            lsp.LanguageServer(linter, roots, parsed_args.debounce).serve(
+                sys.stdin.buffer, server_output
+            )
+
+
+def main() -> None:  # pragma: no cover
+    """Run Statick."""
+    start_time: float = time.time()
+    if sys.argv[1:2] == ["serve"]:
+        serve(sys.argv[2:])
+        return
+    if sys.argv[1:2] == ["lsp"]:
+        serve_lsp(sys.argv[2:])
+        return
+
+    socket_path, argv = server.get_server(sys.argv[1:])
+    if socket_path is not None:
+        sys.exit(server.request(socket_path, argv))
+
+    args = get_args()
+    statick = Statick(args.get_user_paths())
+    statick.gather_args(args.parser)
+    parsed_args = args.get_args()
+    statick.set_logging_level(parsed_args)
+    statick.get_config(parsed_args)
+    statick.get_exceptions(parsed_args)
+    # Each tool runs once in a single scan, so worker processes would not be reused.
+    if parsed_args.in_process and not parsed_args.watch:
+        logging.warning(
+            "--in-process is only used by statick serve, statick lsp and --watch."
+        )
+        parsed_args.in_process = False
+
+    sys.exit(scan(statick, parsed_args, start_time))
 
 
 if __name__ == "__main__":  # pragma: no cover
@@ -1,5 +1,7 @@
 """Code analysis front-end."""
 
+# pylint: disable=too-many-lines
+
 import argparse
 import copy
 import io
@@ -8,10 +10,14 @@ import multiprocessing
 import os
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from importlib.metadata import version
 from logging.handlers import MemoryHandler
 from typing import Any, Optional, Tuple
 
+from tabulate import tabulate
+
+from statick_tool import file_subset, workspace_tools
 from statick_tool.config import Config
 from statick_tool.discovery_plugin import DiscoveryPlugin
 from statick_tool.exceptions import Exceptions
@@ -29,9 +35,13 @@ else:
     from importlib.metadata import entry_points
 
 
-class Statick:  # pylint: disable=too-many-instance-attributes
+class Statick:  # pylint: disable=too-many-instance-attributes, too-many-public-methods
     """Code analysis front-end."""
 
+    # Files marking a directory of a workspace as a package, or as ignored.
+    PACKAGE_INDICATORS = ["package.xml", "setup.py", "pyproject.toml"]
+    IGNORE_FILES = ["AMENT_IGNORE", "CATKIN_IGNORE", "COLCON_IGNORE"]
+
     def __init__(self, user_paths: list[str]) -> None:
         """Initialize Statick.
 
@@ -63,6 +73,10 @@ class Statick:  # pylint: disable=too-many-instance-attributes
         self.exceptions: Optional[Exceptions] = None
         self.timings: list[Timing] = []
         self.tool_versions: list[ToolVersion] = []
+        self.missing_tools: dict[str, list[str]] = {}
+        self.discovered_packages: dict[str, Package] = {}
+        self.workspace_issues: dict[str, dict[str, list[Issue]]] = {}
+        self.profiles: dict[Tuple[str, int], Profile] = {}
 
     @staticmethod
     def set_logging_level(args: argparse.Namespace) -> None:
@@ -214,6 +228,27 @@ class Statick:  # pylint: disable=too-many-instance-attributes
             type=str,
             help="Force only the given list of tools to run",
         )
+        args.add_argument(
+            "--files",
+            dest="files",
+            type=file_subset.parse_files,
+            help="Comma-separated list of files to scan. Only tools that scan single "
+            "files are run",
+        )
+        args.add_argument(
+            "--watch",
+            dest="watch",
+            action="store_true",
+            help="Scan the package again whenever its files change, running only the "
+            "tools affected by the change",
+        )
+        args.add_argument(
+            "--watch-interval",
+            dest="watch_interval",
+            type=float,
+            default=1.0,
+            help="Seconds between checks for changed files in watch mode",
+        )
         args.add_argument(
             "--version",
             action="version",
@@ -231,6 +266,13 @@ class Statick:  # pylint: disable=too-many-instance-attributes
             dest="show_run_tool_versions",
             help="Show versions of tools that are run at current level.",
         )
+        args.add_argument(
+            "--tool-versions-timeout",
+            dest="tool_versions_timeout",
+            type=float,
+            default=30.0,
+            help="Seconds to wait for each tool version to be found",
+        )
         args.add_argument(
             "--mapping-file-suffix",
             dest="mapping_file_suffix",
@@ -243,6 +285,34 @@ class Statick:  # pylint: disable=too-many-instance-attributes
             action="store_true",
             help="Enable printing timing information to stdout",
         )
+        args.add_argument(
+            "--cache-dir",
+            dest="cache_dir",
+            type=os.path.abspath,
+            help="Directory where plugins can keep results between runs",
+        )
+        args.add_argument(
+            "--in-process",
+            dest="in_process",
+            action="store_true",
+            help="Run Python tools in persistent worker processes instead of "
+            "starting a new interpreter for every run. Only used by statick serve, "
+            "statick lsp and --watch, and not for workspaces",
+        )
+        args.add_argument(
+            "--structured-output",
+            dest="structured_output",
+            action="store_true",
+            help="Have tools report results as JSON or XML instead of text where "
+            "supported",
+        )
+        args.add_argument(
+            "--stream-output",
+            dest="stream_output",
+            action="store_true",
+            help="Parse tool output as it is produced instead of collecting it first, "
+            "where supported",
+        )
 
         # Statick workspace arguments.
         args.add_argument(
@@ -272,6 +342,13 @@ class Statick:  # pylint: disable=too-many-instance-attributes
             action="store_true",
             help="List packages and levels, only used when running on a workspace",
         )
+        args.add_argument(
+            "--workspace-coalesce",
+            dest="workspace_coalesce",
+            action="store_true",
+            help="Run package-agnostic tools once over the files of all packages, "
+            "only used when running on a workspace",
+        )
 
         for _, plugin in list(self.discovery_plugins.items()):
             plugin.gather_args(args)
@@ -305,7 +382,10 @@ class Statick:  # pylint: disable=too-many-instance-attributes
             logging.error("Could not find profile file %s!", profile_filename)
             return None
         try:
-            profile = Profile(profile_resource)
+            key = (profile_resource, os.stat(profile_resource).st_mtime_ns)
+            if key not in self.profiles:
+                self.profiles[key] = Profile(profile_resource)
+            profile = self.profiles[key]
         except OSError as ex:
             # This isn't quite redundant with the profile_resource check: it's possible
             # that something else triggers an OSError, like permissions.
@@ -390,12 +470,198 @@ class Statick:  # pylint: disable=too-many-instance-attributes
 
         plugin_context = PluginContext(args, self.resources, self.config)
 
-        for plugin_name, plugin in list(self.tool_plugins.items()):
+        for plugin in self.tool_plugins.values():
             plugin.set_plugin_context(plugin_context)
-            self.add_tool_version(plugin_name, plugin.get_version())
+
+        # Finding versions is mostly waiting on other processes, so use threads.
+        max_workers = 1
+        if "max_procs" in args and args.max_procs:
+            max_workers = max(1, args.max_procs)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            versions = list(
+                executor.map(
+                    lambda plugin: plugin.get_cached_version(),
+                    self.tool_plugins.values(),
+                )
+            )
+        for plugin_name, tool_version in zip(self.tool_plugins, versions):
+            self.add_tool_version(plugin_name, tool_version)
 
         return success
 
+    def check_tools(self, level: str, plugin_context: PluginContext) -> list[str]:
+        """Find the enabled tools that are not installed.
+
+        The tools enabled at a level, and the tools they depend on, are looked up in
+        parallel once before any package is scanned. A table of the tool status is
+        logged and missing tools are reported once.
+
+        Args:
+            level: Level to check the enabled tools of.
+            plugin_context: Context to give the tool plugins.
+
+        Returns:
+            Names of the tools that are not installed.
+        """
+        if level in self.missing_tools:
+            return self.missing_tools[level]
+
+        enabled_plugins: list[str] = []
+        if self.config is not None:
+            enabled_plugins = self.config.get_enabled_tool_plugins(level)
+        if not enabled_plugins:
+            enabled_plugins = list(self.tool_plugins)
+        plugin_names: list[str] = []
+        while enabled_plugins:
+            plugin_name = enabled_plugins.pop(0)
+            if plugin_name in plugin_names or plugin_name not in self.tool_plugins:
+                continue
+            plugin_names.append(plugin_name)
+            enabled_plugins += self.tool_plugins[plugin_name].get_tool_dependencies()
+
+        def is_available(plugin_name: str) -> bool:
+            plugin = self.tool_plugins[plugin_name]
+            plugin.set_plugin_context(plugin_context)
+            return bool(plugin.is_available(level))
+
+        max_workers = 1
+        if "max_procs" in plugin_context.args and plugin_context.args.max_procs:
+            max_workers = max(1, plugin_context.args.max_procs)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            available = list(executor.map(is_available, plugin_names))
+
+        status = [
+            [
+                name,
+                self.tool_plugins[name].get_binary(level),
+                "Available" if ok else "Missing",
+            ]
+            for name, ok in zip(plugin_names, available)
+        ]
+        table = tabulate(status, headers=["Tool", "Binary", "Status"])
+        logging.info("Tools at level %s:\n%s", level, table)
+        missing_tools = [name for name, ok in zip(plugin_names, available) if not ok]
+        for plugin_name in missing_tools:
+            logging.warning("%s is not installed and can't be run.", plugin_name)
+
+        self.missing_tools[level] = missing_tools
+        return missing_tools
+
+    def run_discovery(
+        self, package: Package, level: str, plugin_context: PluginContext
+    ) -> bool:
+        """Run the enabled discovery plugins on a package.
+
+        Args:
+            package: Package to discover files in.
+            level: Level at which to run discovery.
+            plugin_context: Context to give the discovery plugins.
+
+        Returns:
+            True if all discovery plugins were found.
+        """
+        assert self.config is not None
+        logging.info("---Discovery---")
+        if not DiscoveryPlugin.file_command_exists():
+            logging.info(
+                "file command isn't available, discovery plugins will be less effective"
+            )
+
+        discovery_plugins = self.config.get_enabled_discovery_plugins(level)
+        if not discovery_plugins:
+            discovery_plugins = list(self.discovery_plugins)
+        # Get timing information for finding files for discovery plugins.
+        dummy_plugin = DiscoveryPlugin()
+        plugin_start = time.time()
+        if "files" in plugin_context.args and plugin_context.args.files is not None:
+            file_subset.find_files(package, plugin_context.args.files)
+        dummy_plugin.find_files(package)
+        duration = format(time.time() - plugin_start, ".4f")
+        timing = Timing(package.name, "find files", "Discovery", duration)
+        self.timings.append(timing)
+
+        plugins_ran: list[Any] = []
+        for plugin_name in discovery_plugins:
+            if plugin_name not in self.discovery_plugins:
+                logging.error("Can't find specified discovery plugin %s!", plugin_name)
+                return False
+
+            plugin = self.discovery_plugins[plugin_name]
+            dependencies = plugin.get_discovery_dependencies()
+            for dependency_name in dependencies:
+                dependency_plugin = self.discovery_plugins[dependency_name]
+                if dependency_plugin.get_name() in plugins_ran:
+                    continue
+                dependency_plugin.set_plugin_context(plugin_context)
+                logging.info(
+                    "Running %s discovery plugin...", dependency_plugin.get_name()
+                )
+                plugin_start = time.time()
+                dependency_plugin.scan(package, level, self.exceptions)
+                duration = format(time.time() - plugin_start, ".4f")
+                timing = Timing(
+                    package.name, dependency_plugin.get_name(), "Discovery", duration
+                )
+                self.timings.append(timing)
+                logging.info("%s discovery plugin done.", dependency_plugin.get_name())
+                plugins_ran.append(dependency_plugin.get_name())
+
+            if plugin.get_name() not in plugins_ran:
+                plugin.set_plugin_context(plugin_context)
+                logging.info("Running %s discovery plugin...", plugin.get_name())
+                plugin_start = time.time()
+                plugin.scan(package, level, self.exceptions)
+                duration = format(time.time() - plugin_start, ".4f")
+                timing = Timing(package.name, plugin.get_name(), "Discovery", duration)
+                self.timings.append(timing)
+                logging.info("%s discovery plugin done.", plugin.get_name())
+                plugins_ran.append(plugin.get_name())
+        logging.info("---Discovery---")
+        return True
+
+    def run_reporting(
+        self,
+        package: Package,
+        issues: dict[str, list[Issue]],
+        level: str,
+        plugin_context: PluginContext,
+    ) -> bool:
+        """Run the enabled reporting plugins on the issues of a package.
+
+        Args:
+            package: Package the issues were found in.
+            issues: Issues found by each tool.
+            level: Level the package was scanned at.
+            plugin_context: Context to give the reporting plugins.
+
+        Returns:
+            True if all reporting plugins were found.
+        """
+        assert self.config is not None
+        logging.info("---Reporting---")
+        reporting_plugins = self.config.get_enabled_reporting_plugins(level)
+        if not reporting_plugins:
+            if "print_to_console" in self.reporting_plugins:
+                reporting_plugins = ["print_to_console"]
+            else:
+                reporting_plugins = list(self.reporting_plugins)
+        for plugin_name in reporting_plugins:
+            if plugin_name not in self.reporting_plugins:
+                logging.error("Can't find specified reporting plugin %s!", plugin_name)
+                return False
+
+            plugin = self.reporting_plugins[plugin_name]
+            plugin.set_plugin_context(plugin_context)
+            logging.info("Running %s reporting plugin...", plugin.get_name())
+            plugin_start = time.time()
+            plugin.report(package, issues, level)
+            duration = format(time.time() - plugin_start, ".4f")
+            timing = Timing(package.name, plugin.get_name(), "Reporting", duration)
+            self.timings.append(timing)
+            logging.info("%s reporting plugin done.", plugin.get_name())
+        logging.info("---Reporting---")
+        return True
+
     # pylint: disable=too-many-locals, too-many-return-statements, too-many-branches
     # pylint: disable=too-many-statements
     def run(
@@ -474,68 +740,21 @@ class Statick:  # pylint: disable=too-many-instance-attributes
 
         plugin_context = PluginContext(args, self.resources, self.config)
 
-        logging.info("---Discovery---")
-        if not DiscoveryPlugin.file_command_exists():
-            logging.info(
-                "file command isn't available, discovery plugins will be less effective"
-            )
-
-        discovery_plugins = self.config.get_enabled_discovery_plugins(level)
-        if not discovery_plugins:
-            discovery_plugins = list(self.discovery_plugins)
-        # Get timing information for finding files for discovery plugins.
-        dummy_plugin = DiscoveryPlugin()
-        plugin_start = time.time()
-        dummy_plugin.find_files(package)
-        duration = format(time.time() - plugin_start, ".4f")
-        timing = Timing(package.name, "find files", "Discovery", duration)
-        self.timings.append(timing)
-
-        plugins_ran: list[Any] = []
-        for plugin_name in discovery_plugins:
-            if plugin_name not in self.discovery_plugins:
-                logging.error("Can't find specified discovery plugin %s!", plugin_name)
-                return None, False
-
-            plugin = self.discovery_plugins[plugin_name]
-            dependencies = plugin.get_discovery_dependencies()
-            for dependency_name in dependencies:
-                dependency_plugin = self.discovery_plugins[dependency_name]
-                if dependency_plugin.get_name() in plugins_ran:
-                    continue
-                dependency_plugin.set_plugin_context(plugin_context)
-                logging.info(
-                    "Running %s discovery plugin...", dependency_plugin.get_name()
-                )
-                plugin_start = time.time()
-                dependency_plugin.scan(package, level, self.exceptions)
-                duration = format(time.time() - plugin_start, ".4f")
-                timing = Timing(
-                    package.name, dependency_plugin.get_name(), "Discovery", duration
-                )
-                self.timings.append(timing)
-                logging.info("%s discovery plugin done.", dependency_plugin.get_name())
-                plugins_ran.append(dependency_plugin.get_name())
-
-            if plugin.get_name() not in plugins_ran:
-                plugin.set_plugin_context(plugin_context)
-                logging.info("Running %s discovery plugin...", plugin.get_name())
-                plugin_start = time.time()
-                plugin.scan(package, level, self.exceptions)
-                duration = format(time.time() - plugin_start, ".4f")
-                timing = Timing(package.name, plugin.get_name(), "Discovery", duration)
-                self.timings.append(timing)
-                logging.info("%s discovery plugin done.", plugin.get_name())
-                plugins_ran.append(plugin.get_name())
-        logging.info("---Discovery---")
+        if path in self.discovered_packages:
+            package = self.discovered_packages[path]
+        elif not self.run_discovery(package, level, plugin_context):
+            return None, False
 
         logging.info("---Tools---")
+        missing_tools = self.check_tools(level, plugin_context)
         enabled_plugins = self.config.get_enabled_tool_plugins(level)
         if not enabled_plugins:
             enabled_plugins = list(self.tool_plugins)
         plugins_to_run = copy.copy(enabled_plugins)
         plugins_ran = []
         plugin_dependencies: list[str] = []
+        # Tools that are not installed, and the tools depending on them, can't run.
+        unavailable_plugins = set(missing_tools)
         while plugins_to_run:
             plugin_name = plugins_to_run[0]
 
@@ -556,6 +775,18 @@ class Statick:  # pylint: disable=too-many-instance-attributes
             plugin = self.tool_plugins[plugin_name]
             plugin.set_plugin_context(plugin_context)
 
+            if (
+                "files" in args
+                and args.files is not None
+                and not plugin.supports_file_subset()
+            ):
+                logging.info(
+                    "Skipping %s tool plugin, it can't scan single files.", plugin_name
+                )
+                plugins_to_run.remove(plugin_name)
+                plugins_ran.append(plugin_name)
+                continue
+
             dependencies = plugin.get_tool_dependencies()
             dependencies_met = True
             for dependency_name in dependencies:
@@ -576,13 +807,41 @@ class Statick:  # pylint: disable=too-many-instance-attributes
             if not dependencies_met:
                 continue
 
+            unavailable_dependencies = [
+                name for name in dependencies if name in unavailable_plugins
+            ]
+            if plugin_name in missing_tools or unavailable_dependencies:
+                if plugin_name in missing_tools:
+                    logging.error(
+                        "%s tool plugin failed, it is not installed.", plugin_name
+                    )
+                else:
+                    logging.error(
+                        "%s tool plugin failed, it depends on %s which can't run.",
+                        plugin_name,
+                        ", ".join(unavailable_dependencies),
+                    )
+                unavailable_plugins.add(plugin_name)
+                success = False
+                plugins_to_run.remove(plugin_name)
+                plugins_ran.append(plugin_name)
+                continue
+
+            if plugin_name in self.workspace_issues.get(path, {}):
+                logging.info("Using workspace results of %s tool plugin.", plugin_name)
+                issues[plugin_name] = self.workspace_issues[path][plugin_name]
+                self.add_tool_version(plugin_name, plugin.get_cached_version())
+                plugins_to_run.remove(plugin_name)
+                plugins_ran.append(plugin_name)
+                continue
+
             logging.info("Running %s tool plugin...", plugin.get_name())
             plugin_start = time.time()
             tool_issues = plugin.scan(package, level)
             duration = format(time.time() - plugin_start, ".4f")
             timing = Timing(package.name, plugin.get_name(), "Tool", duration)
             self.timings.append(timing)
-            self.add_tool_version(plugin.get_name(), plugin.get_version())
+            self.add_tool_version(plugin.get_name(), plugin.get_cached_version())
             if tool_issues is not None:
                 issues[plugin_name] = tool_issues
                 logging.info("%s tool plugin done.", plugin.get_name())
@@ -600,28 +859,8 @@ class Statick:  # pylint: disable=too-many-instance-attributes
 
         os.chdir(orig_path)
 
-        logging.info("---Reporting---")
-        reporting_plugins = self.config.get_enabled_reporting_plugins(level)
-        if not reporting_plugins:
-            if "print_to_console" in self.reporting_plugins:
-                reporting_plugins = ["print_to_console"]
-            else:
-                reporting_plugins = list(self.reporting_plugins)
-        for plugin_name in reporting_plugins:
-            if plugin_name not in self.reporting_plugins:
-                logging.error("Can't find specified reporting plugin %s!", plugin_name)
-                return None, False
-
-            plugin = self.reporting_plugins[plugin_name]
-            plugin.set_plugin_context(plugin_context)
-            logging.info("Running %s reporting plugin...", plugin.get_name())
-            plugin_start = time.time()
-            plugin.report(package, issues, level)
-            duration = format(time.time() - plugin_start, ".4f")
-            timing = Timing(package.name, plugin.get_name(), "Reporting", duration)
-            self.timings.append(timing)
-            logging.info("%s reporting plugin done.", plugin.get_name())
-        logging.info("---Reporting---")
+        if not self.run_reporting(package, issues, level, plugin_context):
+            return None, False
 
         if start_time is not None:
             duration = format(time.time() - start_time, ".4f")
@@ -657,8 +896,8 @@ class Statick:  # pylint: disable=too-many-instance-attributes
                     return None, False
 
         ignore_packages = self.get_ignore_packages()
-        ignore_files = ["AMENT_IGNORE", "CATKIN_IGNORE", "COLCON_IGNORE"]
-        package_indicators = ["package.xml", "setup.py", "pyproject.toml"]
+        ignore_files = self.IGNORE_FILES
+        package_indicators = self.PACKAGE_INDICATORS
 
         packages = []
         for root, dirs, files in os.walk(parsed_args.path):
@@ -699,6 +938,20 @@ class Statick:  # pylint: disable=too-many-instance-attributes
                 )
             return None, True
 
+        # Check the tools once for the workspace instead of in every package.
+        if self.config is not None:
+            plugin_context = PluginContext(parsed_args, self.resources, self.config)
+            levels = {self.get_level(package.path, parsed_args) for package in packages}
+            for package_level in sorted(level for level in levels if level):
+                if package_level == self.default_level or self.config.has_level(
+                    package_level
+                ):
+                    self.check_tools(package_level, plugin_context)
+
+        workspace_timings: list[Timing] = []
+        if parsed_args.workspace_coalesce and self.config is not None:
+            workspace_timings = self.scan_workspace_tools(parsed_args, packages)
+
         count = 0
         total_issues: list[Any] = []
         num_packages = len(packages)
@@ -732,6 +985,7 @@ class Statick:  # pylint: disable=too-many-instance-attributes
                     self.timings.append(timing)
                     break
 
+        self.timings += workspace_timings
         logging.info("-- All packages run --")
         logging.info("-- overall report --")
 
@@ -788,6 +1042,121 @@ class Statick:  # pylint: disable=too-many-instance-attributes
 
         return issues, success
 
+    def discover_package(
+        self, parsed_args: argparse.Namespace, package: Package
+    ) -> Tuple[Optional[Package], Optional[str], list[Timing]]:
+        """Run discovery on a workspace package ahead of scanning it.
+
+        Discovery runs in the output directory of the package, like it does when the
+        package is scanned. Files already found in the package are not looked for
+        again.
+
+        Args:
+            parsed_args: Parsed arguments from command line.
+            package: Package to discover files in.
+
+        Returns:
+            The discovered package, its level and the discovery timings.
+        """
+        path = os.path.abspath(package.path)
+        walked = package._walked  # pylint: disable=protected-access
+        files = package.files
+        package = Package(os.path.basename(path), path)
+        package.files = files
+        package._walked = walked  # pylint: disable=protected-access
+        level = self.get_level(path, parsed_args)
+        if level is None or self.config is None:
+            return None, level, []
+        if level != self.default_level and not self.config.has_level(level):
+            return None, level, []
+        num_timings = len(self.timings)
+        orig_path = os.getcwd()
+        try:
+            if parsed_args.output_directory:
+                output_dir = os.path.join(
+                    parsed_args.output_directory, package.name + "-" + level
+                )
+                os.makedirs(output_dir, exist_ok=True)
+                os.chdir(output_dir)
+            plugin_context = PluginContext(parsed_args, self.resources, self.config)
+            if not self.run_discovery(package, level, plugin_context):
+                return None, level, []
+        except OSError as ex:
+            logging.warning("Unable to run discovery on %s: %s", package.name, ex)
+            return None, level, []
+        finally:
+            os.chdir(orig_path)
+        return package, level, self.timings[num_timings:]
+
+    def scan_workspace_tools(
+        self, parsed_args: argparse.Namespace, packages: list[Package]
+    ) -> list[Timing]:
+        """Run package-agnostic tools once over the files of all packages.
+
+        All packages are discovered first, and the discovered files are reused when
+        each package is scanned. Each tool's issues are routed to the packages owning
+        the files, and used instead of running the tool in every package. Tools that
+        fail here are run in each package as usual.
+
+        Args:
+            parsed_args: Parsed arguments from command line.
+            packages: Packages in the workspace.
+
+        Returns:
+            Timings of discovery and of the tools.
+        """
+        mp_args = [(parsed_args, package) for package in packages]
+        if multiprocessing.get_start_method() == "fork":
+            with multiprocessing.Pool(parsed_args.max_procs) as pool:
+                results = pool.starmap(self.discover_package, mp_args)
+        else:
+            results = [self.discover_package(*args) for args in mp_args]
+
+        timings: list[Timing] = []
+        levels: dict[str, list[Package]] = {}
+        for package, level, package_timings in results:
+            timings += package_timings
+            if package is not None and level is not None:
+                self.discovered_packages[package.path] = package
+                levels.setdefault(level, []).append(package)
+
+        assert self.config is not None
+        plugin_context = PluginContext(parsed_args, self.resources, self.config)
+        for level, level_packages in sorted(levels.items()):
+            plugin_names = self.config.get_enabled_tool_plugins(level)
+            for plugin in workspace_tools.get_plugins(
+                self.tool_plugins,
+                plugin_names or list(self.tool_plugins),
+                self.missing_tools.get(level, []),
+                parsed_args.force_tool_list,
+            ):
+                plugin_name = plugin.get_name()
+                output_dir = None
+                if parsed_args.output_directory:
+                    output_dir = os.path.join(
+                        parsed_args.output_directory, "all_packages-" + level
+                    )
+                plugin.set_plugin_context(plugin_context)
+                logging.info(
+                    "Running %s tool plugin on %d packages...",
+                    plugin_name,
+                    len(level_packages),
+                )
+                plugin_start = time.time()
+                routed = workspace_tools.scan(plugin, level_packages, level, output_dir)
+                duration = format(time.time() - plugin_start, ".4f")
+                timings.append(Timing("all_packages", plugin_name, "Tool", duration))
+                if routed is None:
+                    logging.warning(
+                        "%s tool plugin failed on the workspace, running it in each "
+                        "package instead.",
+                        plugin_name,
+                    )
+                    continue
+                for path, issues in routed.items():
+                    self.workspace_issues.setdefault(path, {})[plugin_name] = issues
+        return timings
+
     def scan_package(
         self,
         parsed_args: argparse.Namespace,
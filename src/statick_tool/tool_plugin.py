@@ -1,24 +1,33 @@
 """Tool plugin."""
 
 import argparse
+import collections
+import hashlib
+import json
 import logging
 import os
 import re
 import shlex
 import subprocess
-from typing import Any, Match, Optional, Pattern, Union
+import threading
+from contextlib import ExitStack
+from typing import Any, Iterator, Match, Optional, Pattern, Tuple, Union
 
+from statick_tool import in_process, version_cache
 from statick_tool.issue import Issue
 from statick_tool.package import Package
 from statick_tool.plugin_context import PluginContext
 
 
-class ToolPlugin:
+class ToolPlugin:  # pylint: disable=too-many-public-methods
     """Default implementation of tool plugin."""
 
     plugin_context = None
     TOOL_MISSING_STR = "Not installed"
     TOOL_UNKNOWN_STR = "Unknown"
+    STREAM_TAIL_LINES = 100
+    _COMMAND_CACHE: dict[Tuple[str, str, str], bool] = {}
+    _COMMAND_CACHE_LOCK = threading.Lock()
 
     def get_name(self) -> str:  # type: ignore[empty-body]
         """Get name of tool.
@@ -80,14 +89,33 @@ class ToolPlugin:
 
         try:
             output = subprocess.check_output(
-                [tool_bin, "--version"], stderr=subprocess.STDOUT
+                [tool_bin, "--version"],
+                stderr=subprocess.STDOUT,
+                timeout=self.get_version_timeout(),
             )
             return output.decode("utf-8")
         except subprocess.CalledProcessError:  # NOLINT
             return self.TOOL_UNKNOWN_STR
+        except subprocess.TimeoutExpired:  # NOLINT
+            logging.warning("Timed out getting %s version.", self.get_name())
+            return self.TOOL_UNKNOWN_STR
         except FileNotFoundError:  # NOLINT
             return self.TOOL_MISSING_STR
 
+    def get_version_timeout(self) -> Optional[float]:
+        """Get the number of seconds to wait for the version of the tool.
+
+        Returns:
+            Timeout in seconds, or None to wait as long as it takes.
+        """
+        if (
+            self.plugin_context is None
+            or "tool_versions_timeout" not in self.plugin_context.args
+            or not self.plugin_context.args.tool_versions_timeout
+        ):
+            return None
+        return float(self.plugin_context.args.tool_versions_timeout)
+
     def get_version_from_pkg(self, subproc_args: list[str], ver_re_str: str) -> str:
         """Figure out and return the version of the tool that's installed.
 
@@ -102,19 +130,13 @@ class ToolPlugin:
         """
         version = self.TOOL_MISSING_STR
 
-        try:
-            output = subprocess.check_output(
-                subproc_args,
-                stderr=subprocess.STDOUT,
-                universal_newlines=True,
-            )
-        except subprocess.CalledProcessError:  # NOLINT
-            return self.TOOL_UNKNOWN_STR
-        except FileNotFoundError:  # NOLINT
+        # The package list is shared by all tools installed by the package manager.
+        lines = version_cache.query(subproc_args, self.get_version_timeout())
+        if lines is None:
             return self.TOOL_UNKNOWN_STR
 
         parse: Pattern[str] = re.compile(ver_re_str)
-        for line in output.splitlines():
+        for line in lines:
             match: Optional[Match[str]] = parse.match(line)
             if match:
                 return line
@@ -158,15 +180,50 @@ class ToolPlugin:
         if not tool_bin:
             return self.TOOL_UNKNOWN_STR
 
-        ver_re = rf"(.+{tool_bin}.*)@([0-9]*\.?[0-9]+\.?[0-9]+)"
-        version = self.get_version_from_pkg(
-            subproc_args=["npm", "list"], ver_re_str=ver_re
-        )
-        if version in [self.TOOL_MISSING_STR, self.TOOL_UNKNOWN_STR]:
-            # if not found locally, check globally
-            version = self.get_version_from_pkg(
-                subproc_args=["npm", "list", "-g"], ver_re_str=ver_re
-            )
+        version = self.TOOL_UNKNOWN_STR
+        # If not found locally, check globally.
+        for subproc_args in [
+            ["npm", "list", "--json", "--depth=0"],
+            ["npm", "list", "-g", "--json", "--depth=0"],
+        ]:
+            packages = version_cache.query_npm(subproc_args, self.get_version_timeout())
+            if packages is None:
+                continue
+            version = self.TOOL_MISSING_STR
+            for name, package_version in packages.items():
+                if tool_bin in name:
+                    return f"{name}@{package_version}"
+        return version
+
+    def get_cached_version(self) -> str:
+        """Get the version of the tool, reusing earlier results where possible.
+
+        Versions are cached by the resolved path and modification time of the tool
+        binary. If a cache directory is given they are saved there for later runs.
+
+        Returns:
+            Version of the tool that's installed.
+        """
+        tool_bin = self.get_binary()
+        key = None
+        if tool_bin:
+            key = version_cache.get_key(self.get_name(), tool_bin)
+        if key is None:
+            return self.get_version()
+
+        cache_dir = None
+        if (
+            self.plugin_context is not None
+            and "cache_dir" in self.plugin_context.args
+            and self.plugin_context.args.cache_dir is not None
+        ):
+            cache_dir = os.path.abspath(self.plugin_context.args.cache_dir)
+
+        version = version_cache.get_version(key, cache_dir)
+        if version is None:
+            version = self.get_version()
+            if version not in [self.TOOL_MISSING_STR, self.TOOL_UNKNOWN_STR]:
+                version_cache.set_version(key, version, cache_dir)
         return version
 
     def scan(self, package: Package, level: str) -> Optional[list[Issue]]:
@@ -302,6 +359,237 @@ class ToolPlugin:
             flags = list(lex)
         return flags
 
+    def get_num_jobs(self) -> int:
+        """Get the number of parallel jobs a tool is allowed to use.
+
+        Returns:
+            Value of the max-procs argument, or 1 if it is not available.
+        """
+        if (
+            self.plugin_context is None
+            or "max_procs" not in self.plugin_context.args
+            or self.plugin_context.args.max_procs is None
+        ):
+            return 1
+        return max(1, int(self.plugin_context.args.max_procs))
+
+    def get_cache_dir(self, *subdirs: str) -> Optional[str]:
+        """Get a directory where the tool can keep files between runs.
+
+        Args:
+            subdirs: Subdirectories to append below the directory for this tool.
+
+        Returns:
+            Path to the directory, or None if no cache directory was given.
+        """
+        if (
+            self.plugin_context is None
+            or "cache_dir" not in self.plugin_context.args
+            or self.plugin_context.args.cache_dir is None
+        ):
+            return None
+        cache_dir = os.path.join(
+            os.path.abspath(self.plugin_context.args.cache_dir),
+            self.get_name(),
+            *subdirs,
+        )
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+        except OSError as ex:
+            logging.warning("Unable to create cache directory %s: %s", cache_dir, ex)
+            return None
+        return cache_dir
+
+    def get_cache_file(
+        self,
+        package_name: str,
+        level: str,
+        flags: list[str],
+        config_files: list[str],
+    ) -> Optional[str]:
+        """Get a file where the tool can keep its own cache between runs.
+
+        The cache is removed when the tool version, its flags or the contents of its
+        configuration files change, so the tool never reuses results from a different
+        setup.
+
+        Args:
+            package_name: Name of the package being scanned.
+            level: Level at which the package is scanned.
+            flags: Flags the tool is run with.
+            config_files: Configuration files the tool reads.
+
+        Returns:
+            Path to the cache file, or None if no cache directory was given.
+        """
+        cache_dir = self.get_cache_dir(package_name, level)
+        if cache_dir is None:
+            return None
+
+        digest = hashlib.sha256()
+        digest.update(self.get_cached_version().encode("utf8"))
+        digest.update("\0".join(flags).encode("utf8"))
+        for filename in config_files:
+            digest.update(b"\0")
+            try:
+                with open(filename, "rb") as fid:
+                    digest.update(fid.read())
+            except OSError:
+                digest.update(filename.encode("utf8"))
+        fingerprint = digest.hexdigest()
+
+        cache_file = os.path.join(cache_dir, "cache")
+        fingerprint_file = os.path.join(cache_dir, "fingerprint")
+        try:
+            with open(fingerprint_file, encoding="utf8") as fid:
+                if fid.read() == fingerprint:
+                    return cache_file
+        except OSError:
+            pass
+        try:
+            if os.path.exists(cache_file):
+                logging.info("Removing outdated %s cache.", self.get_name())
+                os.remove(cache_file)
+            with open(fingerprint_file, "w", encoding="utf8") as fid:
+                fid.write(fingerprint)
+        except OSError as ex:
+            logging.warning("Unable to reset cache in %s: %s", cache_dir, ex)
+            return None
+        return cache_file
+
+    def check_output(self, subproc_args: list[str]) -> str:
+        """Run a tool and return its output.
+
+        Behaves like `subprocess.check_output` with stderr redirected to stdout. When
+        the in-process option is set and the tool is a Python console script, the tool
+        is run in a persistent worker process instead of a new interpreter.
+
+        Args:
+            subproc_args: Tool command line, starting with the tool binary.
+
+        Returns:
+            The output of the tool.
+
+        Raises:
+            CalledProcessError: The tool exited with a non-zero exit code.
+            OSError: The tool could not be run.
+        """
+        if (
+            self.plugin_context is not None
+            and "in_process" in self.plugin_context.args
+            and self.plugin_context.args.in_process
+        ):
+            output = in_process.check_output(subproc_args, self.get_num_jobs())
+            if output is not None:
+                return output
+        return subprocess.check_output(
+            subproc_args, stderr=subprocess.STDOUT, universal_newlines=True
+        )
+
+    def use_structured_output(self) -> bool:
+        """Check if tools should report results in a structured format.
+
+        Returns:
+            True if the structured output option is set, False otherwise.
+        """
+        return bool(
+            self.plugin_context is not None
+            and "structured_output" in self.plugin_context.args
+            and self.plugin_context.args.structured_output
+        )
+
+    def use_stream_output(self) -> bool:
+        """Check if tool output should be parsed as it is produced.
+
+        Returns:
+            True if the stream output option is set, False otherwise.
+        """
+        return bool(
+            self.plugin_context is not None
+            and "stream_output" in self.plugin_context.args
+            and self.plugin_context.args.stream_output
+        )
+
+    def stream_output(
+        self, subproc_args: list[str], cwd: Optional[str] = None
+    ) -> Iterator[str]:
+        """Run a tool and yield its output one line at a time.
+
+        The combined stdout and stderr of the tool are read from a pipe while it runs
+        and copied to the tool log file, so the output is never held in memory all at
+        once. Only the last lines are kept to report if the tool fails.
+
+        Args:
+            subproc_args: Tool command line, starting with the tool binary.
+            cwd: Directory to run the tool in.
+
+        Yields:
+            Each line of output, without the line ending.
+
+        Raises:
+            CalledProcessError: The tool exited with a non-zero exit code. The output
+                of the exception holds the last lines of output.
+            OSError: The tool could not be run.
+        """
+        tail: collections.deque[str] = collections.deque(maxlen=self.STREAM_TAIL_LINES)
+        with ExitStack() as stack:
+            proc = stack.enter_context(
+                subprocess.Popen(
+                    subproc_args,
+                    cwd=cwd,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    universal_newlines=True,
+                )
+            )
+            log = None
+            if self.plugin_context and self.plugin_context.args.output_directory:
+                log = stack.enter_context(
+                    open(self.get_name() + ".log", "w", encoding="utf8")
+                )
+            if proc.stdout is not None:
+                for line in proc.stdout:
+                    if log is not None:
+                        log.write(line)
+                    tail.append(line)
+                    line = line.rstrip("\n")
+                    logging.debug("%s", line)
+                    yield line
+            returncode = proc.wait()
+        if returncode != 0:
+            raise subprocess.CalledProcessError(
+                returncode, subproc_args, output="".join(tail)
+            )
+
+    @staticmethod
+    def iter_json(output: str) -> Iterator[Any]:
+        """Decode the JSON values in the collected output of a tool.
+
+        Tools often print log messages around their JSON results, and some print one
+        JSON value per line. Every JSON object or array that starts a line is decoded
+        and anything else is skipped. The output has already been read in full, so
+        this does not parse results while the tool is running.
+
+        Args:
+            output: The output from the tool.
+
+        Yields:
+            Each JSON value found in the output.
+        """
+        decoder = json.JSONDecoder()
+        start_p: Pattern[str] = re.compile(r"^[ \t]*[\[{]", re.MULTILINE)
+        pos = 0
+        while True:
+            match: Optional[Match[str]] = start_p.search(output, pos)
+            if match is None:
+                return
+            try:
+                value, pos = decoder.raw_decode(output, match.end() - 1)
+            except json.JSONDecodeError:
+                pos = match.end()
+                continue
+            yield value
+
     @staticmethod
     def is_valid_executable(path: str) -> bool:
         """Return whether a provided command exists and is executable.
@@ -348,9 +636,96 @@ class ToolPlugin:
             # Contains a path, not just a command, so don't search PATH
             return ToolPlugin.is_valid_executable(command)
 
+        # Searching PATH takes a stat call per entry, so remember the result.
+        key = (command, os.environ["PATH"], os.environ.get("PATHEXT", ""))
+        with ToolPlugin._COMMAND_CACHE_LOCK:
+            if key in ToolPlugin._COMMAND_CACHE:
+                return ToolPlugin._COMMAND_CACHE[key]
+
+        exists = False
         for path in os.environ["PATH"].split(os.pathsep):
             exe_path = os.path.join(path, command)
             if ToolPlugin.is_valid_executable(exe_path):
-                return True
+                exists = True
+                break
+
+        with ToolPlugin._COMMAND_CACHE_LOCK:
+            ToolPlugin._COMMAND_CACHE[key] = exists
+        return exists
+
+    def is_available(self, level: Optional[str] = None) -> bool:
+        """Check if the tool is installed.
+
+        Statick checks every enabled tool before scanning, so that missing tools are
+        reported once and skipped. Plugins that do not run the binary from
+        `get_binary` should override this.
+
+        Args:
+            level: Level at which to run tool.
+
+        Returns:
+            True if the tool can be run, False otherwise.
+        """
+        tool_bin = self.get_binary(level)
+        if not tool_bin:
+            return True
+        return self.command_exists(tool_bin)
+
+    def is_package_agnostic(self) -> bool:
+        """Check if the tool reports the same issues for a file in any package.
 
+        In a workspace, package-agnostic tools can be run once over the files of all
+        packages instead of once per package. The tool must scan the files listed in
+        the package under `get_file_types`, and must not use anything else from the
+        package.
+
+        Returns:
+            True if the tool can scan files from several packages at once.
+        """
         return False
+
+    def supports_file_subset(self) -> bool:
+        """Check if the tool can scan only some of the files of a package.
+
+        When only some files of a package are scanned, discovery only sees those files
+        and the package lists them under `file_subset`. Tools scanning the files listed
+        under `get_file_types` get only those files. Tools finding their files some
+        other way, like from the build targets, must limit them with `get_file_subset`.
+        Tools that scan the whole package even though they list file types must
+        override this.
+
+        Returns:
+            True if the tool can be limited to some files of a package.
+        """
+        return bool(self.get_file_types())
+
+    @staticmethod
+    def get_file_subset(package: Package, files: list[str]) -> list[str]:
+        """Keep only the files of a package that are to be scanned.
+
+        Args:
+            package: The package to scan.
+            files: Files the tool would scan in the whole package.
+
+        Returns:
+            The files in the file subset of the package, or all of the files if the
+            whole package is scanned.
+        """
+        if "file_subset" not in package:
+            return files
+        file_subset = set(package["file_subset"])
+        return [
+            filename for filename in files if os.path.abspath(filename) in file_subset
+        ]
+
+    def get_input_file_types(self) -> Optional[list[str]]:
+        """Return the file types a tool scanning the whole package depends on.
+
+        In watch mode the tool is run on the whole package again when files of these
+        types change. Tools listing `get_file_types` are only run again on the changed
+        files of those types.
+
+        Returns:
+            List of file types, or None if a change to any discovered file counts.
+        """
+        return None
@@ -0,0 +1,235 @@
+"""Cache of tool versions and package manager queries.
+
+Finding the version of a tool means starting the tool, or listing every package known
+to a package manager. Versions are cached by the resolved path and modification time
+of the tool binary, so they are only looked up again when the tool changes. When a
+cache directory is given the versions are also saved there, to be shared by workspace
+package workers and later runs.
+
+Package manager listings are run once per scan and shared by all tools. Statick
+processes that keep running between scans forget them with `clear_queries`, so
+upgraded packages are listed again.
+"""
+
+import json
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from typing import Any, Callable, Optional, Tuple, TypeVar
+
+VERSION_CACHE = "tool_versions.json"
+# First element of the memoize keys of package manager listings.
+QUERY_KEYS = ("query", "npm")
+
+T = TypeVar("T")
+
+_LOCK = threading.Lock()
+_KEY_LOCKS: dict[Tuple[str, ...], threading.Lock] = {}
+_RESULTS: dict[Tuple[str, ...], Any] = {}
+_VERSIONS: dict[str, str] = {}
+
+
+def memoize(key: Tuple[str, ...], function: Callable[[], T]) -> T:
+    """Call a function once per process and reuse the result.
+
+    Concurrent callers with the same key wait for the first call to finish instead of
+    repeating it. A result of None means the call failed, and is not reused.
+
+    Args:
+        key: Key identifying the call.
+        function: Function to call.
+
+    Returns:
+        The result of the first successful call with this key.
+    """
+    with _LOCK:
+        key_lock = _KEY_LOCKS.setdefault(key, threading.Lock())
+    with key_lock:
+        if key in _RESULTS:
+            cached: T = _RESULTS[key]
+            return cached
+        result = function()
+        if result is not None:
+            _RESULTS[key] = result
+        return result
+
+
+def clear() -> None:
+    """Forget all cached results in this process."""
+    with _LOCK:
+        _KEY_LOCKS.clear()
+        _RESULTS.clear()
+        _VERSIONS.clear()
+
+
+def clear_queries() -> None:
+    """Forget the package manager listings, so the next scan runs them again."""
+    with _LOCK:
+        for key in [key for key in _RESULTS if key[0] in QUERY_KEYS]:
+            del _RESULTS[key]
+            _KEY_LOCKS.pop(key, None)
+
+
+def query(
+    subproc_args: list[str], timeout: Optional[float] = None
+) -> Optional[list[str]]:
+    """Run a package manager query, once per scan.
+
+    Args:
+        subproc_args: Command line of the query.
+        timeout: Seconds to wait for the query, None to wait as long as it takes.
+
+    Returns:
+        Lines of output of the query, or None if it failed.
+    """
+
+    def run() -> Optional[list[str]]:
+        try:
+            output = subprocess.check_output(
+                subproc_args,
+                stderr=subprocess.STDOUT,
+                universal_newlines=True,
+                timeout=timeout,
+            )
+        except (subprocess.SubprocessError, OSError) as ex:
+            logging.debug("Unable to run %s: %s", " ".join(subproc_args), ex)
+            return None
+        return output.splitlines()
+
+    return memoize((QUERY_KEYS[0],) + tuple(subproc_args), run)
+
+
+def query_npm(
+    subproc_args: list[str], timeout: Optional[float] = None
+) -> Optional[dict[str, str]]:
+    """List the packages installed by npm, once per scan.
+
+    Args:
+        subproc_args: Command line of the `npm list --json` query.
+        timeout: Seconds to wait for the query, None to wait as long as it takes.
+
+    Returns:
+        Version of each installed package, or None if the query failed.
+    """
+
+    def parse() -> Optional[dict[str, str]]:
+        try:
+            output = subprocess.check_output(
+                subproc_args,
+                stderr=subprocess.DEVNULL,
+                universal_newlines=True,
+                timeout=timeout,
+            )
+            data = json.loads(output)
+        except (subprocess.SubprocessError, OSError, ValueError) as ex:
+            logging.debug("Unable to run %s: %s", " ".join(subproc_args), ex)
+            return None
+        if not isinstance(data, dict) or not isinstance(data.get("dependencies"), dict):
+            return {}
+        return {
+            name: str(package.get("version", ""))
+            for name, package in data["dependencies"].items()
+            if isinstance(package, dict)
+        }
+
+    return memoize((QUERY_KEYS[1],) + tuple(subproc_args), parse)
+
+
+def get_key(tool: str, tool_bin: str) -> Optional[str]:
+    """Get the cache key for the version of a tool.
+
+    Args:
+        tool: Name of the tool.
+        tool_bin: Tool binary, either a path or a command found on the PATH.
+
+    Returns:
+        Key made of the tool name and the path, modification time and size of the
+        binary, or None if the binary can't be found.
+    """
+    path = shutil.which(tool_bin)
+    if path is None:
+        return None
+    path = os.path.realpath(path)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return f"{tool}:{path}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def read_cache(cache_dir: str) -> dict[str, str]:
+    """Read the versions saved in a cache directory.
+
+    Args:
+        cache_dir: Directory holding the version cache.
+
+    Returns:
+        Saved version for each key.
+    """
+    try:
+        with open(os.path.join(cache_dir, VERSION_CACHE), encoding="utf8") as fid:
+            versions = json.load(fid)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(versions, dict):
+        return {}
+    return versions
+
+
+def get_version(key: str, cache_dir: Optional[str]) -> Optional[str]:
+    """Look up a cached tool version.
+
+    Args:
+        key: Cache key from `get_key`.
+        cache_dir: Directory holding the version cache, None to only use memory.
+
+    Returns:
+        The cached version, or None if it is not cached.
+    """
+    with _LOCK:
+        if key in _VERSIONS:
+            return _VERSIONS[key]
+    if cache_dir is None:
+        return None
+    version = read_cache(cache_dir).get(key)
+    if not isinstance(version, str):
+        return None
+    with _LOCK:
+        _VERSIONS[key] = version
+    return version
+
+
+def set_version(key: str, version: str, cache_dir: Optional[str]) -> None:
+    """Cache a tool version.
+
+    Entries for older builds of the same binary are removed from the cache directory.
+
+    Args:
+        key: Cache key from `get_key`.
+        version: Version of the tool.
+        cache_dir: Directory holding the version cache, None to only use memory.
+    """
+    with _LOCK:
+        _VERSIONS[key] = version
+        if cache_dir is None:
+            return
+        # Keys are the tool, path, modification time and size of the binary.
+        prefix = key.rsplit(":", 2)[0] + ":"
+        versions = {
+            other_key: other_version
+            for other_key, other_version in read_cache(cache_dir).items()
+            if not other_key.startswith(prefix)
+        }
+        versions[key] = version
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                "w", encoding="utf8", dir=cache_dir, delete=False
+            ) as fid:
+                json.dump(versions, fid, indent=2)
+            os.replace(fid.name, os.path.join(cache_dir, VERSION_CACHE))
+        except OSError as ex:
+            logging.warning("Unable to write tool version cache: %s", ex)
@@ -0,0 +1,479 @@
+"""Scan a package again whenever its files change.
+
+`statick --watch` scans a package once and keeps the discovered files in memory. The
+package is then checked for changed files every `--watch-interval` seconds by
+comparing file modification times. Tools that can scan only some files of a package
+are run again on just the changed files of the types they scan. Tools that scan the
+whole package, like make, are run again only when files of the types they depend on
+change. Issues found in the changed files replace the ones found there before, and
+the merged issues are reported again.
+"""
+
+import argparse
+import logging
+import os
+import time
+from typing import Any, Optional, Tuple
+
+from statick_tool import file_subset, version_cache
+from statick_tool.issue import Issue
+from statick_tool.package import Package
+from statick_tool.plugin_context import PluginContext
+from statick_tool.statick_tool import Statick
+from statick_tool.timing import Timing
+from statick_tool.tool_plugin import ToolPlugin
+
+# Directories changed by version control and tools, not by editing the package.
+IGNORED_DIRS = [
+    ".git",
+    ".hg",
+    ".svn",
+    "__pycache__",
+    ".mypy_cache",
+    ".pytest_cache",
+    ".ruff_cache",
+]
+
+Changes = Tuple[list[str], list[str], list[str]]
+
+
+def get_snapshot(path: str, skip_dirs: list[str]) -> dict[str, int]:
+    """Find the modification time of every file below a directory.
+
+    Args:
+        path: Directory to look in.
+        skip_dirs: Absolute paths of directories to leave out, such as the output
+            directory.
+
+    Returns:
+        Modification time in nanoseconds of each file, by absolute path.
+    """
+    snapshot: dict[str, int] = {}
+    for root, dirs, files in os.walk(os.path.abspath(path)):
+        dirs[:] = [
+            name
+            for name in dirs
+            if name not in IGNORED_DIRS and os.path.join(root, name) not in skip_dirs
+        ]
+        for fname in files:
+            full_path = os.path.join(root, fname)
+            try:
+                snapshot[full_path] = os.stat(full_path).st_mtime_ns
+            except OSError:
+                # The file was removed while walking.
+                continue
+    return snapshot
+
+
+def get_changes(old: dict[str, int], new: dict[str, int]) -> Changes:
+    """Compare two snapshots of a directory.
+
+    Args:
+        old: Earlier snapshot.
+        new: Later snapshot.
+
+    Returns:
+        Modified, added and removed files.
+    """
+    modified = [
+        path for path, mtime in new.items() if path in old and old[path] != mtime
+    ]
+    added = [path for path in new if path not in old]
+    removed = [path for path in old if path not in new]
+    return modified, added, removed
+
+
+def get_file_types(package: Package, files: list[str]) -> set[str]:
+    """Find the file types discovery listed some files under.
+
+    Args:
+        package: Discovered package.
+        files: Absolute paths of the files.
+
+    Returns:
+        File types listing any of the files.
+    """
+    paths = set(files)
+    return {
+        file_type
+        for file_type, value in package.items()
+        if isinstance(value, list)
+        and any(isinstance(item, str) and item in paths for item in value)
+    }
+
+
+def get_subset(package: Package, file_types: list[str], files: set[str]) -> Package:
+    """Create a copy of a package listing only some files of the given types.
+
+    The files are also listed under `file_subset`, for tools that find the files to
+    scan some other way, like from the build targets.
+
+    Args:
+        package: Discovered package.
+        file_types: File types to keep only some files of.
+        files: Absolute paths of the files to keep.
+
+    Returns:
+        The new package.
+    """
+    subset = Package(package.name, package.path)
+    subset.update(package)
+    subset.files = package.files
+    subset._walked = True  # pylint: disable=protected-access
+    for file_type in file_types:
+        if file_type in package and package[file_type]:
+            subset[file_type] = [path for path in package[file_type] if path in files]
+    subset["file_subset"] = sorted(files)
+    return subset
+
+
+def merge_issues(old: list[Issue], new: list[Issue], files: set[str]) -> list[Issue]:
+    """Replace the issues found in some files.
+
+    Relative file names in issues are relative to the current directory, which is
+    the directory the tools ran in.
+
+    Args:
+        old: Issues found before.
+        new: Issues found in the files now.
+        files: Absolute paths of the files.
+
+    Returns:
+        Issues in other files from before, followed by the new issues.
+    """
+    return [
+        issue for issue in old if os.path.abspath(issue.filename) not in files
+    ] + new
+
+
+def get_plugin_order(
+    tool_plugins: dict[str, Any], plugin_names: list[str]
+) -> list[str]:
+    """Order tools so that each one runs after the tools it depends on.
+
+    Args:
+        tool_plugins: All tool plugins by name.
+        plugin_names: Names of the tools to run.
+
+    Returns:
+        Names of the tools and their dependencies, in the order to run them.
+    """
+    ordered: list[str] = []
+    visited: set[str] = set()
+
+    def add(plugin_name: str) -> None:
+        if plugin_name in visited or plugin_name not in tool_plugins:
+            return
+        visited.add(plugin_name)
+        for dependency_name in tool_plugins[plugin_name].get_tool_dependencies():
+            add(dependency_name)
+        ordered.append(plugin_name)
+
+    for plugin_name in plugin_names:
+        add(plugin_name)
+    return ordered
+
+
+class Watcher:  # pylint: disable=too-many-instance-attributes
+    """Scan a package, then scan it again as its files change."""
+
+    def __init__(self, statick: Statick, args: argparse.Namespace) -> None:
+        """Initialize the watcher.
+
+        Args:
+            statick: Statick object with configuration and exceptions loaded.
+            args: Arguments from the command line.
+        """
+        self.statick = statick
+        self.args = args
+        self.path = os.path.abspath(args.path)
+        self.package: Optional[Package] = None
+        self.level: Optional[str] = None
+        self.issues: dict[str, list[Issue]] = {}
+        self.success = False
+        self.snapshot: dict[str, int] = {}
+        skip_dirs = [args.output_directory]
+        if "cache_dir" in args:
+            skip_dirs.append(args.cache_dir)
+        self.skip_dirs = [os.path.abspath(path) for path in skip_dirs if path]
+
+    def scan(self, start_time: Optional[float] = None) -> bool:
+        """Scan the whole package.
+
+        Args:
+            start_time: Start time of the scan.
+
+        Returns:
+            True if the package was scanned.
+        """
+        self.snapshot = get_snapshot(self.path, self.skip_dirs)
+        package: Optional[Package] = None
+        level: Optional[str] = None
+        if os.path.isdir(self.path):
+            package, level, _ = self.statick.discover_package(
+                self.args, Package(os.path.basename(self.path), self.path)
+            )
+            if package is not None:
+                self.statick.discovered_packages[self.path] = package
+        issues, success = self.statick.run(self.path, self.args, start_time)
+        if issues is None or package is None:
+            self.statick.print_no_issues()
+            return False
+        self.package = package
+        self.level = level
+        self.issues = issues
+        self.success = success and not any(issues.values())
+        return True
+
+    def get_plugins(self) -> list[ToolPlugin]:
+        """Find the tools run at the level of the package.
+
+        Returns:
+            Tool plugins in the order they run in.
+        """
+        assert self.statick.config is not None and self.level is not None
+        plugin_names = self.statick.config.get_enabled_tool_plugins(self.level)
+        if not plugin_names:
+            plugin_names = list(self.statick.tool_plugins)
+        if self.args.force_tool_list is not None:
+            force_tool_list = self.args.force_tool_list.split(",")
+            plugin_names = [name for name in plugin_names if name in force_tool_list]
+        missing_tools = self.statick.missing_tools.get(self.level, [])
+        return [
+            self.statick.tool_plugins[name]
+            for name in get_plugin_order(self.statick.tool_plugins, plugin_names)
+            if name not in missing_tools
+        ]
+
+    def discover(self, changed: list[str], removed: list[str]) -> bool:
+        """Run discovery on the package again.
+
+        Only the changed files are examined, other files are taken from the last
+        discovery.
+
+        Args:
+            changed: Absolute paths of modified and added files.
+            removed: Absolute paths of removed files.
+
+        Returns:
+            True if discovery succeeded.
+        """
+        assert self.package is not None
+        package = Package(self.package.name, self.path)
+        package.files = {
+            path: file_dict
+            for path, file_dict in self.package.files.items()
+            if path not in removed
+        }
+        file_subset.find_files(package, changed)
+        discovered, _, _ = self.statick.discover_package(self.args, package)
+        if discovered is None:
+            logging.error("Unable to run discovery on %s again.", self.path)
+            return False
+        self.package = discovered
+        self.statick.discovered_packages[self.path] = discovered
+        return True
+
+    def run_tool(
+        self, plugin: ToolPlugin, whole_package: bool, changed_files: set[str]
+    ) -> bool:
+        """Run a tool again and merge its issues with the ones found before.
+
+        Args:
+            plugin: Tool plugin, with its context set.
+            whole_package: Whether to scan the whole package instead of just the
+                changed files.
+            changed_files: Absolute paths of modified and added files.
+
+        Returns:
+            True if the tool succeeded.
+        """
+        assert self.package is not None and self.level is not None
+        name = plugin.get_name()
+        package = self.package
+        if not whole_package:
+            package = get_subset(package, plugin.get_file_types(), changed_files)
+        logging.info("Running %s tool plugin...", name)
+        plugin_start = time.time()
+        tool_issues = plugin.scan(package, self.level)
+        duration = format(time.time() - plugin_start, ".4f")
+        self.statick.timings.append(Timing(package.name, name, "Tool", duration))
+        if tool_issues is None:
+            logging.error("%s tool plugin failed", name)
+            return False
+        logging.info("%s tool plugin done.", name)
+        if self.statick.exceptions is not None:
+            tool_issues = self.statick.exceptions.filter_issues(
+                package, {name: tool_issues}
+            )[name]
+        if whole_package:
+            self.issues[name] = tool_issues
+        else:
+            self.issues[name] = merge_issues(
+                self.issues.get(name, []), tool_issues, changed_files
+            )
+        return True
+
+    def get_affected_plugins(
+        self, changed_types: set[str], removed_types: set[str]
+    ) -> list[Tuple[ToolPlugin, bool]]:
+        """Find the tools to run again for changed files.
+
+        Tools that can scan only some files of a package have nothing to scan in
+        removed files, but tools scanning the whole package are run again when their
+        input files are removed.
+
+        Args:
+            changed_types: File types of the modified and added files.
+            removed_types: File types of the removed files.
+
+        Returns:
+            Tool plugins in the order they run in, and whether each one scans the
+            whole package instead of just the changed files.
+        """
+        plugins: list[Tuple[ToolPlugin, bool]] = []
+        for plugin in self.get_plugins():
+            file_types = plugin.get_file_types()
+            if file_types and plugin.supports_file_subset():
+                if changed_types.intersection(file_types):
+                    plugins.append((plugin, False))
+                continue
+            input_types = plugin.get_input_file_types()
+            package_types = changed_types | removed_types
+            if package_types and (
+                input_types is None or package_types.intersection(input_types)
+            ):
+                plugins.append((plugin, True))
+        return plugins
+
+    def run_tools(
+        self,
+        plugins: list[Tuple[ToolPlugin, bool]],
+        changes: Changes,
+        plugin_context: PluginContext,
+    ) -> bool:
+        """Run tools again and merge their issues with the ones found before.
+
+        Tools run in the output directory of the package, like they do when the
+        package is scanned.
+
+        Args:
+            plugins: Tool plugins and whether each one scans the whole package.
+            changes: Modified, added and removed files.
+            plugin_context: Context to give the tool plugins.
+
+        Returns:
+            True if all tools succeeded.
+        """
+        assert self.package is not None and self.level is not None
+        changed_files = set(changes[0] + changes[1])
+        removed_files = set(changes[2])
+        orig_path = os.getcwd()
+        success = True
+        try:
+            if self.args.output_directory:
+                output_dir = os.path.join(
+                    self.args.output_directory, self.package.name + "-" + self.level
+                )
+                os.makedirs(output_dir, exist_ok=True)
+                os.chdir(output_dir)
+            for plugin, whole_package in plugins:
+                plugin.set_plugin_context(plugin_context)
+                if not self.run_tool(plugin, whole_package, changed_files):
+                    success = False
+            for name, tool_issues in self.issues.items():
+                self.issues[name] = merge_issues(tool_issues, [], removed_files)
+        except OSError as ex:
+            logging.error("Unable to scan %s again: %s", self.package.name, ex)
+            return False
+        finally:
+            os.chdir(orig_path)
+        return success
+
+    def rescan(self, changes: Changes) -> bool:
+        """Run the tools affected by changed files and report the merged issues.
+
+        Args:
+            changes: Modified, added and removed files.
+
+        Returns:
+            True if the package was scanned again and the issues were reported.
+        """
+        assert self.package is not None and self.level is not None
+        assert self.statick.config is not None
+        modified, added, removed = changes
+        changed = modified + added
+        # Packages may have been upgraded since the last scan.
+        version_cache.clear_queries()
+        removed_types = get_file_types(self.package, removed)
+        discovered = False
+        if added or removed_types:
+            if not self.discover(changed, removed):
+                return False
+            discovered = True
+        changed_types = get_file_types(self.package, changed)
+
+        plugins = self.get_affected_plugins(changed_types, removed_types)
+        if not plugins and not removed_types:
+            logging.info("No tools scan the changed files.")
+            return False
+        # Build targets and project files of the package come from discovery.
+        if any(whole for _, whole in plugins) and not discovered:
+            if not self.discover(changed, removed):
+                return False
+
+        plugin_context = PluginContext(
+            self.args, self.statick.resources, self.statick.config
+        )
+        success = self.run_tools(plugins, changes, plugin_context)
+        if not self.statick.run_reporting(
+            self.package, self.issues, self.level, plugin_context
+        ):
+            return False
+        self.success = success and not any(self.issues.values())
+        return True
+
+    def poll(self) -> bool:
+        """Scan the package again if files changed since the last check.
+
+        Returns:
+            True if any files changed.
+        """
+        snapshot = get_snapshot(self.path, self.skip_dirs)
+        changes = get_changes(self.snapshot, snapshot)
+        # Changes made while the tools run are found by the next check.
+        self.snapshot = snapshot
+        if not any(changes):
+            return False
+        modified, added, removed = changes
+        logging.info(
+            "%d modified, %d added and %d removed files.",
+            len(modified),
+            len(added),
+            len(removed),
+        )
+        self.rescan(changes)
+        return True
+
+    def run(self, start_time: Optional[float] = None) -> bool:
+        """Scan the package, then scan it again as files change until interrupted.
+
+        Args:
+            start_time: Start time of the first scan.
+
+        Returns:
+            True if the last scan was successful and found no issues.
+        """
+        if self.args.workspace:
+            logging.error("Watch mode can only scan a single package.")
+            return False
+        if not self.scan(start_time):
+            return False
+        print(f"Watching {self.path} for changes. Press Ctrl-C to stop.")
+        try:
+            while True:
+                time.sleep(self.args.watch_interval)
+                self.poll()
+        except KeyboardInterrupt:
+            pass
+        return self.success
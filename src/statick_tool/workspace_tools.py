@@ -0,0 +1,201 @@
+"""Run package-agnostic tools once for all packages in a workspace.
+
+Tools like black or shellcheck report the same issues for a file no matter which
+package it is in. In a workspace these tools are run over the files of all packages
+at once, split into a few large chunks, instead of starting the tool and loading its
+configuration again for every package. Issues are routed back to the package owning
+each file, so exceptions and reports still apply per package.
+"""
+
+import logging
+import os
+from typing import Any, Optional
+
+from statick_tool.issue import Issue
+from statick_tool.package import Package
+from statick_tool.tool_plugin import ToolPlugin
+
+MAX_CHUNK_FILES = 1000
+
+
+def get_plugins(
+    tool_plugins: dict[str, Any],
+    plugin_names: list[str],
+    missing_tools: list[str],
+    force_tool_list: Optional[str] = None,
+) -> list[ToolPlugin]:
+    """Select the tool plugins to run over the whole workspace.
+
+    Only package-agnostic tools without tool dependencies are selected.
+
+    Args:
+        tool_plugins: All tool plugins by name.
+        plugin_names: Names of the tools enabled at the level.
+        missing_tools: Names of the tools that are not installed.
+        force_tool_list: Comma-separated names of the only tools to run, if given.
+
+    Returns:
+        The tool plugins to run.
+    """
+    plugins: list[ToolPlugin] = []
+    for plugin_name in plugin_names:
+        plugin = tool_plugins.get(plugin_name)
+        if (
+            plugin is None
+            or plugin_name in missing_tools
+            or (force_tool_list and plugin_name not in force_tool_list.split(","))
+        ):
+            continue
+        if plugin.is_package_agnostic() and not plugin.get_tool_dependencies():
+            plugins.append(plugin)
+    return plugins
+
+
+def count_files(package: Package, file_types: list[str]) -> int:
+    """Count the files of the given types in a package.
+
+    Args:
+        package: Discovered package.
+        file_types: File types to count.
+
+    Returns:
+        Number of files.
+    """
+    return sum(
+        len(package[file_type])
+        for file_type in file_types
+        if file_type in package and package[file_type]
+    )
+
+
+def get_chunks(
+    packages: list[Package], file_types: list[str], max_files: int = MAX_CHUNK_FILES
+) -> list[list[Package]]:
+    """Group packages so each group has about the given number of files.
+
+    Packages are not split, so a package with more files than the limit is scanned
+    in a group of its own. Packages without files of the given types are left out.
+
+    Args:
+        packages: Discovered packages.
+        file_types: File types the tool scans.
+        max_files: Number of files to put in each group.
+
+    Returns:
+        Groups of packages.
+    """
+    chunks: list[list[Package]] = []
+    chunk: list[Package] = []
+    chunk_files = 0
+    for package in packages:
+        num_files = count_files(package, file_types)
+        if not num_files:
+            continue
+        if chunk and chunk_files + num_files > max_files:
+            chunks.append(chunk)
+            chunk = []
+            chunk_files = 0
+        chunk.append(package)
+        chunk_files += num_files
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def merge_packages(
+    name: str, path: str, packages: list[Package], file_types: list[str]
+) -> Package:
+    """Create a package holding the files of several packages.
+
+    Args:
+        name: Name of the new package.
+        path: Path of the new package.
+        packages: Discovered packages to take files from.
+        file_types: File types to take.
+
+    Returns:
+        The new package.
+    """
+    merged = Package(name, path)
+    for package in packages:
+        for file_type in file_types:
+            if file_type in package and package[file_type]:
+                merged.setdefault(file_type, []).extend(package[file_type])
+    return merged
+
+
+def route_issues(
+    packages: list[Package], issues: list[Issue]
+) -> dict[str, list[Issue]]:
+    """Assign issues to the packages owning their files.
+
+    A file belongs to the package with the longest path containing it, so issues in
+    nested packages go to the inner package.
+
+    Args:
+        packages: Packages the issues can belong to.
+        issues: Issues to assign.
+
+    Returns:
+        Issues for each package path.
+    """
+    # Longer paths sort after their parents, so reverse order finds the inner package.
+    roots = sorted(
+        ((os.path.join(os.path.abspath(package.path), ""), package.path))
+        for package in packages
+    )
+    roots.reverse()
+    routed: dict[str, list[Issue]] = {package.path: [] for package in packages}
+    for issue in issues:
+        filename = os.path.abspath(issue.filename)
+        for root, path in roots:
+            if filename.startswith(root):
+                routed[path].append(issue)
+                break
+        else:
+            logging.warning(
+                "No package found for %s issue in %s.", issue.tool, issue.filename
+            )
+    return routed
+
+
+def scan(
+    plugin: ToolPlugin,
+    packages: list[Package],
+    level: str,
+    output_dir: Optional[str] = None,
+) -> Optional[dict[str, list[Issue]]]:
+    """Run a tool over the files of several packages.
+
+    Args:
+        plugin: Package-agnostic tool plugin, with its context set.
+        packages: Discovered packages.
+        level: Level at which to scan.
+        output_dir: Directory to run the tool in, so its log files end up there.
+
+    Returns:
+        Issues for each package path, or None if the tool failed.
+    """
+    file_types = plugin.get_file_types()
+    orig_path = os.getcwd()
+    issues: list[Issue] = []
+    try:
+        if output_dir is not None:
+            os.makedirs(output_dir, exist_ok=True)
+            os.chdir(output_dir)
+        for chunk in get_chunks(packages, file_types):
+            path = os.path.commonpath(
+                [os.path.abspath(package.path) for package in chunk]
+            )
+            merged = merge_packages("all_packages", path, chunk, file_types)
+            chunk_issues = plugin.scan(merged, level)
+            if chunk_issues is None:
+                return None
+            issues += chunk_issues
+        # Relative file names are relative to the directory the tool ran in.
+        return route_issues(packages, issues)
+    except OSError as ex:
+        logging.warning("Unable to run %s on the workspace: %s", plugin.get_name(), ex)
+        return None
+    finally:
+        os.chdir(orig_path)
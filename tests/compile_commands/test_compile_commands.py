@@ -0,0 +1,115 @@
+"""Tests for the compile_commands module."""
+
+import json
+import os
+from tempfile import TemporaryDirectory
+
+import pytest
+
+from statick_tool.compile_commands import CompileCommands
+
+
+def write_compile_commands(directory, entries):
+    """Write a compilation database to a directory."""
+    filename = os.path.join(directory, "compile_commands.json")
+    with open(filename, "w", encoding="utf8") as fid:
+        json.dump(entries, fid)
+    return filename
+
+
+def test_compile_commands_valid():
+    """Test that a valid compilation database is read.
+
+    Expected results: Entries are indexed by absolute source file path.
+    """
+    with TemporaryDirectory() as tmp_dir:
+        filename = write_compile_commands(
+            tmp_dir,
+            [
+                {"directory": tmp_dir, "file": "a.c", "command": "cc -c a.c"},
+                {"directory": tmp_dir, "file": "a.c", "command": "cc -DB -c a.c"},
+                {"directory": tmp_dir, "file": "/abs/b.cpp", "arguments": ["c++"]},
+                {"file": "missing_directory.c"},
+            ],
+        )
+        compile_commands = CompileCommands(filename)
+        assert len(compile_commands.entries) == 3
+        entry = compile_commands.get_entry(os.path.join(tmp_dir, "a.c"))
+        assert entry is not None
+        assert entry["command"] == "cc -c a.c"
+        assert compile_commands.get_entry("/abs/b.cpp") is not None
+        assert compile_commands.get_entry(os.path.join(tmp_dir, "c.c")) is None
+
+
+def test_compile_commands_invalid_json():
+    """Test that an invalid compilation database raises a ValueError."""
+    with TemporaryDirectory() as tmp_dir:
+        filename = os.path.join(tmp_dir, "compile_commands.json")
+        with open(filename, "w", encoding="utf8") as fid:
+            fid.write("[{")
+        with pytest.raises(ValueError):
+            CompileCommands(filename)
+
+
+def test_compile_commands_not_list():
+    """Test that a JSON file that is not a list raises a ValueError."""
+    with TemporaryDirectory() as tmp_dir:
+        filename = write_compile_commands(tmp_dir, {"file": "a.c"})
+        with pytest.raises(ValueError):
+            CompileCommands(filename)
+
+
+def test_compile_commands_no_file():
+    """Test that a missing filename raises the correct errors."""
+    with pytest.raises(ValueError):
+        CompileCommands(None)
+    with pytest.raises(OSError):
+        CompileCommands("/nonexistent/compile_commands.json")
+
+
+def test_compile_commands_get_arguments():
+    """Test that both command formats are converted to argument lists."""
+    assert CompileCommands.get_arguments({"arguments": ["cc", "-c", "a.c"]}) == [
+        "cc",
+        "-c",
+        "a.c",
+    ]
+    assert CompileCommands.get_arguments({"command": 'cc -DX="a b" -c a.c'}) == [
+        "cc",
+        "-DX=a b",
+        "-c",
+        "a.c",
+    ]
+    assert not CompileCommands.get_arguments({})
+
+
+def test_compile_commands_strip_output_args():
+    """Test that output arguments are removed from a compiler command."""
+    args = [
+        "c++",
+        "-Iinclude",
+        "-MD",
+        "-MT",
+        "a.o",
+        "-MFa.d",
+        "-o",
+        "a.o",
+        "-c",
+        "a.cpp",
+    ]
+    assert CompileCommands.strip_output_args(args) == ["c++", "-Iinclude", "a.cpp"]
+
+
+def test_compile_commands_get_include_dirs():
+    """Test that include directories are found in both argument forms."""
+    entry = {
+        "directory": "/build",
+        "file": "a.c",
+        "command": "cc -Iinclude -I /abs -isystem/sys -iquote q -I/abs -c a.c",
+    }
+    assert CompileCommands.get_include_dirs(entry) == [
+        "/build/include",
+        "/abs",
+        "/sys",
+        "/build/q",
+    ]
@@ -0,0 +1,47 @@
+"""Tests for the file_subset module."""
+
+import os
+from tempfile import TemporaryDirectory
+
+from statick_tool import file_subset
+from statick_tool.discovery_plugin import DiscoveryPlugin
+from statick_tool.package import Package
+
+
+def test_parse_files():
+    """Test that files are split and made absolute."""
+    assert file_subset.parse_files("a.py,,sub/b.py") == [
+        os.path.abspath("a.py"),
+        os.path.abspath(os.path.join("sub", "b.py")),
+    ]
+
+
+def test_find_files():
+    """Test that only the given files in the package are discovered.
+
+    Expected results: files outside the package and missing files are skipped, and the
+    package is not walked again.
+    """
+    with TemporaryDirectory() as tmp_dir:
+        package_dir = os.path.join(tmp_dir, "package")
+        os.makedirs(package_dir)
+        for filename in ["a.py", "b.py"]:
+            with open(os.path.join(package_dir, filename), "w", encoding="utf8") as fid:
+                fid.write("print('hello')\n")
+        outside = os.path.join(tmp_dir, "outside.py")
+        with open(outside, "w", encoding="utf8") as fid:
+            fid.write("print('hello')\n")
+
+        package = Package("package", package_dir)
+        file_subset.find_files(
+            package,
+            [
+                os.path.join(package_dir, "a.py"),
+                os.path.join(package_dir, "missing.py"),
+                outside,
+            ],
+        )
+        DiscoveryPlugin().find_files(package)
+        assert list(package.files) == [os.path.join(package_dir, "a.py")]
+        assert package["file_subset"] == [os.path.join(package_dir, "a.py")]
+        assert package.files[os.path.join(package_dir, "a.py")]["name"] == "a.py"
@@ -0,0 +1,77 @@
+"""Tests for running Python tools in persistent worker processes."""
+
+import os
+import subprocess
+
+import mock
+import pytest
+
+from statick_tool import in_process
+
+
+@pytest.fixture(autouse=True)
+def shutdown_executor():
+    """Stop the worker processes after each test."""
+    yield
+    in_process.shutdown()
+
+
+def write_bad_python(directory):
+    """Write a Python file with a pyflakes warning."""
+    filename = os.path.join(directory, "bad.py")
+    with open(filename, "w", encoding="utf8") as fid:
+        fid.write("import os\n")
+    return filename
+
+
+def test_get_entry_point():
+    """Test that console scripts are resolved to Python functions."""
+    assert in_process.get_entry_point("pyflakes") == "pyflakes.api:main"
+    assert in_process.get_entry_point("/usr/bin/pyflakes") is None
+    assert in_process.get_entry_point("not-a-python-tool") is None
+
+
+def test_run_entry_point(tmp_path):
+    """Test that the output and exit code match running the tool as a process."""
+    filename = write_bad_python(str(tmp_path))
+    returncode, output = in_process.run_entry_point(
+        "pyflakes.api:main", ["pyflakes", "bad.py"], str(tmp_path)
+    )
+    assert returncode == 1
+    assert output == "bad.py:1:1: 'os' imported but unused\n"
+    assert os.getcwd() != str(tmp_path)
+
+    returncode, output = in_process.run_entry_point(
+        "pyflakes.api:main", ["pyflakes", filename + "x"], str(tmp_path)
+    )
+    assert returncode == 1
+    assert "No such file or directory" in output
+
+
+def test_check_output(tmp_path):
+    """Test running a tool in the worker pool.
+
+    Expected result: output is returned on success and CalledProcessError is raised
+    with the output on failure, like subprocess.check_output.
+    """
+    filename = write_bad_python(str(tmp_path))
+    with pytest.raises(subprocess.CalledProcessError) as ex:
+        in_process.check_output(["pyflakes", filename])
+    assert ex.value.returncode == 1
+    assert "'os' imported but unused" in ex.value.output
+
+    with open(filename, "w", encoding="utf8") as fid:
+        fid.write("print('ok')\n")
+    assert in_process.check_output(["pyflakes", filename]) == ""
+    assert in_process.check_output(["not-a-python-tool", filename]) is None
+
+
+@mock.patch("statick_tool.in_process.multiprocessing.current_process")
+def test_check_output_daemon(mock_current_process, tmp_path):
+    """Test that daemon processes do not start a worker pool.
+
+    Expected result: None is returned so the caller runs the tool as a process.
+    """
+    mock_current_process.return_value.daemon = True
+    filename = write_bad_python(str(tmp_path))
+    assert in_process.check_output(["pyflakes", filename]) is None
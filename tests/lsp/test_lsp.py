@@ -0,0 +1,300 @@
+"""Tests for the lsp module."""
+
+import io
+import os
+import pathlib
+import threading
+import time
+from tempfile import TemporaryDirectory
+
+import mock
+import pytest
+
+from statick_tool import lsp
+from statick_tool.args import Args
+from statick_tool.issue import Issue
+from statick_tool.plugins.tool.pylint import PylintToolPlugin
+from statick_tool.statick_tool import Statick
+from statick_tool.tool_plugin import ToolPlugin
+
+RSC_PATH = os.path.dirname(__file__)
+
+
+@pytest.fixture(name="linter")
+def fixture_linter():
+    """Create a linter for a package with a Python file."""
+    with TemporaryDirectory() as tmp_dir:
+        package_dir = os.path.join(tmp_dir, "package")
+        os.makedirs(package_dir)
+        for filename in ["a.py", "b.py"]:
+            with open(os.path.join(package_dir, filename), "w", encoding="utf8") as fid:
+                fid.write("import os\n")
+
+        args = Args("Statick language server")
+        statick = Statick(args.get_user_paths(["--user-paths", RSC_PATH]))
+        statick.gather_args(args.parser)
+        parsed_args = args.get_args(
+            [
+                "--user-paths",
+                RSC_PATH,
+                "--profile",
+                "profile.yaml",
+                "--exceptions",
+                "exceptions.yaml",
+                "--output-directory",
+                tmp_dir,
+            ]
+        )
+        statick.get_config(parsed_args)
+        statick.get_exceptions(parsed_args)
+        yield lsp.Linter(statick, parsed_args), package_dir
+
+
+def make_issue(filename, message, severity=3, cert_reference=None):
+    """Create an issue on the second line of a file."""
+    return Issue(filename, 2, "pylint", "W0611", severity, message, cert_reference)
+
+
+def test_read_write_message():
+    """Test that messages are framed with a Content-Length header."""
+    stream = io.BytesIO()
+    lsp.write_message(stream, {"id": 1, "method": "initialize"})
+    lsp.write_message(stream, {"method": "exit"})
+    assert stream.getvalue().startswith(b"Content-Length: ")
+
+    stream.seek(0)
+    assert lsp.read_message(stream) == {"id": 1, "method": "initialize"}
+    assert lsp.read_message(stream) == {"method": "exit"}
+    assert lsp.read_message(stream) is None
+
+    with pytest.raises(ValueError):
+        lsp.read_message(io.BytesIO(b"Content-Type: text\r\n\r\n{}"))
+
+
+def test_uri_to_path():
+    """Test that only file URIs are converted to paths."""
+    assert lsp.uri_to_path("file:///tmp/my%20file.py") == "/tmp/my file.py"
+    assert lsp.uri_to_path("file:///tmp/a%2541.py") == "/tmp/a%41.py"
+    assert lsp.uri_to_path("untitled:Untitled-1") is None
+
+
+def test_get_diagnostic():
+    """Test that issues are converted to diagnostics on their line."""
+    diagnostic = lsp.get_diagnostic(
+        make_issue("/tmp/a.py", "unused import", 5, "MSC12-C")
+    )
+    assert diagnostic["range"]["start"] == {"line": 1, "character": 0}
+    assert diagnostic["range"]["end"] == {"line": 2, "character": 0}
+    assert diagnostic["severity"] == lsp.SEVERITY_ERROR
+    assert diagnostic["code"] == "W0611"
+    assert diagnostic["message"] == "pylint: unused import (MSC12-C)"
+
+    assert lsp.get_diagnostic(make_issue("a.py", "m", 3))["severity"] == (
+        lsp.SEVERITY_WARNING
+    )
+    assert lsp.get_diagnostic(make_issue("a.py", "m", 0))["severity"] == (
+        lsp.SEVERITY_INFORMATION
+    )
+
+
+@mock.patch.object(ToolPlugin, "get_cached_version", return_value="1.0")
+@mock.patch.object(PylintToolPlugin, "is_available", return_value=True)
+@mock.patch.object(PylintToolPlugin, "scan")
+def test_lint(mock_scan, mock_available, mock_version, linter):
+    """Test linting a single file.
+
+    Expected results: the tool only scans the file, exceptions are applied and issues
+    in other files are left out.
+    """
+    linter, package_dir = linter
+    file_a = os.path.join(package_dir, "a.py")
+    file_b = os.path.join(package_dir, "b.py")
+    mock_scan.return_value = [
+        make_issue(file_a, "unused import"),
+        make_issue(file_a, "ignored message"),
+        make_issue(file_b, "unused import"),
+    ]
+    issues = linter.lint(package_dir, file_a, lambda: True)
+    assert [issue.message for issue in issues] == ["unused import"]
+    assert mock_scan.call_args[0][0]["python_src"] == [file_a]
+
+    # New files are discovered, and tools are not started for outdated saves.
+    mock_scan.reset_mock()
+    file_c = os.path.join(package_dir, "c.py")
+    with open(file_c, "w", encoding="utf8") as fid:
+        fid.write("import os\n")
+    assert linter.lint(package_dir, file_c, lambda: False) == []
+    mock_scan.assert_not_called()
+    assert file_c in linter.packages[package_dir][0].files
+
+
+def test_get_root():
+    """Test finding the package of a file in an editor workspace folder.
+
+    Expected results: the innermost directory marking a package is used, the
+    workspace folder is used without one, and ignored directories and files outside
+    the workspace folders are not in a package.
+    """
+    with TemporaryDirectory() as tmp_dir:
+        for filename in [
+            "pkg_a/package.xml",
+            "pkg_a/src/a.cpp",
+            "pkg_a/python/setup.py",
+            "pkg_a/python/module/b.py",
+            "ignored/CATKIN_IGNORE",
+            "ignored/pkg_c/package.xml",
+            "ignored/pkg_c/c.py",
+            "d.py",
+        ]:
+            path = os.path.join(tmp_dir, filename)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf8") as fid:
+                fid.write("")
+        server = lsp.LanguageServer(mock.Mock(), [tmp_dir])
+        assert server.get_root(os.path.join(tmp_dir, "pkg_a", "src", "a.cpp")) == (
+            os.path.join(tmp_dir, "pkg_a")
+        )
+        assert server.get_root(
+            os.path.join(tmp_dir, "pkg_a", "python", "module", "b.py")
+        ) == os.path.join(tmp_dir, "pkg_a", "python")
+        assert server.get_root(os.path.join(tmp_dir, "d.py")) == tmp_dir
+        assert (
+            server.get_root(os.path.join(tmp_dir, "ignored", "pkg_c", "c.py")) is None
+        )
+        assert server.get_root("/not/in/workspace.py") is None
+
+
+class LanguageClient:
+    """Talk to a language server running in a thread."""
+
+    def __init__(self, server):
+        """Start the server on pipes."""
+        in_read, self.in_write = os.pipe()
+        self.out_read, out_write = os.pipe()
+        self.input = os.fdopen(self.in_write, "wb")
+        self.output = os.fdopen(self.out_read, "rb")
+        self.thread = threading.Thread(
+            target=server.serve,
+            args=(os.fdopen(in_read, "rb"), os.fdopen(out_write, "wb")),
+        )
+        self.thread.start()
+
+    def send(self, message):
+        """Send a message to the server."""
+        lsp.write_message(self.input, {"jsonrpc": "2.0", **message})
+
+    def receive(self):
+        """Wait for a message from the server."""
+        return lsp.read_message(self.output)
+
+    def stop(self):
+        """Shut the server down."""
+        self.send({"id": 99, "method": "shutdown"})
+        assert self.receive() == {"jsonrpc": "2.0", "id": 99, "result": None}
+        self.send({"method": "exit"})
+        self.thread.join()
+        self.input.close()
+        self.output.close()
+
+
+def test_serve():
+    """Test publishing diagnostics for saved files.
+
+    Expected results: saves are debounced, results of outdated runs are dropped,
+    closing a file clears its diagnostics and unknown requests get an error.
+    """
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def lint(root, path, is_current):
+        calls.append((root, path))
+        if len(calls) == 2:
+            started.set()
+            release.wait()
+        return [make_issue(path, f"run {len(calls)}")]
+
+    linter = mock.Mock(**{"lint.side_effect": lint})
+    with TemporaryDirectory() as tmp_dir:
+        server = lsp.LanguageServer(linter, [], debounce=0.1)
+        client = LanguageClient(server)
+        try:
+            client.send(
+                {
+                    "id": 1,
+                    "method": "initialize",
+                    "params": {"rootUri": pathlib.Path(tmp_dir).as_uri()},
+                }
+            )
+            reply = client.receive()
+            assert reply["id"] == 1
+            assert reply["result"]["capabilities"]["textDocumentSync"]["save"]
+            assert server.roots == [tmp_dir]
+
+            uri = pathlib.Path(tmp_dir, "a.py").as_uri()
+            save = {
+                "method": "textDocument/didSave",
+                "params": {"textDocument": {"uri": uri}},
+            }
+            client.send(save)
+            client.send(save)
+            reply = client.receive()
+            assert reply["params"]["uri"] == uri
+            assert reply["params"]["diagnostics"][0]["message"] == "pylint: run 1"
+            assert calls == [(tmp_dir, os.path.join(tmp_dir, "a.py"))]
+
+            client.send(save)
+            started.wait()
+            client.send(save)
+            # Messages are handled in order, so the save is seen once this is answered.
+            client.send({"id": 2, "method": "textDocument/hover", "params": {}})
+            reply = client.receive()
+            assert reply["error"]["code"] == lsp.METHOD_NOT_FOUND
+            release.set()
+            reply = client.receive()
+            assert reply["params"]["diagnostics"][0]["message"] == "pylint: run 3"
+
+            client.send(
+                {
+                    "method": "textDocument/didClose",
+                    "params": {"textDocument": {"uri": uri}},
+                }
+            )
+            assert client.receive()["params"] == {"uri": uri, "diagnostics": []}
+        finally:
+            release.set()
+            client.stop()
+
+
+def test_serve_lint_error():
+    """Test that a failing lint does not stop the server.
+
+    Expected results: the error is logged and later saves are still linted.
+    """
+    calls = []
+
+    def lint(root, path, is_current):
+        calls.append(path)
+        if len(calls) == 1:
+            raise RuntimeError("tool plugin failed")
+        return [make_issue(path, "found")]
+
+    linter = mock.Mock(**{"lint.side_effect": lint})
+    with TemporaryDirectory() as tmp_dir:
+        server = lsp.LanguageServer(linter, [tmp_dir], debounce=0)
+        client = LanguageClient(server)
+        try:
+            uri = pathlib.Path(tmp_dir, "a.py").as_uri()
+            save = {
+                "method": "textDocument/didSave",
+                "params": {"textDocument": {"uri": uri}},
+            }
+            client.send(save)
+            while len(calls) < 1:
+                time.sleep(0.01)
+            client.send(save)
+            reply = client.receive()
+            assert reply["params"]["diagnostics"][0]["message"] == "pylint: found"
+            assert len(calls) == 2
+        finally:
+            client.stop()
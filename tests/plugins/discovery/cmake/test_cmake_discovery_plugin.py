@@ -243,3 +243,69 @@ def test_cmake_discovery_plugin_scan_oserror(mock_subprocess_check_output):
     cmdp = setup_cmake_discovery_plugin()
     cmdp.scan(package, "level")
     assert not package["make_targets"]
+
+
+def get_cmake_calls(mock_subprocess_check_output):
+    """Get the calls to cmake, skipping calls to the file command."""
+    return [
+        call
+        for call in mock_subprocess_check_output.call_args_list
+        if call[0][0][0] == "cmake"
+    ]
+
+
+@mock.patch("statick_tool.plugins.discovery.cmake.subprocess.check_output")
+def test_cmake_discovery_plugin_scan_build_dir(mock_subprocess_check_output, tmp_path):
+    """Test that a persistent build directory is only configured when inputs change.
+
+    Expected result: CMake runs once for unchanged inputs, the cached output is used
+    for the second scan, and CMake runs again after a CMake file changes or a C/C++
+    file is added.
+    """
+    package_dir = tmp_path / "package"
+    package_dir.mkdir()
+    cmakelists = package_dir / "CMakeLists.txt"
+    cmakelists.write_text("project(test)\n", encoding="utf8")
+    build_root = tmp_path / "build"
+    build_dir = build_root / "test_package"
+
+    cmdp = setup_cmake_discovery_plugin()
+    cmdp.plugin_context.args.cmake_build_dir = str(build_root)
+    cmdp.plugin_context.args.cmake_generator = "Ninja"
+    cmdp.plugin_context.args.output_directory = None
+    mock_subprocess_check_output.return_value = (
+        "-- TARGET: [NAME:test][SRC_DIR:/tmp/src][INCLUDE_DIRS:][SRC:test.cpp]\n"
+        f"-- PROJECT: [NAME:test][SRC_DIR:{package_dir}][BIN_DIR:{build_dir}]\n"
+    )
+
+    package = Package("test_package", str(package_dir))
+    cmdp.scan(package, "level")
+    assert len(package["make_targets"]) == 1
+    assert package["bin_dir"] == str(build_dir)
+    assert package["cmake_generator"] == "Ninja"
+    assert (build_dir / "CMakeLists.txt").is_file()
+    cmake_calls = get_cmake_calls(mock_subprocess_check_output)
+    assert len(cmake_calls) == 1
+    assert cmake_calls[0][0][0][-2:] == ["-G", "Ninja"]
+    assert cmake_calls[0][1]["cwd"] == str(build_dir)
+
+    package = Package("test_package", str(package_dir))
+    cmdp.scan(package, "level")
+    assert len(get_cmake_calls(mock_subprocess_check_output)) == 1
+    assert len(package["make_targets"]) == 1
+    assert package["bin_dir"] == str(build_dir)
+
+    cmakelists.write_text("project(test)\nadd_executable(test test.cpp)\n")
+    package = Package("test_package", str(package_dir))
+    cmdp.scan(package, "level")
+    assert len(get_cmake_calls(mock_subprocess_check_output)) == 2
+
+    (package_dir / "test.h").write_text("int test();\n", encoding="utf8")
+    package = Package("test_package", str(package_dir))
+    cmdp.scan(package, "level")
+    assert len(get_cmake_calls(mock_subprocess_check_output)) == 3
+
+    (package_dir / "test.h").write_text("int test(int x);\n", encoding="utf8")
+    package = Package("test_package", str(package_dir))
+    cmdp.scan(package, "level")
+    assert len(get_cmake_calls(mock_subprocess_check_output)) == 3
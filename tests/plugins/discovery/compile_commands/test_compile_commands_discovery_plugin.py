@@ -0,0 +1,168 @@
+"""Unit tests for the compile_commands discovery plugin."""
+
+import argparse
+import json
+import os
+import sys
+
+import statick_tool
+from statick_tool.config import Config
+from statick_tool.package import Package
+from statick_tool.plugin_context import PluginContext
+from statick_tool.plugins.discovery.cmake import CMakeDiscoveryPlugin
+from statick_tool.plugins.discovery.compile_commands import (
+    CompileCommandsDiscoveryPlugin,
+)
+from statick_tool.resources import Resources
+
+if sys.version_info < (3, 10):
+    from importlib_metadata import entry_points
+else:
+    from importlib.metadata import entry_points
+
+
+def setup_compile_commands_discovery_plugin(
+    compile_commands=None, compile_commands_search=False
+):
+    """Create an instance of the compile_commands discovery plugin."""
+    arg_parser = argparse.ArgumentParser()
+    resources = Resources(
+        [os.path.join(os.path.dirname(statick_tool.__file__), "plugins")]
+    )
+    config = Config(resources.get_file("config.yaml"))
+    plugin_context = PluginContext(arg_parser.parse_args([]), resources, config)
+    plugin_context.args.compile_commands = compile_commands
+    plugin_context.args.compile_commands_search = compile_commands_search
+    ccdp = CompileCommandsDiscoveryPlugin()
+    ccdp.set_plugin_context(plugin_context)
+    return ccdp
+
+
+def setup_package(tmp_path, build="build"):
+    """Create a package with a compilation database in a build directory."""
+    package_dir = tmp_path / "src" / "test_package"
+    (package_dir / "src").mkdir(parents=True)
+    (package_dir / "include" / "test_package").mkdir(parents=True)
+    (package_dir / "src" / "test.cpp").write_text("int main() {}\n")
+    (package_dir / "include" / "test_package" / "test.hpp").write_text("\n")
+    (package_dir / "include" / "README.md").write_text("\n")
+    build_dir = tmp_path / build
+    build_dir.mkdir(parents=True)
+    with open(build_dir / "compile_commands.json", "w", encoding="utf8") as fid:
+        json.dump(
+            [
+                {
+                    "directory": str(build_dir),
+                    "file": str(package_dir / "src" / "test.cpp"),
+                    "command": f"c++ -I{package_dir}/include -isystem /opt/include "
+                    "-o test.o -c ../src/test_package/src/test.cpp",
+                },
+                {
+                    "directory": str(build_dir),
+                    "file": "/opt/other/other.cpp",
+                    "command": "c++ -c /opt/other/other.cpp",
+                },
+            ],
+            fid,
+        )
+    return Package("test_package", str(package_dir)), build_dir
+
+
+def test_compile_commands_discovery_plugin_found():
+    """Test that the plugin manager finds the compile_commands discovery plugin."""
+    discovery_plugins = {}
+    plugins = entry_points(group="statick_tool.plugins.discovery")
+    for plugin_type in plugins:
+        plugin = plugin_type.load()
+        discovery_plugins[plugin_type.name] = plugin()
+    assert any(
+        plugin.get_name() == "compile_commands"
+        for _, plugin in list(discovery_plugins.items())
+    )
+
+
+def test_compile_commands_discovery_plugin_scan_path(tmp_path):
+    """Test discovery from a compilation database given on the command line.
+
+    Expected result: the package data has the same shape as the CMake discovery plugin
+    produces, and only package sources are included.
+    """
+    package, build_dir = setup_package(tmp_path)
+    ccdp = setup_compile_commands_discovery_plugin(
+        str(build_dir / "compile_commands.json")
+    )
+    ccdp.scan(package, "level")
+    assert package["compile_commands"] == str(build_dir / "compile_commands.json")
+    assert package["bin_dir"] == str(build_dir)
+    assert package["src_dir"] == package.path
+    assert package["cpplint"] == "cpplint"
+    assert package["headers"] == [
+        os.path.join(package.path, "include", "test_package", "test.hpp")
+    ]
+    assert len(package["make_targets"]) == 1
+    target = package["make_targets"][0]
+    assert target["name"] == "test_package"
+    assert target["src_dir"] == package.path
+    assert target["src"] == [os.path.join(package.path, "src", "test.cpp")]
+    assert target["include_dirs"] == [
+        os.path.join(package.path, "include"),
+        "/opt/include",
+    ]
+
+
+def test_compile_commands_discovery_plugin_scan_search(tmp_path):
+    """Test discovery from a compilation database in a workspace build directory."""
+    package, build_dir = setup_package(tmp_path, os.path.join("build", "test_package"))
+    ccdp = setup_compile_commands_discovery_plugin(compile_commands_search=True)
+    ccdp.scan(package, "level")
+    assert package["bin_dir"] == str(build_dir)
+    assert len(package["make_targets"]) == 1
+
+
+def test_compile_commands_discovery_plugin_scan_directory(tmp_path):
+    """Test discovery from a directory of package build directories."""
+    package, build_dir = setup_package(tmp_path, os.path.join("build", "test_package"))
+    ccdp = setup_compile_commands_discovery_plugin(str(tmp_path / "build"))
+    ccdp.scan(package, "level")
+    assert package["bin_dir"] == str(build_dir)
+
+
+def test_compile_commands_discovery_plugin_scan_not_found(tmp_path):
+    """Test that nothing is discovered without a compilation database.
+
+    Expected result: the package data is not changed.
+    """
+    package, _ = setup_package(tmp_path)
+    ccdp = setup_compile_commands_discovery_plugin()
+    ccdp.scan(package, "level")
+    assert "make_targets" not in package
+    ccdp = setup_compile_commands_discovery_plugin(str(tmp_path / "missing"))
+    ccdp.scan(package, "level")
+    assert "make_targets" not in package
+
+
+def test_compile_commands_discovery_plugin_scan_invalid(tmp_path):
+    """Test that an invalid compilation database is ignored."""
+    package, build_dir = setup_package(tmp_path)
+    with open(build_dir / "compile_commands.json", "w", encoding="utf8") as fid:
+        fid.write("[{")
+    ccdp = setup_compile_commands_discovery_plugin(str(build_dir))
+    ccdp.scan(package, "level")
+    assert "make_targets" not in package
+
+
+def test_compile_commands_discovery_plugin_cmake_skipped(tmp_path):
+    """Test that the CMake discovery plugin keeps targets from the database.
+
+    Expected result: the make targets are unchanged after CMake discovery.
+    """
+    package, build_dir = setup_package(tmp_path)
+    (tmp_path / "src" / "test_package" / "CMakeLists.txt").write_text("project(t)\n")
+    ccdp = setup_compile_commands_discovery_plugin(str(build_dir))
+    ccdp.scan(package, "level")
+    cmdp = CMakeDiscoveryPlugin()
+    cmdp.set_plugin_context(ccdp.plugin_context)
+    cmdp.scan(package, "level")
+    assert package["cmake_src"]
+    assert len(package["make_targets"]) == 1
+    assert package["bin_dir"] == str(build_dir)
@@ -182,3 +182,24 @@ def test_bandit_tool_plugin_parse_invalid():
     output = "invalid text"
     issues = btp.parse_output(output)
     assert not issues
+
+
+def test_bandit_tool_plugin_parse_json():
+    """Verify that we can parse the JSON output of bandit."""
+    btp = setup_bandit_tool_plugin()
+    btp.plugin_context.args.structured_output = True
+    output = (
+        "[main]\tINFO\tprofile include tests: None\n"
+        '{"errors": [], "results": [{"filename": "valid_package/b404.py", '
+        '"issue_confidence": "MEDIUM", "issue_severity": "LOW", '
+        '"issue_text": "Consider possible security implications.", '
+        '"line_number": 1, "test_id": "B404", "test_name": "blacklist"}]}'
+    )
+    issues = btp.parse_output([output])
+    assert len(issues) == 1
+    assert issues[0].filename == "valid_package/b404.py"
+    assert issues[0].line_number == 1
+    assert issues[0].tool == "bandit"
+    assert issues[0].issue_type == "B404"
+    assert issues[0].severity == 3
+    assert issues[0].message == "Consider possible security implications."
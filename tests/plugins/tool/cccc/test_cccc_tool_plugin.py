@@ -6,10 +6,10 @@ import os
 import shutil
 import subprocess
 import sys
+from tempfile import TemporaryDirectory
 
 import mock
 import pytest
-import xmltodict
 
 import statick_tool
 from statick_tool.config import Config
@@ -141,15 +141,10 @@ def test_cccc_tool_plugin_parse_valid():
     config_file = ctp.plugin_context.resources.get_file("cccc.opt")
 
     output_file = os.path.join(os.path.dirname(__file__), "valid_package", "cccc.xml")
-    with open(output_file) as f:
-        output = xmltodict.parse(f.read())
+    config = ctp.parse_config(config_file)
+    results = ctp.parse_xml_file(output_file, config)
 
-    package = Package(
-        "valid_package", os.path.join(os.path.dirname(__file__), "valid_package")
-    )
-    package["c_src"] = ["tmp/not_a_file.c"]
-
-    issues = ctp.parse_tool_output(output, "tmp/not_a_file.c", config_file)
+    issues = ctp.find_issues(config, results, "tmp/not_a_file.c")
     assert len(issues) == 2
     assert issues[0].filename == "tmp/not_a_file.c"
     assert issues[0].line_number == 0
@@ -199,19 +194,107 @@ def test_cccc_tool_plugin_parse_missing_names():
     output_file = os.path.join(
         os.path.dirname(__file__), "valid_package", "cccc-missing-names.xml"
     )
-    with open(output_file) as f:
-        output = xmltodict.parse(f.read())
-
-    package = Package(
-        "valid_package", os.path.join(os.path.dirname(__file__), "valid_package")
-    )
-    package["c_src"] = ["tmp/not_a_file.c"]
+    config = ctp.parse_config(config_file)
+    results = ctp.parse_xml_file(output_file, config)
 
-    issues = ctp.parse_tool_output(output, package, config_file)
+    issues = ctp.find_issues(config, results, "tmp/not_a_file.c")
     print(f"issues: {issues}")
     assert not issues
 
 
+def test_cccc_tool_plugin_parse_xml_file():
+    """Verify that a report is parsed one element at a time into module metrics.
+
+    Expected result: only metrics with thresholds in the configuration are kept and
+    the same issues are found as from the parsed document.
+    """
+    ctp = setup_cccc_tool_plugin()
+    config = ctp.parse_config(ctp.plugin_context.resources.get_file("cccc.opt"))
+    output_file = os.path.join(os.path.dirname(__file__), "valid_package", "cccc.xml")
+    results = ctp.parse_xml_file(output_file, config)
+    assert set(results) == {"Example1", "Example2"}
+    assert results["Example1"]["IF4"] == {"value": "10000", "level": "0"}
+
+    issues = ctp.find_issues(config, results, "tmp/not_a_file.c")
+    assert sorted(issue.issue_type for issue in issues) == ["error", "warn"]
+
+    output_file = os.path.join(
+        os.path.dirname(__file__), "valid_package", "cccc-missing-names.xml"
+    )
+    assert not ctp.parse_xml_file(output_file, config)
+    assert ctp.parse_xml_file("does_not_exist.xml", config) is None
+
+    output_file = os.path.join(os.path.dirname(__file__), "valid_package", "cccc.xml")
+    results = ctp.parse_xml_file(output_file, {"IF4": config["IF4"]})
+    assert results["Example1"] == {"IF4": {"value": "10000", "level": "0"}}
+
+
+def fake_cccc(subproc_args, stderr=None):
+    """Write a copy of the test report to the output directory given to cccc."""
+    outdir = [arg for arg in subproc_args if arg.startswith("--outdir=")][0][9:]
+    os.makedirs(outdir, exist_ok=True)
+    shutil.copyfile(
+        os.path.join(os.path.dirname(__file__), "valid_package", "cccc.xml"),
+        os.path.join(outdir, "cccc.xml"),
+    )
+    return b"output"
+
+
+@mock.patch("statick_tool.plugins.tool.cccc.ToolPlugin.get_cached_version")
+@mock.patch("statick_tool.plugins.tool.cccc.subprocess.check_output")
+def test_cccc_tool_plugin_scan_parallel_cached(
+    mock_subprocess_check_output, mock_get_cached_version
+):
+    """Test that files are analyzed in parallel and their metrics are cached.
+
+    Expected result: each file gets its own output directory, and a second scan of
+    unchanged files reuses the cached metrics without running cccc.
+    """
+    mock_subprocess_check_output.side_effect = fake_cccc
+    mock_get_cached_version.return_value = "1.0"
+    ctp = setup_cccc_tool_plugin()
+    orig_path = os.getcwd()
+    with TemporaryDirectory() as tmp_dir:
+        os.chdir(tmp_dir)
+        try:
+            ctp.plugin_context.args.output_directory = None
+            ctp.plugin_context.args.cccc_parallel = True
+            ctp.plugin_context.args.max_procs = 2
+            ctp.plugin_context.args.cache_dir = os.path.join(tmp_dir, "cache")
+            package = Package("valid_package", tmp_dir)
+            package["c_src"] = []
+            for subdir in ["a", "b"]:
+                os.makedirs(os.path.join(tmp_dir, subdir))
+                src = os.path.join(tmp_dir, subdir, "example.cpp")
+                with open(src, "w", encoding="utf8") as fid:
+                    fid.write(f"class Example{subdir} {{}};\n")
+                package["c_src"].append(src)
+
+            issues = ctp.scan(package, "level")
+            assert len(issues) == 4
+            assert {issue.filename for issue in issues} == set(package["c_src"])
+            outdirs = {
+                call[0][0][-2] for call in mock_subprocess_check_output.call_args_list
+            }
+            assert outdirs == {
+                "--outdir=.cccc-example.cpp",
+                "--outdir=.cccc-example.cpp-1",
+            }
+
+            mock_subprocess_check_output.reset_mock()
+            issues = ctp.scan(package, "level")
+            assert len(issues) == 4
+            mock_subprocess_check_output.assert_not_called()
+
+            with open(package["c_src"][0], "a", encoding="utf8") as fid:
+                fid.write("// changed\n")
+            issues = ctp.scan(package, "level")
+            assert len(issues) == 4
+            assert mock_subprocess_check_output.call_count == 1
+        finally:
+            os.chdir(orig_path)
+
+
 def test_cccc_tool_plugin_parse_invalid():
     """Verify that we don't return anything on bad input."""
     ctp = setup_cccc_tool_plugin()
@@ -221,10 +304,12 @@ def test_cccc_tool_plugin_parse_invalid():
     )
     config_file = ctp.plugin_context.resources.get_file("cccc.opt")
 
-    output = "invalid text"
-    package = {"c_src": "/tmp/not_a_file.c"}
-    issues = ctp.parse_tool_output(output, package, config_file)
-    assert not issues
+    config = ctp.parse_config(config_file)
+    with TemporaryDirectory() as tmp_dir:
+        output_file = os.path.join(tmp_dir, "cccc.xml")
+        with open(output_file, "w", encoding="utf8") as fid:
+            fid.write("invalid text")
+        assert ctp.parse_xml_file(output_file, config) is None
 
 
 def test_cccc_tool_plugin_parse_config_none():
@@ -281,14 +366,14 @@ def test_cccc_tool_plugin_scan_empty_calledprocesserror(mock_subprocess_check_ou
     assert not issues
 
 
-@mock.patch("statick_tool.plugins.tool.cccc.xmltodict.parse")
-def test_cccc_tool_plugin_scan_filenotfound(mock_xmltodict_parse):
+@mock.patch("statick_tool.plugins.tool.cccc.etree.iterparse")
+def test_cccc_tool_plugin_scan_filenotfound(mock_iterparse):
     """Test what happens when a FileNotFoundError is hit (such as if cccc has no output
     for a file).
 
     Expected result: issues is an empty list
     """
-    mock_xmltodict_parse.side_effect = FileNotFoundError()
+    mock_iterparse.side_effect = FileNotFoundError()
     ctp = setup_cccc_tool_plugin()
     if not ctp.command_exists("cccc"):
         pytest.skip("Missing cccc executable.")
@@ -5,12 +5,14 @@ import os
 import shutil
 import subprocess
 import sys
+from tempfile import TemporaryDirectory
 from xml.etree import ElementTree
 
 import mock
 import pytest
 
 import statick_tool
+from statick_tool import version_cache
 from statick_tool.config import Config
 from statick_tool.package import Package
 from statick_tool.plugin_context import PluginContext
@@ -383,6 +385,7 @@ def test_clang_format_tool_plugin_scan_oserror_open(mock_open):
     Expected result: issues is empty (no raise) or None (raise)
     """
     mock_open.side_effect = OSError("mocked error")
+    version_cache.clear()
     cftp = setup_clang_format_tool_plugin()
     package = Package(
         "valid_package", os.path.join(os.path.dirname(__file__), "valid_package")
@@ -446,6 +449,7 @@ def test_clang_format_tool_plugin_check_configuration_oserror(mock_open):
     Expected result: configuration check is False (no raise) or None (raise)
     """
     mock_open.side_effect = OSError("mocked error")
+    version_cache.clear()
     cftp = setup_clang_format_tool_plugin()
     check = cftp.check_configuration("clang-format")
     assert not check
@@ -455,6 +459,76 @@ def test_clang_format_tool_plugin_check_configuration_oserror(mock_open):
     assert check is None
 
 
+def test_clang_format_tool_plugin_configuration_differs_memoized():
+    """Test that configuration files are compared once for each version of them.
+
+    Expected result: the files are compared again only after one of them changes.
+    """
+    version_cache.clear()
+    cftp = setup_clang_format_tool_plugin()
+    with TemporaryDirectory() as tmp_dir:
+        actual_file = os.path.join(tmp_dir, "_clang-format")
+        target_file = os.path.join(tmp_dir, "target")
+        with open(actual_file, "w", encoding="utf8") as fid:
+            fid.write("IndentWidth: 2\n")
+        with open(target_file, "w", encoding="utf8") as fid:
+            fid.write("IndentWidth: 2\n")
+        with mock.patch.object(
+            ClangFormatToolPlugin,
+            "diff_configuration",
+            wraps=ClangFormatToolPlugin.diff_configuration,
+        ) as mock_diff:
+            assert not cftp.configuration_differs(actual_file, target_file)
+            assert not cftp.configuration_differs(actual_file, target_file)
+            assert mock_diff.call_count == 1
+
+            with open(actual_file, "w", encoding="utf8") as fid:
+                fid.write("IndentWidth: 4\n")
+            os.utime(actual_file, ns=(0, 0))
+            assert cftp.configuration_differs(actual_file, target_file)
+            assert mock_diff.call_count == 2
+    version_cache.clear()
+
+
+def test_clang_format_tool_plugin_diff_configuration_comments():
+    """Test that comment and blank line changes are not configuration changes."""
+    with TemporaryDirectory() as tmp_dir:
+        actual_file = os.path.join(tmp_dir, "_clang-format")
+        target_file = os.path.join(tmp_dir, "target")
+        with open(actual_file, "w", encoding="utf8") as fid:
+            fid.write("# Mine\nIndentWidth: 2\n")
+        with open(target_file, "w", encoding="utf8") as fid:
+            fid.write("IndentWidth: 2\n\n")
+        assert not ClangFormatToolPlugin.diff_configuration(actual_file, target_file)
+
+
+@mock.patch("statick_tool.plugins.tool.clang_format.ToolPlugin.command_exists")
+def test_clang_format_tool_plugin_is_available_checks_configuration(
+    mock_command_exists,
+):
+    """Test that checking the tool compares the configuration files once.
+
+    Expected result: the comparison is reused when packages are scanned.
+    """
+    mock_command_exists.return_value = True
+    cftp = setup_clang_format_tool_plugin()
+    with (
+        mock.patch.object(ClangFormatToolPlugin, "get_configuration_files") as mock_files,
+        mock.patch.object(
+            ClangFormatToolPlugin, "configuration_differs", return_value=False
+        ) as mock_differs,
+    ):
+        mock_files.return_value = ("actual", "target")
+        assert cftp.is_available("level")
+        mock_differs.assert_called_once_with("actual", "target")
+
+        mock_differs.side_effect = OSError("mocked error")
+        assert cftp.is_available("level")
+
+    mock_command_exists.return_value = False
+    assert not cftp.is_available("level")
+
+
 def test_clang_format_parser_parse_empty_output():
     """Test that empty XML output gives an empty report."""
     cfp = ClangFormatXMLParser()
@@ -494,6 +568,31 @@ def test_clang_format_parser_line_number():
     assert cfp.get_line_number(data, offset) == 3
 
 
+def test_clang_format_parser_line_starts():
+    """Test that line numbers found from line starts match counting line breaks."""
+    cfp = ClangFormatXMLParser()
+    data = "a\nbc\r\nd\re\n\nf"
+    line_starts = cfp.get_line_starts(data)
+    assert line_starts == [2, 5, 6, 8, 10, 11]
+    for offset in range(len(data) + 1):
+        expected = data[0:offset].count("\n") + data[0:offset].count("\r") + 1
+        assert cfp.get_line_number(data, offset, line_starts) == expected
+
+
+def test_clang_format_parser_parse_multiple_documents():
+    """Test that replacements from every XML document in the output are reported."""
+    cfp = ClangFormatXMLParser()
+    filename = os.path.join(os.path.dirname(__file__), "valid_package", "indents.c")
+    document = "<?xml version='1.0'?>\n\
+<replacements xml:space='preserve' incomplete_format='false'>\n\
+<replacement offset='12' length='1'>&#10;  </replacement>\n\
+</replacements>"
+    report = cfp.parse_xml_output(document + document, filename)
+    assert len(report) == 2
+    assert report[0] == report[1]
+    assert report[0]["line_no"] == 1
+
+
 @mock.patch("statick_tool.plugins.tool.clang_format_parser.ElementTree.fromstring")
 def test_clang_format_tool_plugin_scan_element_tree_parse_error(mock_fromstring):
     """Test what happens when an ElementTree.ParseError is raised (usually means clang-
@@ -1,9 +1,11 @@
 """Unit tests for the clang-tidy plugin."""
 
 import argparse
+import json
 import os
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 import mock
 import pytest
@@ -371,3 +373,365 @@ def test_checkforexceptions_false():
         "test.cpp" if i == 1 else "some-other-error" if i == 6 else False
     )
     assert not ClangTidyToolPlugin.check_for_exceptions(mm)
+
+
+def test_clang_tidy_tool_plugin_parse_fixes():
+    """Verify that we can parse the exported fixes of clang-tidy.
+
+    Expected result: duplicate diagnostics from multiple translation units are merged
+    and file offsets are converted to line numbers.
+    """
+    cttp = setup_clang_tidy_tool_plugin()
+    test_file = os.path.join(os.path.dirname(__file__), "valid_package", "test.c")
+    fixes = """---
+MainSourceFile: '{0}'
+Diagnostics:
+  - DiagnosticName: clang-analyzer-deadcode.DeadStores
+    DiagnosticMessage:
+      Message: 'Value stored to ''si'' is never read'
+      FilePath: '{0}'
+      FileOffset: 0
+      Replacements: []
+    Level: Warning
+  - DiagnosticName: cert-dcl50-cpp
+    DiagnosticMessage:
+      Message: 'message'
+      FilePath: '{0}'
+      FileOffset: 0
+      Replacements: []
+    Level: Warning
+  - DiagnosticName: some-remark
+    DiagnosticMessage:
+      Message: 'remark'
+      FilePath: '{0}'
+      FileOffset: 0
+      Replacements: []
+    Level: Remark
+...
+""".format(test_file)
+    diagnostics = cttp.load_fixes(fixes) + cttp.load_fixes(fixes)
+    assert len(diagnostics) == 6
+    issues = cttp.parse_fixes(diagnostics)
+    assert len(issues) == 2
+    assert issues[0].filename == test_file
+    assert issues[0].line_number == 1
+    assert issues[0].tool == "clang-tidy"
+    assert issues[0].issue_type == "warning/clang-analyzer-deadcode.DeadStores"
+    assert issues[0].severity == 3
+    assert issues[0].message == "Value stored to 'si' is never read"
+    assert issues[1].issue_type == "warning/cert-dcl50-cpp"
+    assert issues[1].cert_reference == "DCL50-CPP"
+
+
+def test_clang_tidy_tool_plugin_parse_fixes_invalid():
+    """Verify that invalid or empty fixes files do not produce issues."""
+    cttp = setup_clang_tidy_tool_plugin()
+    assert not cttp.load_fixes("")
+    assert not cttp.load_fixes("invalid: [text")
+    assert not cttp.load_fixes("---\nMainSourceFile: 'test.c'\n...\n")
+    assert not cttp.parse_fixes([])
+
+
+def test_clang_tidy_tool_plugin_get_line_starts():
+    """Verify that file offsets are indexed by line."""
+    with TemporaryDirectory() as tmp_dir:
+        test_file = os.path.join(tmp_dir, "test.c")
+        with open(test_file, "w", encoding="utf8") as fid:
+            fid.write("a\nbc\n\nd")
+        assert ClangTidyToolPlugin.get_line_starts(test_file) == [0, 2, 5, 6]
+    assert ClangTidyToolPlugin.get_line_starts("missing.c") == [0]
+
+
+def write_mock_fixes(args, **kwargs):  # pylint: disable=unused-argument
+    """Write an export-fixes file the way clang-tidy would."""
+    fixes_file = args[1][len("-export-fixes=") :]
+    src = args[-1]
+    with open(fixes_file, "w", encoding="utf8") as fid:
+        fid.write(
+            "---\nMainSourceFile: '{0}'\nDiagnostics:\n"
+            "  - DiagnosticName: misc-header-check\n"
+            "    DiagnosticMessage:\n"
+            "      Message: 'header message'\n"
+            "      FilePath: '{1}'\n"
+            "      FileOffset: 0\n"
+            "    Level: Warning\n"
+            "...\n".format(src, os.path.join(os.path.dirname(src), "header.h"))
+        )
+    return "output for " + src + "\n"
+
+
+@mock.patch("statick_tool.plugins.tool.clang_tidy.subprocess.check_output")
+def test_clang_tidy_tool_plugin_scan_parallel(mock_subprocess_check_output):
+    """Test that each translation unit is run separately in parallel mode.
+
+    Expected result: clang-tidy is run once per translation unit in the compilation
+    database and the header issue reported by both is only reported once.
+    """
+    mock_subprocess_check_output.side_effect = write_mock_fixes
+    cttp = setup_clang_tidy_tool_plugin()
+    cttp.plugin_context.args.clang_tidy_parallel = True
+    with TemporaryDirectory() as bin_dir:
+        src_dir = os.path.join(os.path.dirname(__file__), "valid_package")
+        with open(
+            os.path.join(bin_dir, "compile_commands.json"), "w", encoding="utf8"
+        ) as fid:
+            json.dump(
+                [
+                    {"directory": src_dir, "file": "a.c", "command": "cc -c a.c"},
+                    {"directory": src_dir, "file": "b.c", "command": "cc -c b.c"},
+                ],
+                fid,
+            )
+        package = Package("valid_package", src_dir)
+        package["make_targets"] = [
+            {
+                "src": [
+                    os.path.join(src_dir, "a.c"),
+                    os.path.join(src_dir, "b.c"),
+                    os.path.join(src_dir, "a.c"),
+                    os.path.join(src_dir, "generated.h"),
+                ]
+            }
+        ]
+        package["bin_dir"] = bin_dir
+        package["src_dir"] = src_dir
+        cttp.plugin_context.args.output_directory = None
+        issues = cttp.scan(package, "level")
+    assert mock_subprocess_check_output.call_count == 2
+    assert len(issues) == 1
+    assert issues[0].filename == os.path.join(src_dir, "header.h")
+    assert issues[0].line_number == 1
+    assert issues[0].issue_type == "warning/misc-header-check"
+    assert issues[0].message == "header message"
+
+
+@mock.patch("statick_tool.plugins.tool.clang_tidy.multiprocessing.current_process")
+@mock.patch(
+    "statick_tool.plugins.tool.clang_tidy.ThreadPoolExecutor", wraps=ThreadPoolExecutor
+)
+@mock.patch("statick_tool.plugins.tool.clang_tidy.subprocess.check_output")
+def test_clang_tidy_tool_plugin_scan_parallel_daemon(
+    mock_subprocess_check_output, mock_executor, mock_current_process
+):
+    """Test that a workspace package worker runs one clang-tidy process at a time.
+
+    Expected result: the workers of a daemon process are limited to one instead of
+    --max-procs.
+    """
+    mock_subprocess_check_output.side_effect = write_mock_fixes
+    mock_current_process.return_value.daemon = True
+    cttp = setup_clang_tidy_tool_plugin()
+    cttp.plugin_context.args.clang_tidy_parallel = True
+    cttp.plugin_context.args.max_procs = 4
+    with TemporaryDirectory() as bin_dir:
+        src_dir = os.path.join(os.path.dirname(__file__), "valid_package")
+        package = Package("valid_package", src_dir)
+        package["make_targets"] = [
+            {"src": [os.path.join(src_dir, "a.c"), os.path.join(src_dir, "b.c")]}
+        ]
+        package["bin_dir"] = bin_dir
+        package["src_dir"] = src_dir
+        cttp.plugin_context.args.output_directory = None
+        issues = cttp.scan(package, "level")
+    assert mock_executor.call_args[1]["max_workers"] == 1
+    assert mock_subprocess_check_output.call_count == 2
+    assert len(issues) == 1
+
+
+@mock.patch("statick_tool.plugins.tool.clang_tidy.subprocess.check_output")
+def test_clang_tidy_tool_plugin_scan_parallel_calledprocesserror(
+    mock_subprocess_check_output,
+):
+    """Test what happens when a translation unit fails in parallel mode.
+
+    Expected result: issues is None
+    """
+    mock_subprocess_check_output.side_effect = subprocess.CalledProcessError(
+        2, "", output="mocked error"
+    )
+    cttp = setup_clang_tidy_tool_plugin()
+    cttp.plugin_context.args.clang_tidy_parallel = True
+    with TemporaryDirectory() as bin_dir:
+        package = Package(
+            "valid_package", os.path.join(os.path.dirname(__file__), "valid_package")
+        )
+        package["make_targets"] = [{"src": [os.path.join(package.path, "test.c")]}]
+        package["bin_dir"] = bin_dir
+        package["src_dir"] = os.path.join(os.path.dirname(__file__), "valid_package")
+        issues = cttp.scan(package, "level")
+    assert issues is None
+
+
+@mock.patch("statick_tool.plugins.tool.clang_tidy.subprocess.check_output")
+def test_clang_tidy_tool_plugin_scan_parallel_diagnosticerror(
+    mock_subprocess_check_output,
+):
+    """Test that a translation unit with a compiler error fails the parallel scan.
+
+    Expected result: issues is None
+    """
+    mock_subprocess_check_output.side_effect = subprocess.CalledProcessError(
+        1, "", output="test.c:1:1: error: unknown [clang-diagnostic-error]"
+    )
+    cttp = setup_clang_tidy_tool_plugin()
+    cttp.plugin_context.args.clang_tidy_parallel = True
+    with TemporaryDirectory() as bin_dir:
+        package = Package(
+            "valid_package", os.path.join(os.path.dirname(__file__), "valid_package")
+        )
+        package["make_targets"] = [{"src": [os.path.join(package.path, "test.c")]}]
+        package["bin_dir"] = bin_dir
+        package["src_dir"] = os.path.join(os.path.dirname(__file__), "valid_package")
+        issues = cttp.scan(package, "level")
+    assert issues is None
+
+
+def test_clang_tidy_tool_plugin_get_preprocess_args():
+    """Test that compile commands are converted to preprocessor commands."""
+    args = ["cc", "-I/inc", "-MD", "-MF", "a.d", "-o", "a.o", "-c", "a.c", "-oa.o"]
+    assert ClangTidyToolPlugin.get_preprocess_args(args) == [
+        "cc",
+        "-I/inc",
+        "a.c",
+        "-E",
+    ]
+
+
+def mock_clang_tidy_with_preprocessor(args, **kwargs):
+    """Mock the clang-tidy and compiler calls made when caching is enabled."""
+    if "--version" in args:
+        return "clang-tidy version 1.0\n"
+    if "-E" in args:
+        assert kwargs["cwd"] == os.path.join(os.path.dirname(__file__), "valid_package")
+        return b"preprocessed " + args[-2].encode("utf8")
+    return write_mock_fixes(args, **kwargs)
+
+
+@mock.patch("statick_tool.plugins.tool.clang_tidy.subprocess.check_output")
+def test_clang_tidy_tool_plugin_scan_parallel_cache(mock_subprocess_check_output):
+    """Test that cached results are replayed for unchanged translation units.
+
+    Expected result: clang-tidy is only run on the first scan and both scans find the
+    same issues.
+    """
+    mock_subprocess_check_output.side_effect = mock_clang_tidy_with_preprocessor
+    cttp = setup_clang_tidy_tool_plugin()
+    cttp.plugin_context.args.clang_tidy_parallel = True
+    cttp.plugin_context.args.output_directory = None
+    with TemporaryDirectory() as bin_dir, TemporaryDirectory() as cache_dir:
+        cttp.plugin_context.args.cache_dir = cache_dir
+        src_dir = os.path.join(os.path.dirname(__file__), "valid_package")
+        with open(
+            os.path.join(bin_dir, "compile_commands.json"), "w", encoding="utf8"
+        ) as fid:
+            json.dump(
+                [
+                    {"directory": src_dir, "file": "a.c", "command": "cc -c a.c"},
+                    {"directory": src_dir, "file": "b.c", "command": "cc -c b.c"},
+                ],
+                fid,
+            )
+        package = Package("valid_package", src_dir)
+        package["make_targets"] = [
+            {"src": [os.path.join(src_dir, "a.c"), os.path.join(src_dir, "b.c")]}
+        ]
+        package["bin_dir"] = bin_dir
+        package["src_dir"] = src_dir
+
+        issues = cttp.scan(package, "level")
+        tidy_calls = [
+            call
+            for call in mock_subprocess_check_output.call_args_list
+            if "-export-fixes" in call[0][0][1]
+        ]
+        assert len(tidy_calls) == 2
+        assert os.listdir(os.path.join(cache_dir, "clang-tidy"))
+
+        cached_issues = cttp.scan(package, "level")
+        tidy_calls = [
+            call
+            for call in mock_subprocess_check_output.call_args_list
+            if "-export-fixes" in call[0][0][1]
+        ]
+        assert len(tidy_calls) == 2
+    assert len(issues) == 1
+    assert cached_issues == issues
+
+
+def test_clang_tidy_tool_plugin_read_cache_invalid():
+    """Test that invalid cache files are ignored."""
+    with TemporaryDirectory() as cache_dir:
+        cache_file = os.path.join(cache_dir, "invalid.json")
+        assert ClangTidyToolPlugin.read_cache(cache_file) is None
+        with open(cache_file, "w", encoding="utf8") as fid:
+            fid.write("{}")
+        assert ClangTidyToolPlugin.read_cache(cache_file) is None
+
+
+def mock_stream_output(lines, returncode):
+    """Return a replacement for stream_output that yields lines and then exits."""
+
+    def stream_output(subproc_args, cwd=None):  # pylint: disable=unused-argument
+        yield from lines
+        if returncode != 0:
+            raise subprocess.CalledProcessError(
+                returncode, subproc_args, output=lines[-1]
+            )
+
+    return stream_output
+
+
+def setup_streaming_package(bin_dir):
+    """Construct a package for the streaming tests."""
+    package = Package(
+        "valid_package", os.path.join(os.path.dirname(__file__), "valid_package")
+    )
+    package["make_targets"] = [
+        {"src": [os.path.join(os.path.dirname(__file__), "valid_package", "test.c")]}
+    ]
+    package["bin_dir"] = bin_dir
+    package["src_dir"] = os.path.join(os.path.dirname(__file__), "valid_package")
+    return package
+
+
+def test_clang_tidy_tool_plugin_scan_streaming():
+    """Test that streamed output is parsed while clang-tidy runs.
+
+    Expected result: issues are found even though clang-tidy exits with 1 for warnings,
+    and errors still fail the scan.
+    """
+    cttp = setup_clang_tidy_tool_plugin()
+    cttp.plugin_context.args.stream_output = True
+    lines = [
+        "1 warning generated.",
+        "{}:6:5: warning: Value stored to 'si' is never read "
+        "[clang-analyzer-deadcode.DeadStores]".format(
+            os.path.join("valid_package", "test.c")
+        ),
+    ]
+    with TemporaryDirectory() as bin_dir:
+        package = setup_streaming_package(bin_dir)
+        with mock.patch.object(
+            ClangTidyToolPlugin, "stream_output", mock_stream_output(lines, 1)
+        ):
+            issues = cttp.scan(package, "level")
+        assert len(issues) == 1
+        assert issues[0].issue_type == "warning/clang-analyzer-deadcode.DeadStores"
+        assert issues[0].line_number == 6
+
+        with mock.patch.object(
+            ClangTidyToolPlugin, "stream_output", mock_stream_output(lines, 2)
+        ):
+            assert cttp.scan(package, "level") is None
+
+        with mock.patch.object(
+            ClangTidyToolPlugin,
+            "stream_output",
+            mock_stream_output(["a.c:1:1: error: bad [clang-diagnostic-error]"], 1),
+        ):
+            assert cttp.scan(package, "level") is None
+
+        with mock.patch.object(
+            ClangTidyToolPlugin, "stream_output", side_effect=OSError("mocked error")
+        ):
+            assert cttp.scan(package, "level") is None
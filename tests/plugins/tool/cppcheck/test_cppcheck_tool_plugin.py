@@ -286,3 +286,182 @@ def test_cppcheck_tool_plugin_version_match(mock_subprocess_check_output):
     package["headers"] = []
     issues = cctp.scan(package, "level")
     assert issues is None
+
+
+CPPCHECK_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<results version="2">
+    <cppcheck version="2.13.0"/>
+    <errors>
+        <error id="knownConditionTrueFalse" severity="style" msg="Condition is always false">
+            <location file="{0}" line="6" column="9"/>
+            <location file="{0}" line="4" column="5" info="Assignment"/>
+        </error>
+        <error id="variableScope" severity="style" msg="The scope can be reduced">
+            <location file="{1}" line="3" column="7"/>
+        </error>
+        <error id="missingInclude" severity="information" msg="Include not found">
+            <location file="{0}" line="1" column="1"/>
+        </error>
+        <error id="checkersReport" severity="information" msg="Active checkers"/>
+        <error id="nullPointer" severity="error" msg="Null pointer dereference" cwe="476">
+            <location file="{2}" line="2" column="1"/>
+        </error>
+    </errors>
+</results>
+"""
+
+
+def write_cppcheck_xml(xml_file):
+    """Write cppcheck results to a file."""
+    with open(xml_file, "w", encoding="utf8") as fid:
+        fid.write(
+            CPPCHECK_XML.format(
+                os.path.join("valid_package", "test.cpp"),
+                os.path.join("valid_package", "test.c"),
+                os.path.join("valid_package", "test.txt"),
+            )
+        )
+
+
+def test_cppcheck_tool_plugin_parse_xml_valid(tmp_path):
+    """Verify that we can parse the XML output of cppcheck."""
+    cctp = setup_cppcheck_tool_plugin()
+    xml_file = os.path.join(tmp_path, "cppcheck.xml")
+    write_cppcheck_xml(xml_file)
+    issues = cctp.parse_xml_output(xml_file)
+    assert len(issues) == 1
+    assert issues[0].filename == os.path.join("valid_package", "test.cpp")
+    assert issues[0].line_number == 6
+    assert issues[0].tool == "cppcheck"
+    assert issues[0].issue_type == "style/knownConditionTrueFalse"
+    assert issues[0].severity == 5
+    assert issues[0].message == "Condition is always false"
+
+
+def test_cppcheck_tool_plugin_parse_xml_invalid(tmp_path):
+    """Verify that invalid XML output fails the scan."""
+    cctp = setup_cppcheck_tool_plugin()
+    xml_file = os.path.join(tmp_path, "cppcheck.xml")
+    with open(xml_file, "w", encoding="utf8") as fid:
+        fid.write("<results><errors>")
+    assert cctp.parse_xml_output(xml_file) is None
+
+
+def project_mode_helper(*popenargs, **kwargs):
+    """Helper for the project mode test that writes XML results."""
+    if "--version" in popenargs[0]:
+        return b"Cppcheck 2.13"
+    for arg in popenargs[0]:
+        if arg.startswith("--output-file="):
+            write_cppcheck_xml(arg[len("--output-file=") :])
+    return "Checking test.cpp ...\n"
+
+
+@mock.patch("statick_tool.plugins.tool.cppcheck.subprocess.check_output")
+def test_cppcheck_tool_plugin_scan_project(mock_subprocess_check_output, tmp_path):
+    """Test that project mode uses the compilation database and XML output.
+
+    Expected result: cppcheck is called with the project, package filter, jobs and
+    build directory flags, keeps the flags of the file list mode, and the XML results
+    are parsed.
+    """
+    mock_subprocess_check_output.side_effect = project_mode_helper
+    cctp = setup_cppcheck_tool_plugin()
+    cctp.plugin_context.args.cppcheck_project = True
+    cctp.plugin_context.args.max_procs = 3
+    cctp.plugin_context.args.cache_dir = os.path.join(tmp_path, "cache")
+    cctp.plugin_context.args.output_directory = None
+    bin_dir = os.path.join(tmp_path, "build")
+    os.mkdir(bin_dir)
+    with open(os.path.join(bin_dir, "compile_commands.json"), "w", encoding="utf8"):
+        pass
+    package = Package(
+        "valid_package", os.path.join(os.path.dirname(__file__), "valid_package")
+    )
+    package["make_targets"] = []
+    package["headers"] = []
+    package["bin_dir"] = bin_dir
+    issues = cctp.scan(package, "level")
+    assert len(issues) == 1
+    assert issues[0].issue_type == "style/knownConditionTrueFalse"
+    cppcheck_args = mock_subprocess_check_output.call_args[0][0]
+    assert (
+        "--project=" + os.path.join(bin_dir, "compile_commands.json") in cppcheck_args
+    )
+    assert "--file-filter=" + os.path.join(package.path, "*") in cppcheck_args
+    assert "--xml" in cppcheck_args
+    assert "-j3" in cppcheck_args
+    for flag in ["--language=c++", "--report-progress", "--verbose", "--inline-suppr"]:
+        assert flag in cppcheck_args
+    assert not any(arg.startswith("--template") for arg in cppcheck_args)
+    build_dir = os.path.join(tmp_path, "cache", "cppcheck", "valid_package", "level")
+    assert "--cppcheck-build-dir=" + build_dir in cppcheck_args
+    assert os.path.isdir(build_dir)
+
+
+@mock.patch("statick_tool.plugins.tool.cppcheck.subprocess.check_output")
+def test_cppcheck_tool_plugin_scan_project_user_jobs(
+    mock_subprocess_check_output, tmp_path
+):
+    """Test that project mode does not override jobs set in the level flags."""
+    mock_subprocess_check_output.side_effect = project_mode_helper
+    cctp = setup_cppcheck_tool_plugin()
+    cctp.plugin_context.args.cppcheck_project = True
+    cctp.plugin_context.args.output_directory = None
+    with open(os.path.join(tmp_path, "compile_commands.json"), "w", encoding="utf8"):
+        pass
+    package = Package(
+        "valid_package", os.path.join(os.path.dirname(__file__), "valid_package")
+    )
+    package["make_targets"] = []
+    package["bin_dir"] = str(tmp_path)
+    issues = cctp.scan(package, "sei_cert")
+    assert len(issues) == 1
+    cppcheck_args = mock_subprocess_check_output.call_args[0][0]
+    assert "-j1" not in cppcheck_args
+    assert "4" in cppcheck_args
+    assert not any(arg.startswith("--cppcheck-build-dir") for arg in cppcheck_args)
+
+
+@mock.patch("statick_tool.plugins.tool.cppcheck.subprocess.check_output")
+def test_cppcheck_tool_plugin_scan_project_calledprocesserror(
+    mock_subprocess_check_output, tmp_path
+):
+    """Test that a cppcheck failure in project mode fails the scan."""
+    mock_subprocess_check_output.side_effect = calledprocesserror_helper
+    cctp = setup_cppcheck_tool_plugin()
+    cctp.plugin_context.args.cppcheck_project = True
+    with open(os.path.join(tmp_path, "compile_commands.json"), "w", encoding="utf8"):
+        pass
+    package = Package(
+        "valid_package", os.path.join(os.path.dirname(__file__), "valid_package")
+    )
+    package["make_targets"] = []
+    package["bin_dir"] = str(tmp_path)
+    assert cctp.scan(package, "level") is None
+
+
+@mock.patch("statick_tool.plugins.tool.cppcheck.subprocess.check_output")
+def test_cppcheck_tool_plugin_scan_structured_output(mock_subprocess_check_output):
+    """Test that structured output mode uses the XML results.
+
+    Expected result: cppcheck is called with the XML flag instead of the text
+    template and the XML results are parsed.
+    """
+    mock_subprocess_check_output.side_effect = project_mode_helper
+    cctp = setup_cppcheck_tool_plugin()
+    cctp.plugin_context.args.structured_output = True
+    cctp.plugin_context.args.output_directory = None
+    package = Package(
+        "valid_package", os.path.join(os.path.dirname(__file__), "valid_package")
+    )
+    package["make_targets"] = [
+        {"src": [os.path.join(package.path, "test.cpp")], "include_dirs": []}
+    ]
+    package["headers"] = []
+    issues = cctp.scan(package, "level")
+    assert len(issues) == 1
+    assert issues[0].issue_type == "style/knownConditionTrueFalse"
+    cppcheck_args = mock_subprocess_check_output.call_args[0][0]
+    assert "--xml" in cppcheck_args
+    assert not any(arg.startswith("--template") for arg in cppcheck_args)
@@ -247,3 +247,37 @@ def test_checkforexceptions_false():
         "test.cpp" if i == 1 else "some-other-error" if i == 6 else False
     )
     assert not CpplintToolPlugin.check_for_exceptions(mm)
+
+
+@mock.patch("statick_tool.plugins.tool.cpplint.subprocess.check_output")
+def test_cpplint_tool_plugin_scan_file_subset(mock_subprocess_check_output):
+    """Test that only the files in the file subset of a package are checked.
+
+    Expected result: cpplint is run on the subset files, and not at all if no target
+    sources are in the subset.
+    """
+    mock_subprocess_check_output.return_value = ""
+    ctp = setup_cpplint_tool_plugin()
+    assert ctp.supports_file_subset()
+    package_dir = os.path.join(os.path.dirname(__file__), "valid_package")
+    package = Package("valid_package", package_dir)
+    package["make_targets"] = [
+        {
+            "src": [
+                os.path.join(package_dir, "test.c"),
+                os.path.join(package_dir, "other.c"),
+            ]
+        }
+    ]
+    package["headers"] = []
+    package["cpplint"] = "cpplint"
+    package["file_subset"] = [os.path.join(package_dir, "test.c")]
+    assert not ctp.scan(package, "level")
+    args = mock_subprocess_check_output.call_args[0][0]
+    assert os.path.join(package_dir, "test.c") in args
+    assert os.path.join(package_dir, "other.c") not in args
+
+    mock_subprocess_check_output.reset_mock()
+    package["file_subset"] = [os.path.join(package_dir, "CMakeLists.txt")]
+    assert ctp.scan(package, "level") == []
+    mock_subprocess_check_output.assert_not_called()
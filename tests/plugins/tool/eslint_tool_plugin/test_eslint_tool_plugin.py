@@ -4,6 +4,7 @@ import argparse
 import os
 import subprocess
 import sys
+from tempfile import TemporaryDirectory
 
 import mock
 import pytest
@@ -237,3 +238,30 @@ def test_eslint_tool_plugin_parse_output_value_error(mock_json_loads):
     output = "some made up text to parse"
     issues = plugin.parse_output([output])
     assert not issues
+
+
+@mock.patch("statick_tool.plugins.tool.eslint.subprocess.check_output")
+def test_eslint_tool_plugin_scan_cache(mock_subprocess_check_output):
+    """Test that eslint keeps its cache in a directory for each package and level.
+
+    Expected result: eslint is run with a cache location in the cache directory
+    """
+    mock_subprocess_check_output.return_value = "[]"
+    plugin = setup_eslint_tool_plugin()
+    package = Package(
+        "valid_package", os.path.join(os.path.dirname(__file__), "valid_package")
+    )
+    package["javascript_src"] = [
+        os.path.join(os.path.dirname(__file__), "valid_package", "test.js")
+    ]
+    with TemporaryDirectory() as tmp_dir:
+        plugin.plugin_context.args.cache_dir = tmp_dir
+        with mock.patch.object(plugin, "get_cached_version", return_value="1.0"):
+            issues = plugin.scan(package, "level")
+        assert not issues
+        subproc_args = mock_subprocess_check_output.call_args[0][0]
+        index = subproc_args.index("--cache-location")
+        assert "--cache" in subproc_args
+        assert subproc_args[index + 1] == os.path.join(
+            tmp_dir, "eslint", "valid_package", "level", "cache"
+        )
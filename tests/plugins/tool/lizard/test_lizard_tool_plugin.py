@@ -4,6 +4,7 @@ import argparse
 import os
 import sys
 
+import lizard
 import pytest
 
 import statick_tool
@@ -58,7 +59,9 @@ def test_lizard_tool_plugin_scan_valid():
     package = Package(
         "valid_package", os.path.join(os.path.dirname(__file__), "valid_package")
     )
-    package["src_dir"] = os.path.join(os.path.dirname(__file__), "valid_package")
+    package["c_src"] = [
+        os.path.join(os.path.dirname(__file__), "valid_package", "test.c")
+    ]
     issues = ltp.scan(package, "level")
     assert len(issues) == 1
     assert issues[0].filename == os.path.join(
@@ -74,14 +77,16 @@ def test_lizard_tool_plugin_scan_valid():
 
 
 def test_lizard_tool_plugin_parse_valid():
-    """Verify that we can parse the normal output of lizard."""
+    """Verify that we can convert lizard function information to issues."""
     ltp = setup_lizard_tool_plugin()
-    output = (
-        "{}:1: warning: func has 22 NLOC, 18 CCN, 143 token, 0 PARAM, 69 length".format(
-            os.path.join("valid_package", "test.c")
-        )
+    function_info = lizard.FunctionInfo(
+        "func", os.path.join("valid_package", "test.c"), 1
     )
-    issues = ltp.parse_tool_output(output)
+    function_info.end_line = 69
+    function_info.cyclomatic_complexity = 18
+    function_info.nloc = 22
+    function_info.token_count = 143
+    issues = ltp.parse_warnings([function_info, function_info])
     assert len(issues) == 1
     assert issues[0].filename == os.path.join("valid_package", "test.c")
     assert issues[0].line_number == 1
@@ -89,18 +94,70 @@ def test_lizard_tool_plugin_parse_valid():
     assert issues[0].issue_type == "warning"
     assert issues[0].severity == 5
     assert (
-        issues[0].message == "func has 22 NLOC, 18 CCN, 143 token, 0 PARAM, 69 length"
+        issues[0].message
+        == "func has 22 NLOC, 18 CCN, 143 token, 0 PARAM, 69 length, 0 ND"
     )
 
 
 def test_lizard_tool_plugin_parse_invalid():
-    """Verify that we can parse the normal output of lizard."""
+    """Verify that no issues are found without warnings."""
     ltp = setup_lizard_tool_plugin()
-    output = "invalid text"
-    issues = ltp.parse_tool_output(output)
+    issues = ltp.parse_warnings([])
     assert not issues
 
 
+def test_lizard_tool_plugin_scan_parallel():
+    """Test that files are analyzed in a process pool when jobs are allowed.
+
+    Expected result: the same issues are found as when running serially, and excluded
+    files are not analyzed.
+    """
+    ltp = setup_lizard_tool_plugin()
+    ltp.plugin_context.args.max_procs = 2
+    ltp.plugin_context.args.output_directory = None
+    package = Package(
+        "valid_package", os.path.join(os.path.dirname(__file__), "valid_package")
+    )
+    package["c_src"] = [os.path.join(package.path, "test.c")] * 2
+    package["python_src"] = [os.path.join(package.path, "ignored.py")]
+    ltp.plugin_context.config.get_tool_config = lambda *args: "-x *.py"
+    issues = ltp.scan(package, "level")
+    assert len(issues) == 1
+    assert issues[0].line_number == 2
+
+
+def test_lizard_tool_plugin_get_files(tmp_path):
+    """Test finding the files to analyze.
+
+    Expected result: discovered files are used for the discovered languages, the
+    files of other languages are taken from the files discovery walked, and the
+    language and exclude flags and the file subset of the package are applied.
+    """
+    ltp = setup_lizard_tool_plugin()
+    package = Package("package", str(tmp_path))
+    for filename in ["a.c", "excluded.c", "b.go", "c.rs", "README.md", "d.go"]:
+        (tmp_path / filename).write_text(f"// {filename}\n", encoding="utf8")
+        # Files discovery did not walk, like d.go, are not analyzed.
+        if filename != "d.go":
+            path = str(tmp_path / filename)
+            package.files[path] = {"name": filename, "path": path}
+    package["c_src"] = [str(tmp_path / "a.c")]
+
+    options = lizard.parse_args([lizard.__file__])
+    assert sorted(ltp.get_files(package, options)) == [
+        str(tmp_path / "a.c"),
+        str(tmp_path / "b.go"),
+        str(tmp_path / "c.rs"),
+    ]
+
+    options = lizard.parse_args([lizard.__file__, "-l", "go", "-x", "*.rs"])
+    assert ltp.get_files(package, options) == [str(tmp_path / "b.go")]
+
+    options = lizard.parse_args([lizard.__file__])
+    package["file_subset"] = [str(tmp_path / "c.rs")]
+    assert ltp.get_files(package, options) == [str(tmp_path / "c.rs")]
+
+
 def test_lizard_tool_plugin_scan_missing_fields():
     """Test what happens when key fields are missing from the Package argument.
 
@@ -1,6 +1,7 @@
 """Unit tests for the make tool plugin."""
 
 import argparse
+import json
 import os
 import subprocess
 import sys
@@ -46,9 +47,7 @@ def test_make_tool_plugin_found():
     for plugin_type in tool_plugins:
         plugin = plugin_type.load()
         plugins[plugin_type.name] = plugin()
-    assert any(
-        plugin.get_name() == "make" for _, plugin in list(plugins.items())
-    )
+    assert any(plugin.get_name() == "make" for _, plugin in list(plugins.items()))
 
 
 def test_make_tool_plugin_scan_valid():
@@ -218,3 +217,219 @@ def test_make_tool_plugin_scan_oserror(mock_subprocess_check_output):
     package["make_targets"] = "make_targets"
     issues = mtp.scan(package, "level")
     assert issues is None
+
+
+def test_make_tool_plugin_split_output_by_object():
+    """Test that build output is split into the compiler output for each object."""
+    output = (
+        "[ 50%] Building CXX object CMakeFiles/test.dir/test.cpp.o\n"
+        "test.cpp:4:3: warning: unused variable 'x' [-Wunused-variable]\n"
+        "   int x;\n"
+        "[ 75%] Building C object CMakeFiles/test.dir/clean.c.o\n"
+        "[100%] Linking CXX executable test\n"
+        "make[2]: Leaving directory '/tmp/build'\n"
+    )
+    objects = MakeToolPlugin.split_output_by_object(output)
+    assert objects == {
+        "CMakeFiles/test.dir/test.cpp.o": [
+            "test.cpp:4:3: warning: unused variable 'x' [-Wunused-variable]",
+            "   int x;",
+        ],
+        "CMakeFiles/test.dir/clean.c.o": [],
+    }
+
+
+@mock.patch("statick_tool.plugins.tool.make.subprocess.check_output")
+def test_make_tool_plugin_scan_incremental(
+    mock_subprocess_check_output, tmp_path, monkeypatch
+):
+    """Test that incremental builds do not clean and replay cached warnings.
+
+    Expected result: the build directory is only cleaned while there are no cached
+    warnings, jobs are passed to make, and warnings for objects that were not rebuilt
+    are still reported.
+    """
+    monkeypatch.chdir(tmp_path)
+    mtp = setup_make_tool_plugin()
+    mtp.plugin_context.args.make_incremental = True
+    mtp.plugin_context.args.max_procs = 3
+    mtp.plugin_context.args.output_directory = str(tmp_path)
+    package = Package(
+        "valid_package", os.path.join(os.path.dirname(__file__), "valid_package")
+    )
+    package["make_targets"] = "make_targets"
+    obj = os.path.join("CMakeFiles", "test.dir", "test.cpp.o")
+    os.makedirs(os.path.dirname(obj))
+    with open(obj, "w", encoding="utf8"):
+        pass
+
+    mock_subprocess_check_output.return_value = (
+        f"[ 50%] Building CXX object {obj}\n"
+        "/tmp/test.cpp:4:3: warning: unused variable 'x' [-Wunused-variable]\n"
+    )
+    issues = mtp.scan(package, "level")
+    assert len(issues) == 1
+    assert mock_subprocess_check_output.call_count == 2
+    assert mock_subprocess_check_output.call_args_list[0][0][0] == ["make", "clean"]
+    args = mock_subprocess_check_output.call_args[0][0]
+    assert "-j3" in args
+
+    mock_subprocess_check_output.reset_mock()
+    mock_subprocess_check_output.return_value = "[100%] Built target test\n"
+    issues = mtp.scan(package, "level")
+    assert len(issues) == 1
+    mock_subprocess_check_output.assert_called_once()
+    assert "clean" not in mock_subprocess_check_output.call_args[0][0]
+    assert issues[0].filename == "/tmp/test.cpp"
+    assert issues[0].line_number == 4
+
+    os.remove(obj)
+    issues = mtp.scan(package, "level")
+    assert not issues
+
+
+@mock.patch("statick_tool.plugins.tool.make.subprocess.check_output")
+def test_make_tool_plugin_scan_syntax_only(mock_subprocess_check_output, tmp_path):
+    """Test that syntax-only mode compiles the package's compilation database entries.
+
+    Expected result: the compiler is run with -fsyntax-only and the level flags on the
+    package sources only, and its warnings are reported.
+    """
+    mtp = setup_make_tool_plugin()
+    mtp.plugin_context.args.make_syntax_only = True
+    mtp.plugin_context.args.output_directory = None
+    package = Package(
+        "valid_package", os.path.join(os.path.dirname(__file__), "valid_package")
+    )
+    package["make_targets"] = [{"src": ["/tmp/test.cpp"]}]
+    package["bin_dir"] = str(tmp_path)
+    with open(tmp_path / "compile_commands.json", "w", encoding="utf8") as fid:
+        json.dump(
+            [
+                {
+                    "directory": str(tmp_path),
+                    "file": "/tmp/test.cpp",
+                    "command": "c++ -o test.o -c /tmp/test.cpp",
+                },
+                {
+                    "directory": str(tmp_path),
+                    "file": "/tmp/other_package/other.cpp",
+                    "command": "c++ -o other.o -c /tmp/other_package/other.cpp",
+                },
+            ],
+            fid,
+        )
+    mock_subprocess_check_output.return_value = (
+        "/tmp/test.cpp:4:3: warning: unused variable 'x' [-Wunused-variable]\n"
+    )
+    issues = mtp.scan(package, "sei_cert")
+    assert len(issues) == 1
+    assert issues[0].issue_type == "-Wunused-variable"
+    assert mock_subprocess_check_output.call_count == 1
+    args = mock_subprocess_check_output.call_args[0][0]
+    assert args[0] == "c++"
+    assert args[-2:] == ["-fsyntax-only", "/tmp/test.cpp"]
+    assert "-Wformat" in args
+    assert "-o" not in args
+    assert mock_subprocess_check_output.call_args[1]["cwd"] == str(tmp_path)
+
+    mock_subprocess_check_output.side_effect = subprocess.CalledProcessError(
+        1, "", output="mocked error"
+    )
+    assert mtp.scan(package, "sei_cert") is None
+
+
+def test_make_tool_plugin_scan_syntax_only_no_database(tmp_path):
+    """Test syntax-only mode without a compilation database.
+
+    Expected result: issues is None
+    """
+    mtp = setup_make_tool_plugin()
+    mtp.plugin_context.args.make_syntax_only = True
+    package = Package(
+        "valid_package", os.path.join(os.path.dirname(__file__), "valid_package")
+    )
+    package["make_targets"] = "make_targets"
+    package["bin_dir"] = str(tmp_path)
+    assert mtp.scan(package, "sei_cert") is None
+
+
+@mock.patch("statick_tool.plugins.tool.make.subprocess.check_output")
+def test_make_tool_plugin_scan_ninja(mock_subprocess_check_output, tmp_path):
+    """Test that packages configured with Ninja are built with ninja in bin_dir.
+
+    Expected result: ninja is used to clean and build in the package build directory.
+    """
+    mtp = setup_make_tool_plugin()
+    mtp.plugin_context.args.output_directory = None
+    package = Package(
+        "valid_package", os.path.join(os.path.dirname(__file__), "valid_package")
+    )
+    package["make_targets"] = "make_targets"
+    package["cmake_generator"] = "Ninja"
+    package["bin_dir"] = str(tmp_path)
+    mock_subprocess_check_output.return_value = ""
+    issues = mtp.scan(package, "level")
+    assert not issues
+    calls = mock_subprocess_check_output.call_args_list
+    assert calls[0][0][0] == ["ninja", "-t", "clean"]
+    assert calls[1][0][0] == ["ninja", "statick_cmake_target"]
+    assert calls[1][1]["cwd"] == str(tmp_path)
+
+
+@mock.patch("statick_tool.plugins.tool.make.subprocess.check_output")
+def test_make_tool_plugin_scan_compile_commands_package(
+    mock_subprocess_check_output, tmp_path
+):
+    """Test packages discovered from an existing compilation database.
+
+    Expected result: there is no Statick build target, so syntax-only mode is used.
+    """
+    mtp = setup_make_tool_plugin()
+    mtp.plugin_context.args.output_directory = None
+    package = Package(
+        "valid_package", os.path.join(os.path.dirname(__file__), "valid_package")
+    )
+    package["make_targets"] = [{"src": [str(tmp_path / "a.c")]}]
+    package["compile_commands"] = str(tmp_path / "compile_commands.json")
+    with open(package["compile_commands"], "w", encoding="utf8") as fid:
+        json.dump(
+            [{"directory": str(tmp_path), "file": "a.c", "command": "cc a.c"}], fid
+        )
+    mock_subprocess_check_output.return_value = ""
+    assert not mtp.scan(package, "level")
+    args = mock_subprocess_check_output.call_args[0][0]
+    assert "-fsyntax-only" in args
+
+
+@mock.patch("statick_tool.plugins.tool.make.subprocess.check_output")
+def test_make_tool_plugin_scan_streaming(mock_subprocess_check_output):
+    """Test that streamed build output is parsed as it is produced.
+
+    Expected result: the project is cleaned, the build is streamed, and duplicate
+    warnings and linker errors are reported once each.
+    """
+    mtp = setup_make_tool_plugin()
+    mtp.plugin_context.args.stream_output = True
+    package = Package(
+        "valid_package", os.path.join(os.path.dirname(__file__), "valid_package")
+    )
+    package["make_targets"] = "make_targets"
+    warning = "/tmp/test.cpp:4:3: warning: unused variable 'x' [-Wunused-variable]"
+    lines = [warning, warning, "collect2: ld returned 1 exit status"]
+    with mock.patch.object(
+        MakeToolPlugin, "stream_output", return_value=iter(lines)
+    ) as mock_stream_output:
+        issues = mtp.scan(package, "level")
+    assert len(issues) == 2
+    assert issues[0].issue_type == "-Wunused-variable"
+    assert issues[1].issue_type == "linker"
+    assert "clean" in mock_subprocess_check_output.call_args[0][0]
+    assert "statick_cmake_target" in mock_stream_output.call_args[0][0]
+
+    with mock.patch.object(
+        MakeToolPlugin,
+        "stream_output",
+        side_effect=subprocess.CalledProcessError(2, "", output="mocked error"),
+    ):
+        assert mtp.scan(package, "level") is None
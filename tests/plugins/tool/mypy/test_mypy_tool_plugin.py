@@ -4,6 +4,7 @@ import argparse
 import os
 import subprocess
 import sys
+from tempfile import TemporaryDirectory
 
 import mock
 import pytest
@@ -137,3 +138,111 @@ def test_mypy_tool_plugin_scan_calledprocesserror(mock_subprocess_check_output):
     ]
     issues = mtp.scan(package, "level")
     assert not issues
+
+
+def test_mypy_tool_plugin_parse_json():
+    """Verify that we can parse the JSON output of mypy."""
+    mtp = setup_mypy_tool_plugin()
+    mtp.plugin_context.args.structured_output = True
+    output = (
+        '{"file": "/tmp/wrong_mypy.py", "line": 1, "column": 8, '
+        '"message": "Incompatible types in assignment", "hint": null, '
+        '"code": "assignment", "severity": "error"}\n'
+        '{"file": "/tmp/wrong_mypy.py", "line": 1, "column": 8, '
+        '"message": "See docs", "hint": null, "code": null, "severity": "note"}\n'
+    )
+    issues = mtp.parse_output([output])
+    assert len(issues) == 1
+    assert issues[0].filename == "/tmp/wrong_mypy.py"
+    assert issues[0].line_number == 1
+    assert issues[0].tool == "mypy"
+    assert issues[0].issue_type == "assignment"
+    assert issues[0].severity == 5
+    assert issues[0].message == "Incompatible types in assignment"
+
+
+@mock.patch("statick_tool.plugins.tool.mypy.subprocess.check_output")
+def test_mypy_tool_plugin_scan_cache_dir(mock_subprocess_check_output):
+    """Test that mypy keeps its cache in a directory for each package and level.
+
+    Expected result: mypy is given the cache directory and the SQLite cache flag
+    """
+    mock_subprocess_check_output.return_value = ""
+    mtp = setup_mypy_tool_plugin()
+    package = Package(
+        "valid_package", os.path.join(os.path.dirname(__file__), "valid_package")
+    )
+    package["python_src"] = [
+        os.path.join(os.path.dirname(__file__), "valid_package", "wrong_mypy.py")
+    ]
+    with TemporaryDirectory() as tmp_dir:
+        mtp.plugin_context.args.cache_dir = tmp_dir
+        mtp.plugin_context.args.mypy_sqlite_cache = True
+        mtp.scan(package, "level")
+        subproc_args = mock_subprocess_check_output.call_args[0][0]
+        cache_dir = os.path.join(tmp_dir, "mypy", "valid_package", "level", "cache")
+        index = subproc_args.index("--cache-dir")
+        assert subproc_args[index + 1] == cache_dir
+        assert "--sqlite-cache" in subproc_args
+
+
+@mock.patch("statick_tool.plugins.tool.mypy.subprocess.check_output")
+def test_mypy_tool_plugin_scan_daemon(mock_subprocess_check_output):
+    """Test that mypy can be run through a daemon.
+
+    Expected result: dmypy is run with a status file in the cache directory
+    """
+    mock_subprocess_check_output.return_value = ""
+    mtp = setup_mypy_tool_plugin()
+    package = Package(
+        "valid_package", os.path.join(os.path.dirname(__file__), "valid_package")
+    )
+    package["python_src"] = [
+        os.path.join(os.path.dirname(__file__), "valid_package", "wrong_mypy.py")
+    ]
+    with TemporaryDirectory() as tmp_dir:
+        mtp.plugin_context.args.cache_dir = tmp_dir
+        mtp.plugin_context.args.mypy_daemon = True
+        mtp.scan(package, "level")
+        subproc_args = mock_subprocess_check_output.call_args[0][0]
+        status_file = os.path.join(
+            tmp_dir, "mypy", "valid_package", "level", "dmypy.json"
+        )
+        assert subproc_args[:5] == ["dmypy", "--status-file", status_file, "run", "--"]
+        assert subproc_args[-1] == package["python_src"][0]
+
+
+def test_mypy_tool_plugin_scan_daemon_no_cache_dir():
+    """Test the daemon status file and binary without a cache directory.
+
+    Expected result: the status file in the working directory is named after the
+    package and level, and dmypy is taken from --dmypy-bin
+    """
+    mtp = setup_mypy_tool_plugin()
+    package = Package(
+        "valid_package", os.path.join(os.path.dirname(__file__), "valid_package")
+    )
+    package["python_src"] = [
+        os.path.join(os.path.dirname(__file__), "valid_package", "wrong_mypy.py")
+    ]
+    mtp.plugin_context.args.mypy_daemon = True
+    mtp.plugin_context.args.dmypy_bin = "/opt/mypy/bin/dmypy"
+    with mock.patch(
+        "statick_tool.plugins.tool.mypy.subprocess.check_output"
+    ) as mock_subprocess_check_output:
+        mock_subprocess_check_output.return_value = ""
+        mtp.scan(package, "level")
+        subproc_args = mock_subprocess_check_output.call_args[0][0]
+    assert subproc_args[:3] == [
+        "/opt/mypy/bin/dmypy",
+        "--status-file",
+        os.path.abspath(".dmypy-valid_package-level.json"),
+    ]
+
+
+def test_mypy_tool_plugin_get_daemon_binary():
+    """Test that dmypy is found next to the mypy binary by default."""
+    mtp = setup_mypy_tool_plugin()
+    assert mtp.get_daemon_binary() == "dmypy"
+    with mock.patch.object(mtp, "get_binary", return_value="/opt/mypy/bin/mypy"):
+        assert mtp.get_daemon_binary() == "/opt/mypy/bin/dmypy"
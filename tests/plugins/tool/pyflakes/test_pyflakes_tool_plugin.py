@@ -8,6 +8,7 @@ import sys
 import mock
 
 import statick_tool
+import statick_tool.in_process
 from statick_tool.config import Config
 from statick_tool.package import Package
 from statick_tool.plugin_context import PluginContext
@@ -149,3 +150,23 @@ def test_pyflakes_tool_plugin_scan_oserror(mock_subprocess_check_output):
     ]
     issues = pltp.scan(package, "level")
     assert issues is None
+
+
+def test_pyflakes_tool_plugin_scan_in_process():
+    """Test that running pyflakes in process finds the same issues."""
+    pftp = setup_pyflakes_tool_plugin()
+    pftp.plugin_context.args.in_process = True
+    package = Package(
+        "valid_package", os.path.join(os.path.dirname(__file__), "valid_package")
+    )
+    package["python_src"] = [
+        os.path.join(os.path.dirname(__file__), "valid_package", "pyflakes_test.py")
+    ]
+    with mock.patch(
+        "statick_tool.tool_plugin.in_process.check_output",
+        wraps=statick_tool.in_process.check_output,
+    ) as mock_check_output:
+        issues = pftp.scan(package, "level")
+    statick_tool.in_process.shutdown()
+    assert mock_check_output.called
+    assert len(issues) == 1
@@ -152,3 +152,31 @@ def test_pylint_tool_plugin_scan_oserror(mock_subprocess_check_output):
     ]
     issues = pltp.scan(package, "level")
     assert issues is None
+
+
+def test_pylint_tool_plugin_parse_json():
+    """Verify that we can parse the JSON output of pylint."""
+    pltp = setup_pylint_tool_plugin()
+    pltp.plugin_context.args.structured_output = True
+    output = (
+        '{"messages": [{"type": "warning", "symbol": "unused-import", '
+        '"message": "Unused import [os]", "messageId": "W0611", '
+        '"confidence": "UNDEFINED", "module": "valid", "obj": "", "line": 2, '
+        '"column": 0, "path": "valid.py", "absolutePath": "/tmp/valid.py"}, '
+        '{"type": "convention", "symbol": "missing-function-docstring", '
+        '"message": "Missing function or method docstring", "messageId": "C0116", '
+        '"confidence": "HIGH", "module": "valid", "obj": "func", "line": 4, '
+        '"column": 0, "path": "valid.py", "absolutePath": "/tmp/valid.py"}], '
+        '"statistics": {}}'
+    )
+    issues = pltp.parse_output([output])
+    assert len(issues) == 2
+    assert issues[0].filename == "/tmp/valid.py"
+    assert issues[0].line_number == 2
+    assert issues[0].tool == "pylint"
+    assert issues[0].issue_type == "W0611(unused-import)"
+    assert issues[0].severity == 5
+    assert issues[0].message == "Unused import [os]"
+    assert issues[1].issue_type == "C0116(missing-function-docstring)"
+    assert issues[1].message == "func: Missing function or method docstring"
+    assert not pltp.parse_output(["invalid text"])
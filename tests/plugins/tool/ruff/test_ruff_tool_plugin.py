@@ -135,3 +135,22 @@ def test_ruff_tool_plugin_scan_oserror(mock_subprocess_check_output):
     ]
     issues = rtp.scan(package, "level")
     assert issues is None
+
+
+def test_ruff_tool_plugin_parse_json():
+    """Verify that we can parse the JSON lines output of ruff."""
+    rtp = setup_ruff_tool_plugin()
+    rtp.plugin_context.args.structured_output = True
+    output = (
+        '{"code": "F401", "filename": "/tmp/valid.py", '
+        '"location": {"row": 3, "column": 8}, "message": "`os` imported but unused", '
+        '"name": "unused-import"}'
+    )
+    issues = rtp.parse_output([output])
+    assert len(issues) == 1
+    assert issues[0].filename == "/tmp/valid.py"
+    assert issues[0].line_number == 3
+    assert issues[0].tool == "ruff"
+    assert issues[0].issue_type == "F401"
+    assert issues[0].severity == 5
+    assert issues[0].message == "`os` imported but unused"
@@ -4,6 +4,7 @@ import argparse
 import os
 import subprocess
 import sys
+from tempfile import TemporaryDirectory
 
 import mock
 import pytest
@@ -27,6 +28,13 @@ def setup_spotbugs_tool_plugin(use_plugin_context=True, custom_rsc_path=None):
     arg_parser.add_argument(
         "--mapping-file-suffix", dest="mapping_file_suffix", type=str
     )
+    arg_parser.add_argument("--max-procs", dest="max_procs", type=int, default=1)
+    arg_parser.add_argument(
+        "--spotbugs-parallel", dest="spotbugs_parallel", action="store_true"
+    )
+    arg_parser.add_argument(
+        "--spotbugs-offline", dest="spotbugs_offline", action="store_true"
+    )
 
     if custom_rsc_path is not None:
         resources = Resources([custom_rsc_path])
@@ -219,6 +227,65 @@ def test_spotbugs_tool_plugin_parse_wrong_file_path():
     assert issues[0].filename == "Test.java"
 
 
+def test_spotbugs_tool_plugin_parse_xml_file():
+    """Test that a report file is parsed one element at a time.
+
+    Expected result: issues from every file entry are found, with the source
+    directory listed after them.
+    """
+    sbtp = setup_spotbugs_tool_plugin()
+    src_dir = os.path.join(
+        os.path.dirname(__file__), "valid_package", "src", "main", "java"
+    )
+    entry = "<file classname='Test'><BugInstance type='MS_MUTABLE_ARRAY' priority='High' category='MALICIOUS_CODE' message='msg' lineNumber='{}'/></file>"
+    output = "<BugCollection>{}<Project><SrcDir>{}</SrcDir></Project></BugCollection>".format(
+        "".join(entry.format(line) for line in range(1, 101)), src_dir
+    )
+    with TemporaryDirectory() as tmp_dir:
+        xml_file = os.path.join(tmp_dir, "spotbugs.xml")
+        with open(xml_file, "w", encoding="utf8") as fid:
+            fid.write(output)
+        issues = sbtp.parse_xml(xml_file)
+    assert len(issues) == 100
+    assert issues[99].line_number == 100
+    assert issues[0].filename == os.path.join(src_dir, "Test.java")
+    assert issues[0].severity == 5
+
+
+@mock.patch("statick_tool.plugins.tool.spotbugs.ToolPlugin.command_exists")
+@mock.patch("statick_tool.plugins.tool.spotbugs.subprocess.check_output")
+def test_spotbugs_tool_plugin_scan_parallel_offline(
+    mock_subprocess_check_output, mock_command_exists
+):
+    """Test that parallel and offline Maven flags are passed when requested.
+
+    Expected result: mvn is run with -T set to the number of jobs and with -o.
+    """
+    mock_subprocess_check_output.return_value = ""
+    mock_command_exists.return_value = True
+    sbtp = setup_spotbugs_tool_plugin()
+    sbtp.plugin_context.args.max_procs = 4
+    sbtp.plugin_context.args.spotbugs_parallel = True
+    sbtp.plugin_context.args.spotbugs_offline = True
+    package = Package(
+        "valid_package", os.path.join(os.path.dirname(__file__), "valid_package")
+    )
+    package["top_poms"] = [os.path.join(package.path, "pom.xml")]
+    package["all_poms"] = []
+    issues = sbtp.scan(package, "level")
+    assert not issues
+    args = mock_subprocess_check_output.call_args[0][0]
+    assert args[args.index("-T") + 1] == "4"
+    assert "-o" in args
+
+    sbtp.plugin_context.args.spotbugs_parallel = False
+    sbtp.plugin_context.args.spotbugs_offline = False
+    sbtp.scan(package, "level")
+    args = mock_subprocess_check_output.call_args[0][0]
+    assert "-T" not in args
+    assert "-o" not in args
+
+
 @mock.patch("statick_tool.plugins.tool.spotbugs.ToolPlugin.command_exists")
 def test_spotbugs_tool_plugin_scan_commandnotfound(mock_command_exists):
     """Test what happens when self.command_exists returns False.
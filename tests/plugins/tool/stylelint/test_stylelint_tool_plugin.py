@@ -4,6 +4,7 @@ import argparse
 import os
 import subprocess
 import sys
+from tempfile import TemporaryDirectory
 
 import mock
 import pytest
@@ -166,3 +167,32 @@ def test_stylelint_tool_plugin_scan_oserror(mock_subprocess_check_output):
     ]
     issues = plugin.scan(package, "level")
     assert issues is None
+
+
+@mock.patch("statick_tool.plugins.tool.stylelint.subprocess.check_output")
+def test_stylelint_tool_plugin_scan_cache(mock_subprocess_check_output):
+    """Test that stylelint keeps its cache in a directory for each package and level.
+
+    Expected result: stylelint is run with a cache location in the cache directory
+    """
+    mock_subprocess_check_output.return_value = (
+        '[{"source": "test.css", "warnings": []}]'
+    )
+    plugin = setup_stylelint_tool_plugin()
+    package = Package(
+        "valid_package", os.path.join(os.path.dirname(__file__), "valid_package")
+    )
+    package["css_src"] = [
+        os.path.join(os.path.dirname(__file__), "valid_package", "test.css")
+    ]
+    with TemporaryDirectory() as tmp_dir:
+        plugin.plugin_context.args.cache_dir = tmp_dir
+        with mock.patch.object(plugin, "get_cached_version", return_value="1.0"):
+            issues = plugin.scan(package, "level")
+        assert not issues
+        subproc_args = mock_subprocess_check_output.call_args[0][0]
+        index = subproc_args.index("--cache-location")
+        assert "--cache" in subproc_args
+        assert subproc_args[index + 1] == os.path.join(
+            tmp_dir, "stylelint", "valid_package", "level", "cache"
+        )
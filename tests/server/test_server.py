@@ -0,0 +1,136 @@
+"""Tests for the server module."""
+
+import io
+import logging
+import os
+import threading
+import time
+from tempfile import TemporaryDirectory
+
+import mock
+import pytest
+
+from statick_tool import server
+from statick_tool.args import Args
+from statick_tool.statick_tool import Statick
+
+RSC_PATH = os.path.join(os.path.dirname(__file__), "..", "statick_tool", "rsc")
+
+
+@pytest.fixture(name="statick_args")
+def fixture_statick_args():
+    """Create a Statick object and its arguments, like `statick serve` does."""
+    args = Args("Statick tool")
+    args.parser.add_argument("path", help="Path of package or workspace to scan")
+    statick = Statick(args.get_user_paths(["--user-paths", RSC_PATH]))
+    statick.gather_args(args.parser)
+    return statick, args
+
+
+def fake_scan(statick, parsed_args, start_time):
+    """Print the scanned path and the current directory instead of scanning."""
+    print(f"scanning {parsed_args.path} in {os.getcwd()}")
+    logging.warning("a warning")
+    statick.timings.append("timing")
+    return 1
+
+
+def test_get_server():
+    """Test that the server argument is split from the other arguments."""
+    assert server.get_server(["--server", "sock", "path", "--check"]) == (
+        "sock",
+        ["path", "--check"],
+    )
+    assert server.get_server(["path"]) == (None, ["path"])
+
+
+def test_handle(statick_args):
+    """Test that a scan is run with the arguments and directory of the client.
+
+    Expected results: output and log messages are sent back, the configuration is
+    only loaded again when it changes, and results of the previous scan, the tools
+    found missing and the package manager listings are dropped.
+    """
+    statick, args = statick_args
+    scan_server = server.Server(statick, args, fake_scan)
+    replies = []
+    orig_path = os.getcwd()
+    with TemporaryDirectory() as tmp_dir:
+        message = {"args": ["-u", RSC_PATH, "pkg", "--check"], "cwd": tmp_dir}
+        with mock.patch.object(
+            statick, "get_config", wraps=statick.get_config
+        ) as mock_get_config:
+            assert scan_server.handle(message, replies.append) == 1
+            assert scan_server.handle(message, replies.append) == 1
+            assert mock_get_config.call_count == 1
+
+            statick.missing_tools["default"] = ["pylint"]
+            with mock.patch.object(
+                server.version_cache, "clear_queries"
+            ) as mock_clear_queries:
+                assert scan_server.handle(message, replies.append) == 1
+                mock_clear_queries.assert_called_once()
+            assert not statick.missing_tools
+
+            message["args"].append("--config=config-test.yaml")
+            assert scan_server.handle(message, replies.append) == 1
+            assert mock_get_config.call_count == 2
+        assert os.getcwd() == orig_path
+        assert {"stdout": f"scanning pkg in {os.path.realpath(tmp_dir)}"} in replies
+        assert {"stderr": "WARNING:root:a warning\n"} in replies
+        assert statick.timings == ["timing"]
+
+
+def test_handle_invalid(statick_args):
+    """Test that invalid requests are reported with an error exit code."""
+    statick, args = statick_args
+    scan_server = server.Server(statick, args, fake_scan)
+    replies = []
+    message = {"args": ["-u", RSC_PATH, "--not-an-option"], "cwd": os.getcwd()}
+    assert scan_server.handle(message, replies.append) == 2
+    assert any("usage" in reply.get("stderr", "") for reply in replies)
+
+    message = {"args": ["pkg"], "cwd": os.getcwd()}
+    assert scan_server.handle(message, replies.append) == 2
+
+    message = {"args": ["pkg"], "cwd": "/does/not/exist"}
+    assert scan_server.handle(message, replies.append) == 2
+
+    assert scan_server.handle({}, replies.append) == 2
+
+
+def test_serve_request(statick_args):
+    """Test that a client gets the output and exit code of a scan from the server."""
+    statick, args = statick_args
+    scan_server = server.Server(statick, args, fake_scan)
+    with TemporaryDirectory() as tmp_dir:
+        socket_path = os.path.join(tmp_dir, "statick.sock")
+        thread = threading.Thread(target=scan_server.serve, args=(socket_path,))
+        thread.start()
+        try:
+            for _ in range(100):
+                if scan_server.socket_server is not None:
+                    break
+                time.sleep(0.05)
+            assert server.is_server_running(socket_path)
+            assert oct(os.stat(socket_path).st_mode & 0o777) == oct(0o600)
+            # The server redirects the output of this process, so read it separately.
+            output = (io.StringIO(), io.StringIO())
+            assert (
+                server.request(socket_path, ["-u", RSC_PATH, "pkg"], tmp_dir, output)
+                == 1
+            )
+        finally:
+            scan_server.shutdown()
+            thread.join()
+        assert not os.path.exists(socket_path)
+    assert "scanning pkg in" in output[0].getvalue()
+    assert "a warning" in output[1].getvalue()
+
+
+def test_request_no_server():
+    """Test that a missing server is reported with an error exit code."""
+    with TemporaryDirectory() as tmp_dir:
+        socket_path = os.path.join(tmp_dir, "statick.sock")
+        assert server.request(socket_path, ["pkg"]) == 2
+        assert not server.is_server_running(socket_path)
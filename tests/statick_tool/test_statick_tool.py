@@ -7,14 +7,18 @@ import shutil
 import subprocess
 import sys
 import time
+from tempfile import TemporaryDirectory
 
 import mock
 import pytest
 
 from statick_tool.args import Args
 from statick_tool.discovery_plugin import DiscoveryPlugin
+from statick_tool.issue import Issue
 from statick_tool.package import Package
 from statick_tool.plugins.tool.clang_tidy import ClangTidyToolPlugin
+from statick_tool.plugins.tool.pylint import PylintToolPlugin
+from statick_tool.profile import Profile
 from statick_tool.statick_tool import Statick
 
 LOGGER = logging.getLogger(__name__)
@@ -95,6 +99,22 @@ def test_get_level(init_statick):
     assert level == "default_value"
 
 
+@mock.patch("statick_tool.statick_tool.Profile", wraps=Profile)
+def test_get_level_profile_reused(mock_profile, init_statick):
+    """Test that a profile is only parsed again when it changes.
+
+    Expected result: the profile is parsed once for several packages
+    """
+    args = Args("Statick tool")
+    args.parser.add_argument(
+        "--profile", dest="profile", type=str, default="profile-test.yaml"
+    )
+    args.parser.add_argument("--level", dest="level", type=str)
+    assert init_statick.get_level("some_package", args.get_args([])) == "default_value"
+    assert init_statick.get_level("package", args.get_args([])) == "package_specific"
+    assert mock_profile.call_count == 1
+
+
 def test_get_level_non_default(init_statick):
     """Test searching for a level when a package has a custom level.
 
@@ -568,6 +588,83 @@ def test_run_tool_dependency(init_statick):
         print(f"Error: {ex}")
 
 
+@mock.patch("statick_tool.plugins.tool.pylint.PylintToolPlugin.is_available")
+def test_run_missing_tool_skipped(mock_is_available, init_statick, caplog):
+    """Test that a tool that is not installed is reported once and fails the scan.
+
+    Expected results: the tool is not run, no issues are reported for it, success is
+    False, and tools are only looked up once per level.
+    """
+    mock_is_available.return_value = False
+    args = Args("Statick tool")
+    args.parser.add_argument("--path", help="Path of package to scan")
+
+    statick = Statick(args.get_user_paths())
+    statick.gather_args(args.parser)
+    sys.argv = [
+        "--path",
+        os.path.dirname(__file__),
+        "--profile",
+        os.path.join(os.path.dirname(__file__), "rsc", "profile-custom.yaml"),
+        "--config",
+        os.path.join(os.path.dirname(__file__), "rsc", "config.yaml"),
+    ]
+    parsed_args = args.get_args(sys.argv)
+    path = parsed_args.path
+    statick.get_config(parsed_args)
+    statick.get_exceptions(parsed_args)
+    with caplog.at_level(logging.INFO):
+        issues, success = statick.run(path, parsed_args)
+        issues, success = statick.run(path, parsed_args)
+    assert "pylint" not in issues
+    assert not success
+    assert statick.missing_tools == {"custom": ["pylint"]}
+    mock_is_available.assert_called_once_with("custom")
+    assert "pylint is not installed and can't be run." in caplog.text
+    assert "pylint tool plugin failed, it is not installed." in caplog.text
+
+
+@mock.patch("statick_tool.plugins.tool.clang_tidy.ClangTidyToolPlugin.scan")
+@mock.patch("statick_tool.plugins.tool.clang_tidy.ClangTidyToolPlugin.is_available")
+@mock.patch("statick_tool.plugins.tool.make.MakeToolPlugin.is_available")
+def test_run_missing_tool_dependency_skipped(
+    mock_make_available, mock_clang_tidy_available, mock_clang_tidy_scan, caplog
+):
+    """Test that a tool depending on a tool that is not installed is not run.
+
+    Expected results: the dependent tool is not run and success is False.
+    """
+    mock_make_available.return_value = False
+    mock_clang_tidy_available.return_value = True
+    args = Args("Statick tool")
+    args.parser.add_argument("--path", help="Path of package to scan")
+
+    statick = Statick(args.get_user_paths())
+    statick.gather_args(args.parser)
+    with TemporaryDirectory() as tmp_dir:
+        sys.argv = [
+            "--path",
+            os.path.dirname(__file__),
+            "--output-directory",
+            tmp_dir,
+            "--profile",
+            os.path.join(os.path.dirname(__file__), "rsc", "profile-custom.yaml"),
+            "--config",
+            os.path.join(
+                os.path.dirname(__file__), "rsc", "config-enabled-dependency.yaml"
+            ),
+        ]
+        parsed_args = args.get_args(sys.argv)
+        statick.get_config(parsed_args)
+        statick.get_exceptions(parsed_args)
+        with caplog.at_level(logging.INFO):
+            issues, success = statick.run(parsed_args.path, parsed_args)
+    assert "clang-tidy" not in issues
+    assert not success
+    mock_clang_tidy_scan.assert_not_called()
+    assert "clang-tidy tool plugin failed, it depends on make" in caplog.text
+
+
 def test_run_discovery_dependency(init_statick):
     """Test that a discovery plugin can run its dependencies.
 
@@ -770,7 +867,8 @@ def test_run_mkdir_oserror(mocked_mkdir, init_statick):
         print(f"Error: {ex}")
 
 
-def test_run_file_cmd_does_not_exist(init_statick):
+@mock.patch.object(PylintToolPlugin, "is_available", return_value=True)
+def test_run_file_cmd_does_not_exist(mock_is_available, init_statick):
     """Test when file command does not exist.
 
     Expected results: no issues found even though Python file without extension does
@@ -912,6 +1010,120 @@ def test_run_workspace(init_statick_ws):
     assert success
 
 
+@mock.patch.object(PylintToolPlugin, "get_file_types")
+@mock.patch.object(PylintToolPlugin, "scan")
+def test_run_files(mock_scan, mock_get_file_types, init_statick):
+    """Test scanning only some files of a package.
+
+    Expected results: only the given files are discovered and tools that can't scan
+    single files are skipped.
+    """
+    mock_scan.return_value = []
+    mock_get_file_types.return_value = ["python_src"]
+    args = Args("Statick tool")
+    args.parser.add_argument("--path", help="Path of package to scan")
+
+    statick = Statick(args.get_user_paths())
+    statick.gather_args(args.parser)
+    sys.argv = [
+        "--path",
+        os.path.dirname(__file__),
+        "--profile",
+        os.path.join(os.path.dirname(__file__), "rsc", "profile-custom.yaml"),
+        "--config",
+        os.path.join(
+            os.path.dirname(__file__), "rsc", "config-no-reporting-plugins.yaml"
+        ),
+        "--exceptions",
+        os.path.join(os.path.dirname(__file__), "rsc", "exceptions.yaml"),
+        "--files",
+        f"{__file__},{os.path.join(os.path.dirname(__file__), 'rsc', 'profile-custom.yaml')}",
+        "--force-tool-list",
+        "pylint",
+    ]
+    parsed_args = args.get_args(sys.argv)
+    statick.get_config(parsed_args)
+    statick.get_exceptions(parsed_args)
+    issues, success = statick.run(parsed_args.path, parsed_args)
+    assert success
+    assert not issues["pylint"]
+    package = mock_scan.call_args[0][0]
+    assert package["python_src"] == [os.path.abspath(__file__)]
+    assert package["file_subset"] == sorted(package.files)
+    assert list(package.files) == [
+        os.path.abspath(__file__),
+        os.path.join(os.path.dirname(__file__), "rsc", "profile-custom.yaml"),
+    ]
+
+    mock_scan.reset_mock()
+    mock_get_file_types.return_value = []
+    issues, success = statick.run(parsed_args.path, parsed_args)
+    assert success
+    assert "pylint" not in issues
+    mock_scan.assert_not_called()
+
+
+@mock.patch.object(PylintToolPlugin, "scan")
+@mock.patch.object(PylintToolPlugin, "is_package_agnostic")
+@mock.patch("statick_tool.statick_tool.workspace_tools.scan")
+def test_run_workspace_coalesce(
+    mock_workspace_scan, mock_is_package_agnostic, mock_scan, init_statick_ws
+):
+    """Test running package-agnostic tools once for a whole workspace.
+
+    Expected results: the tool is run once for all packages, not in each package, and
+    its issues are reported for the package owning each file.
+    """
+
+    def workspace_scan(plugin, packages, level, output_dir):
+        assert level == "custom"
+        assert output_dir.endswith("all_packages-custom")
+        return {
+            package.path: [
+                Issue(
+                    os.path.join(package.path, "hello"),
+                    1,
+                    plugin.get_name(),
+                    "warning",
+                    3,
+                    "message",
+                    None,
+                )
+            ]
+            for package in packages
+        }
+
+    mock_workspace_scan.side_effect = workspace_scan
+    mock_is_package_agnostic.return_value = True
+    statick = init_statick_ws[0]
+    args = init_statick_ws[1]
+    sys.argv = init_statick_ws[2]
+    sys.argv.extend(
+        [
+            "--max-procs",
+            "1",
+            "--workspace-coalesce",
+            "--profile",
+            os.path.join(os.path.dirname(__file__), "rsc", "profile-custom.yaml"),
+            "--config",
+            os.path.join(os.path.dirname(__file__), "rsc", "config.yaml"),
+        ]
+    )
+
+    parsed_args = args.get_args(sys.argv)
+    statick.get_config(parsed_args)
+    issues, success = statick.run_workspace(parsed_args)
+
+    assert not success
+    assert mock_workspace_scan.call_count == 1
+    assert not mock_scan.called
+    assert sorted(os.path.basename(issue.filename) for issue in issues["pylint"]) == [
+        "hello",
+        "hello",
+    ]
+    assert len(statick.discovered_packages) == 2
+
+
 def test_run_workspace_one_proc(init_statick_ws):
     """Test running Statick on a workspace."""
     statick = init_statick_ws[0]
@@ -1,15 +1,20 @@
 """Tests for statick_tool.tool_plugin."""
 
 import argparse
+import json
 import os
 import stat
+import subprocess
 import sys
 import tempfile
 from tempfile import TemporaryDirectory
 
+import mock
 import pytest
 
+from statick_tool import version_cache
 from statick_tool.config import Config
+from statick_tool.package import Package
 from statick_tool.plugin_context import PluginContext
 from statick_tool.resources import Resources
 from statick_tool.tool_plugin import ToolPlugin
@@ -337,3 +342,311 @@ def test_tool_plugin_command_exists_shortpath_invalid(monkeypatch):
             os.chmod(tmp_file.name, st.st_mode | stat.S_IXUSR)
             _, tmp_file_name = os.path.split(tmp_file.name)
             assert not ToolPlugin.command_exists(tmp_file_name)
+
+
+def test_tool_plugin_get_num_jobs():
+    """Test that the number of jobs comes from the max-procs argument."""
+    tp = ToolPlugin()
+    assert tp.get_num_jobs() == 1
+    arg_parser = argparse.ArgumentParser()
+    plugin_context = PluginContext(arg_parser.parse_args([]), None, None)
+    tp.set_plugin_context(plugin_context)
+    assert tp.get_num_jobs() == 1
+    plugin_context.args.max_procs = 4
+    assert tp.get_num_jobs() == 4
+    plugin_context.args.max_procs = 0
+    assert tp.get_num_jobs() == 1
+
+
+class NamedToolPlugin(ToolPlugin):
+    """Tool plugin with a name."""
+
+    def get_name(self):
+        """Get name of tool."""
+        return "named"
+
+
+def test_tool_plugin_get_cache_dir():
+    """Test that cache directories are only used when a cache directory is given."""
+    tp = NamedToolPlugin()
+    assert tp.get_cache_dir() is None
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--cache-dir", dest="cache_dir")
+    plugin_context = PluginContext(arg_parser.parse_args([]), None, None)
+    tp.set_plugin_context(plugin_context)
+    assert tp.get_cache_dir() is None
+    with TemporaryDirectory() as tmp_dir:
+        plugin_context.args.cache_dir = tmp_dir
+        cache_dir = tp.get_cache_dir("package", "level")
+        assert cache_dir == os.path.join(tmp_dir, "named", "package", "level")
+        assert os.path.isdir(cache_dir)
+
+
+def test_tool_plugin_get_cache_file():
+    """Test that a tool cache is kept until the tool setup changes.
+
+    Expected result: the cache file is removed when the version, flags or configuration
+    of the tool change, and kept otherwise.
+    """
+    tp = NamedToolPlugin()
+    assert tp.get_cache_file("package", "level", [], []) is None
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--cache-dir", dest="cache_dir")
+    plugin_context = PluginContext(arg_parser.parse_args([]), None, None)
+    tp.set_plugin_context(plugin_context)
+    with TemporaryDirectory() as tmp_dir:
+        plugin_context.args.cache_dir = tmp_dir
+        config_file = os.path.join(tmp_dir, "config")
+        with open(config_file, "w", encoding="utf8") as fid:
+            fid.write("a")
+
+        def get_cache_file(version, flags):
+            with mock.patch.object(tp, "get_cached_version", return_value=version):
+                cache_file = tp.get_cache_file("package", "level", flags, [config_file])
+            assert cache_file == os.path.join(
+                tmp_dir, "named", "package", "level", "cache"
+            )
+            return cache_file
+
+        cache_file = get_cache_file("1.0", ["-f"])
+        with open(cache_file, "w", encoding="utf8") as fid:
+            fid.write("cached")
+        assert os.path.exists(get_cache_file("1.0", ["-f"]))
+        assert not os.path.exists(get_cache_file("2.0", ["-f"]))
+
+        with open(cache_file, "w", encoding="utf8") as fid:
+            fid.write("cached")
+        assert not os.path.exists(get_cache_file("2.0", ["-g"]))
+
+        with open(cache_file, "w", encoding="utf8") as fid:
+            fid.write("cached")
+        with open(config_file, "w", encoding="utf8") as fid:
+            fid.write("b")
+        assert not os.path.exists(get_cache_file("2.0", ["-g"]))
+
+
+def test_tool_plugin_use_structured_output():
+    """Test that structured output is only used when requested."""
+    tp = ToolPlugin()
+    assert not tp.use_structured_output()
+    arg_parser = argparse.ArgumentParser()
+    plugin_context = PluginContext(arg_parser.parse_args([]), None, None)
+    tp.set_plugin_context(plugin_context)
+    assert not tp.use_structured_output()
+    plugin_context.args.structured_output = True
+    assert tp.use_structured_output()
+
+
+def test_tool_plugin_iter_json():
+    """Test that JSON documents are found among other output.
+
+    Expected result: documents and JSON lines are decoded, while log lines and
+    invalid JSON are skipped.
+    """
+    output = '[main] INFO running\n{"a": 1}\n{"b": "]"}\n{"c":\nnot json\n[1, 2]\n'
+    assert list(ToolPlugin.iter_json(output)) == [{"a": 1}, {"b": "]"}, [1, 2]]
+    assert not list(ToolPlugin.iter_json(""))
+
+
+def test_tool_plugin_stream_output(tmp_path, monkeypatch):
+    """Test that tool output is yielded line by line and copied to the log.
+
+    Expected result: lines are yielded without line endings, the log holds the full
+    output, and a failing tool raises with the last lines of output.
+    """
+    monkeypatch.chdir(tmp_path)
+    tp = NamedToolPlugin()
+    arg_parser = argparse.ArgumentParser()
+    plugin_context = PluginContext(arg_parser.parse_args([]), None, None)
+    plugin_context.args.output_directory = str(tmp_path)
+    tp.set_plugin_context(plugin_context)
+    assert not tp.use_stream_output()
+    plugin_context.args.stream_output = True
+    assert tp.use_stream_output()
+
+    script = "import sys\nfor i in range(3): print(i)\nsys.exit(int(sys.argv[1]))"
+    lines = list(tp.stream_output([sys.executable, "-c", script, "0"]))
+    assert lines == ["0", "1", "2"]
+    with open(os.path.join(tmp_path, "named.log"), encoding="utf8") as fid:
+        assert fid.read() == "0\n1\n2\n"
+
+    tp.STREAM_TAIL_LINES = 2
+    with pytest.raises(subprocess.CalledProcessError) as ex:
+        for _ in tp.stream_output([sys.executable, "-c", script, "3"]):
+            pass
+    assert ex.value.returncode == 3
+    assert ex.value.output == "1\n2\n"
+
+    with pytest.raises(OSError):
+        list(tp.stream_output([os.path.join(str(tmp_path), "nonexistent")]))
+
+
+class VersionedToolPlugin(ToolPlugin):
+    """Tool plugin that counts version lookups."""
+
+    def __init__(self, binary):
+        """Initialize the plugin with a binary."""
+        self.binary = binary
+        self.version_calls = 0
+
+    def get_name(self):
+        """Get name of tool."""
+        return "versioned"
+
+    def get_binary(self, level=None, package=None):
+        """Get tool binary name."""
+        return self.binary
+
+    def get_version(self):
+        """Get version of tool."""
+        self.version_calls += 1
+        return "1.0"
+
+
+def test_tool_plugin_get_cached_version(tmp_path):
+    """Test that versions are looked up once per tool binary.
+
+    Expected result: the version is cached across plugin instances and runs, and
+    missing binaries are always looked up.
+    """
+    version_cache.clear()
+    tool_bin = os.path.join(tmp_path, "versioned")
+    with open(tool_bin, "w", encoding="utf8") as fid:
+        fid.write("#!/bin/sh\n")
+    os.chmod(tool_bin, os.stat(tool_bin).st_mode | stat.S_IEXEC)
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--cache-dir", dest="cache_dir")
+    plugin_context = PluginContext(
+        arg_parser.parse_args(["--cache-dir", str(tmp_path)]), None, None
+    )
+    tp = VersionedToolPlugin(tool_bin)
+    tp.set_plugin_context(plugin_context)
+    assert tp.get_cached_version() == "1.0"
+    assert tp.get_cached_version() == "1.0"
+    assert tp.version_calls == 1
+
+    version_cache.clear()
+    other_tp = VersionedToolPlugin(tool_bin)
+    other_tp.set_plugin_context(plugin_context)
+    assert other_tp.get_cached_version() == "1.0"
+    assert other_tp.version_calls == 0
+
+    missing_tp = VersionedToolPlugin(os.path.join(tmp_path, "missing"))
+    assert missing_tp.get_cached_version() == "1.0"
+    assert missing_tp.get_cached_version() == "1.0"
+    assert missing_tp.version_calls == 2
+    version_cache.clear()
+
+
+@mock.patch("statick_tool.version_cache.subprocess.check_output")
+def test_tool_plugin_get_version_from_npm(mock_subprocess_check_output):
+    """Test that npm versions are found locally and then globally."""
+    version_cache.clear()
+    tp = NamedToolPlugin()
+
+    def npm_list(args, **kwargs):  # pylint: disable=unused-argument
+        if "-g" in args:
+            return json.dumps({"dependencies": {"named-lint": {"version": "2.0.1"}}})
+        return json.dumps({"dependencies": {"eslint": {"version": "8.57.0"}}})
+
+    mock_subprocess_check_output.side_effect = npm_list
+    assert tp.get_version_from_npm() == "named-lint@2.0.1"
+    assert tp.get_version_from_npm() == "named-lint@2.0.1"
+    assert mock_subprocess_check_output.call_count == 2
+
+    version_cache.clear()
+    mock_subprocess_check_output.side_effect = OSError("mocked error")
+    assert tp.get_version_from_npm() == "Unknown"
+    version_cache.clear()
+
+
+class SlowToolPlugin(ToolPlugin):
+    """Tool plugin with a binary that takes a long time to print its version."""
+
+    def __init__(self, binary):
+        """Initialize the plugin with a binary."""
+        self.binary = binary
+
+    def get_name(self):
+        """Get name of tool."""
+        return "slow"
+
+    def get_binary(self, level=None, package=None):
+        """Get tool binary name."""
+        return self.binary
+
+
+def test_tool_plugin_get_version_timeout(tmp_path):
+    """Test that a version probe that takes too long is stopped.
+
+    Expected result: the version is unknown once the timeout expires.
+    """
+    tool_bin = os.path.join(tmp_path, "slow")
+    with open(tool_bin, "w", encoding="utf8") as fid:
+        fid.write("#!/bin/sh\nsleep 10\n")
+    os.chmod(tool_bin, os.stat(tool_bin).st_mode | stat.S_IEXEC)
+    tp = SlowToolPlugin(tool_bin)
+    assert tp.get_version_timeout() is None
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument(
+        "--tool-versions-timeout", dest="tool_versions_timeout", type=float
+    )
+    plugin_context = PluginContext(
+        arg_parser.parse_args(["--tool-versions-timeout", "0.2"]), None, None
+    )
+    tp.set_plugin_context(plugin_context)
+    assert tp.get_version_timeout() == 0.2
+    assert tp.get_version() == "Unknown"
+
+
+def test_tool_plugin_command_exists_cached(monkeypatch, tmp_path):
+    """Test that PATH lookups are cached for the same PATH.
+
+    Expected result: a command found on PATH is not looked up again until PATH
+    changes.
+    """
+    monkeypatch.delenv("PATHEXT", raising=False)
+    tool_bin = os.path.join(tmp_path, "cached-tool")
+    with open(tool_bin, "w", encoding="utf8") as fid:
+        fid.write("#!/bin/sh\n")
+    os.chmod(tool_bin, os.stat(tool_bin).st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", str(tmp_path))
+    assert ToolPlugin.command_exists("cached-tool")
+    os.remove(tool_bin)
+    assert ToolPlugin.command_exists("cached-tool")
+    monkeypatch.setenv("PATH", str(tmp_path) + os.pathsep + str(tmp_path))
+    assert not ToolPlugin.command_exists("cached-tool")
+
+
+def test_tool_plugin_is_available(tmp_path):
+    """Test that a tool is available when its binary can be run."""
+    tool_bin = os.path.join(tmp_path, "available")
+    with open(tool_bin, "w", encoding="utf8") as fid:
+        fid.write("#!/bin/sh\n")
+    os.chmod(tool_bin, os.stat(tool_bin).st_mode | stat.S_IEXEC)
+    assert SlowToolPlugin(tool_bin).is_available()
+    assert not SlowToolPlugin(os.path.join(tmp_path, "missing")).is_available()
+    assert SlowToolPlugin("").is_available()
+
+
+def test_tool_plugin_is_package_agnostic():
+    """Test that tools are not run over a whole workspace unless they opt in."""
+    assert not ToolPlugin().is_package_agnostic()
+
+
+def test_tool_plugin_supports_file_subset():
+    """Test that tools scanning files of some types can scan some files of a package."""
+    plugin = ToolPlugin()
+    with mock.patch.object(ToolPlugin, "get_file_types", return_value=None):
+        assert not plugin.supports_file_subset()
+    with mock.patch.object(ToolPlugin, "get_file_types", return_value=["python_src"]):
+        assert plugin.supports_file_subset()
+
+
+def test_tool_plugin_get_file_subset():
+    """Test that files are limited to the file subset of a package, if it has one."""
+    package = Package("package", "/package")
+    files = ["/package/a.c", "/package/b.c"]
+    assert ToolPlugin.get_file_subset(package, files) == files
+    package["file_subset"] = ["/package/b.c", "/package/c.py"]
+    assert ToolPlugin.get_file_subset(package, files) == ["/package/b.c"]
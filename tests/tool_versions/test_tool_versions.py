@@ -56,6 +56,36 @@ def test_collect_versions(init_statick):
     assert len(versions) > 0
 
 
+def test_collect_versions_parallel(init_statick):
+    """Test collecting all tool versions with several jobs.
+
+    Expected result: versions are reported once per tool in plugin order.
+    """
+    args = Args("Statick tool")
+    args.parser.add_argument(
+        "--path", help="Path of package to scan", default=os.path.dirname(__file__)
+    )
+
+    statick = Statick(args.get_user_paths())
+    statick.gather_args(args.parser)
+    sys.argv = [
+        "--output-directory",
+        os.path.dirname(__file__),
+        "--path",
+        os.path.dirname(__file__),
+        "--max-procs",
+        "4",
+        "--tool-versions-timeout",
+        "10",
+    ]
+    parsed_args = args.get_args(sys.argv)
+    statick.get_config(parsed_args)
+
+    assert statick.collect_tool_versions(args=parsed_args)
+    versions = statick.get_tool_versions()
+    assert [version.tool for version in versions] == list(statick.tool_plugins)
+
+
 def test_collect_versions_missing_path(init_statick):
     """Test running Statick against a package that does not exist."""
     args = Args("Statick tool")
@@ -3,6 +3,7 @@ import argparse
 import os
 import subprocess
 import sys
+from tempfile import TemporaryDirectory
 
 import mock
 import pytest
@@ -12,6 +13,7 @@ from statick_tool.plugin_context import PluginContext
 from statick_tool.resources import Resources
 
 import statick_tool
+from statick_tool.plugins.tool import val_runner
 from statick_tool.plugins.tool.val_parser import ValParserToolPlugin
 
 if sys.version_info < (3, 10):
@@ -241,7 +243,7 @@ def test_val_parser_tool_plugin_parse_invalid():
     assert not issues
 
 
-@mock.patch("statick_tool.plugins.tool.val_parser.subprocess.check_output")
+@mock.patch("statick_tool.plugins.tool.val_runner.subprocess.check_output")
 def test_val_parser_tool_plugin_scan_calledprocesserror(mock_subprocess_check_output):
     """
     Test what happens when a CalledProcessError is raised (usually means Parser hit an error).
@@ -281,7 +283,7 @@ def test_val_parser_tool_plugin_scan_calledprocesserror(mock_subprocess_check_ou
         print(f"Error: {ex}")
 
 
-@mock.patch("statick_tool.plugins.tool.val_parser.subprocess.check_output")
+@mock.patch("statick_tool.plugins.tool.val_runner.subprocess.check_output")
 def test_val_parser_tool_plugin_scan_oserror(mock_subprocess_check_output):
     """
     Test what happens when an OSError is raised (usually means Parser doesn't exist).
@@ -313,3 +315,142 @@ def test_val_parser_tool_plugin_scan_oserror(mock_subprocess_check_output):
         print(f"Error: {ex}")
     except OSError as ex:
         print(f"Error: {ex}")
+
+
+def test_val_runner_get_pairs():
+    """Test that problems are paired with the domain they declare."""
+    with TemporaryDirectory() as tmp_dir:
+        files = {}
+        for name, contents in [
+            ("d1.pddl", "(define (domain one)\n)"),
+            ("d2.pddl", "(define (domain TWO)\n)"),
+            ("d3.pddl", "(define (domain three)\n)"),
+            ("p1.pddl", "(define (problem a) (:domain two)\n)"),
+            ("p2.pddl", "(define (problem b)\n  (:domain one)\n)"),
+            ("p3.pddl", "(define (problem c) (:domain missing)\n)"),
+        ]:
+            files[name] = os.path.join(tmp_dir, name)
+            with open(files[name], "w", encoding="utf8") as fid:
+                fid.write(contents)
+
+        assert val_runner.get_domain_name(files["d2.pddl"]) == "two"
+        assert val_runner.get_domain_name(files["p2.pddl"]) == "one"
+        assert val_runner.get_domain_name(os.path.join(tmp_dir, "missing")) is None
+
+        assert val_runner.get_pairs([files["d1.pddl"]], []) == [[files["d1.pddl"]]]
+        assert val_runner.get_pairs(
+            [files["d1.pddl"]], [files["p1.pddl"], files["p2.pddl"]]
+        ) == [
+            [files["d1.pddl"], files["p1.pddl"]],
+            [files["d1.pddl"], files["p2.pddl"]],
+        ]
+        assert val_runner.get_pairs(
+            [files["d1.pddl"], files["d2.pddl"], files["d3.pddl"]],
+            [files["p1.pddl"], files["p2.pddl"], files["p3.pddl"]],
+        ) == [
+            [files["d2.pddl"], files["p1.pddl"]],
+            [files["d1.pddl"], files["p2.pddl"]],
+            [files["d3.pddl"]],
+        ]
+
+
+@mock.patch("statick_tool.plugins.tool.val_runner.subprocess.check_output")
+def test_val_runner_run(mock_subprocess_check_output):
+    """Test that pairs are run in parallel and output is kept in order.
+
+    Expected result: each pair is run with the timeout, runs that time out have None
+    as their output, and issues found by VAL do not fail the run.
+    """
+
+    def check_output(subproc_args, **kwargs):
+        assert kwargs["timeout"] == 5
+        problem = subproc_args[-1]
+        if problem == "slow.pddl":
+            raise subprocess.TimeoutExpired(subproc_args, 5)
+        if problem == "bad.pddl":
+            raise subprocess.CalledProcessError(255, subproc_args, output="bad\n")
+        return problem + "\n"
+
+    mock_subprocess_check_output.side_effect = check_output
+    pairs = [
+        ["d.pddl", "p1.pddl"],
+        ["d.pddl", "slow.pddl"],
+        ["d.pddl", "bad.pddl"],
+        ["d.pddl", "p2.pddl"],
+    ]
+    assert val_runner.run(["Parser"], pairs, 4, 5) == [
+        "p1.pddl\n",
+        None,
+        "bad\n",
+        "p2.pddl\n",
+    ]
+
+    mock_subprocess_check_output.side_effect = subprocess.CalledProcessError(
+        1, "Parser", output="crash"
+    )
+    assert val_runner.run(["Parser"], pairs, 4, 5) is None
+
+
+@mock.patch("statick_tool.plugins.tool.val_runner.subprocess.check_output")
+def test_val_parser_tool_plugin_scan_pairs(mock_subprocess_check_output):
+    """Test that Parser is run once for each problem.
+
+    Expected result: issues from every run are reported
+    """
+    mock_subprocess_check_output.side_effect = lambda args, **kwargs: (
+        "Errors: 0, warnings: 1\n"
+        + args[-1]
+        + ": line: 3: Warning: Undeclared symbol: x\n"
+    )
+    vtp = setup_val_parser_tool_plugin()
+    vtp.plugin_context.args.val_parser_timeout = 10
+    package = Package(
+        "valid_package", os.path.join(os.path.dirname(__file__), "valid_package")
+    )
+    package["pddl_domain_src"] = [
+        os.path.join(os.path.dirname(__file__), "valid_package", "domain.pddl"),
+    ]
+    package["pddl_problem_src"] = ["/tmp/p1.pddl", "/tmp/p2.pddl"]
+    issues = vtp.scan(package, "level")
+    assert [issue.filename for issue in issues] == ["/tmp/p1.pddl", "/tmp/p2.pddl"]
+    assert mock_subprocess_check_output.call_count == 2
+    assert mock_subprocess_check_output.call_args[1]["timeout"] == 10
+
+    try:
+        os.remove(os.path.join(os.getcwd(), "val_parser.log"))
+    except OSError as ex:
+        print(f"Error: {ex}")
+
+
+@mock.patch("statick_tool.plugins.tool.val_runner.subprocess.check_output")
+def test_val_parser_tool_plugin_scan_timeout(mock_subprocess_check_output):
+    """Test that a check that times out is reported.
+
+    Expected result: an issue of type timeout is reported on the problem file
+    """
+
+    def check_output(subproc_args, **kwargs):
+        if subproc_args[-1] == "/tmp/slow.pddl":
+            raise subprocess.TimeoutExpired(subproc_args, kwargs["timeout"])
+        return "Errors: 0, warnings: 0\n"
+
+    mock_subprocess_check_output.side_effect = check_output
+    vtp = setup_val_parser_tool_plugin()
+    vtp.plugin_context.args.val_parser_timeout = 10
+    package = Package(
+        "valid_package", os.path.join(os.path.dirname(__file__), "valid_package")
+    )
+    domain = os.path.join(os.path.dirname(__file__), "valid_package", "domain.pddl")
+    package["pddl_domain_src"] = [domain]
+    package["pddl_problem_src"] = ["/tmp/p1.pddl", "/tmp/slow.pddl"]
+    issues = vtp.scan(package, "level")
+    assert len(issues) == 1
+    assert issues[0].filename == "/tmp/slow.pddl"
+    assert issues[0].tool == "val_parser"
+    assert issues[0].issue_type == "timeout"
+    assert "10.0 seconds" in issues[0].message
+
+    try:
+        os.remove(os.path.join(os.getcwd(), "val_parser.log"))
+    except OSError as ex:
+        print(f"Error: {ex}")
@@ -208,7 +208,7 @@ def test_val_validate_tool_plugin_parse_invalid():
 
 
 @mock.patch(
-    "statick_tool.plugins.tool.val_validate.subprocess.check_output"
+    "statick_tool.plugins.tool.val_runner.subprocess.check_output"
 )
 def test_val_validate_tool_plugin_scan_calledprocesserror(mock_subprocess_check_output):
     """
@@ -250,7 +250,7 @@ def test_val_validate_tool_plugin_scan_calledprocesserror(mock_subprocess_check_
 
 
 @mock.patch(
-    "statick_tool.plugins.tool.val_validate.subprocess.check_output"
+    "statick_tool.plugins.tool.val_runner.subprocess.check_output"
 )
 def test_val_validate_tool_plugin_scan_oserror(mock_subprocess_check_output):
     """
@@ -283,3 +283,30 @@ def test_val_validate_tool_plugin_scan_oserror(mock_subprocess_check_output):
         print(f"Error: {ex}")
     except OSError as ex:
         print(f"Error: {ex}")
+
+
+@mock.patch("statick_tool.plugins.tool.val_runner.subprocess.check_output")
+def test_val_validate_tool_plugin_scan_timeout(mock_subprocess_check_output):
+    """Test that a check that times out is reported.
+
+    Expected result: an issue of type timeout is reported on the domain file when
+    there is no problem file
+    """
+    mock_subprocess_check_output.side_effect = subprocess.TimeoutExpired("Validate", 5)
+    vtp = setup_val_validate_tool_plugin()
+    vtp.plugin_context.args.val_validate_timeout = 5
+    package = Package(
+        "valid_package", os.path.join(os.path.dirname(__file__), "valid_package")
+    )
+    domain = os.path.join(os.path.dirname(__file__), "valid_package", "domain.pddl")
+    package["pddl_domain_src"] = [domain]
+    issues = vtp.scan(package, "level")
+    assert len(issues) == 1
+    assert issues[0].filename == domain
+    assert issues[0].tool == "val_validate"
+    assert issues[0].issue_type == "timeout"
+
+    try:
+        os.remove(os.path.join(os.getcwd(), "val_validate.log"))
+    except OSError as ex:
+        print(f"Error: {ex}")
@@ -0,0 +1,168 @@
+"""Tests for the tool version cache."""
+
+import json
+import os
+import stat
+import subprocess
+import threading
+
+import mock
+import pytest
+
+from statick_tool import version_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Forget cached results between tests."""
+    version_cache.clear()
+    yield
+    version_cache.clear()
+
+
+def write_executable(directory, name="tool"):
+    """Write an executable file to a directory."""
+    filename = os.path.join(directory, name)
+    with open(filename, "w", encoding="utf8") as fid:
+        fid.write("#!/bin/sh\necho 1.0\n")
+    os.chmod(filename, os.stat(filename).st_mode | stat.S_IEXEC)
+    return filename
+
+
+def test_memoize():
+    """Test that concurrent calls with the same key only run once."""
+    calls = []
+    barrier = threading.Barrier(4)
+
+    def function():
+        calls.append(1)
+        return len(calls)
+
+    def call():
+        barrier.wait()
+        return version_cache.memoize(("key",), function)
+
+    threads = [threading.Thread(target=call) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert version_cache.memoize(("key",), function) == 1
+    assert version_cache.memoize(("other",), function) == 2
+
+
+@mock.patch("statick_tool.version_cache.subprocess.check_output")
+def test_query(mock_subprocess_check_output):
+    """Test that package manager queries are run once per process."""
+    mock_subprocess_check_output.return_value = "ii  cccc 1:3.1.4-12\nii  make 4.3\n"
+    assert version_cache.query(["dpkg", "-l"]) == [
+        "ii  cccc 1:3.1.4-12",
+        "ii  make 4.3",
+    ]
+    assert version_cache.query(["dpkg", "-l"]) == [
+        "ii  cccc 1:3.1.4-12",
+        "ii  make 4.3",
+    ]
+    mock_subprocess_check_output.assert_called_once()
+
+    mock_subprocess_check_output.side_effect = OSError("mocked error")
+    assert version_cache.query(["docker", "image", "list"]) is None
+    # Failed queries are run again.
+    mock_subprocess_check_output.side_effect = None
+    mock_subprocess_check_output.return_value = "image\n"
+    assert version_cache.query(["docker", "image", "list"]) == ["image"]
+
+
+@mock.patch("statick_tool.version_cache.subprocess.check_output")
+def test_clear_queries(mock_subprocess_check_output):
+    """Test that package manager listings are run again after they are cleared.
+
+    Expected result: other memoized results and tool versions are kept.
+    """
+    mock_subprocess_check_output.return_value = "ii  make 4.3\n"
+    version_cache.query(["dpkg", "-l"])
+    version_cache.set_version("tool:/bin/tool:1:1", "1.0", None)
+    assert version_cache.memoize(("key",), lambda: 1) == 1
+
+    version_cache.clear_queries()
+    mock_subprocess_check_output.return_value = "ii  make 4.4\n"
+    assert version_cache.query(["dpkg", "-l"]) == ["ii  make 4.4"]
+    assert mock_subprocess_check_output.call_count == 2
+    assert version_cache.memoize(("key",), lambda: 2) == 1
+    assert version_cache.get_version("tool:/bin/tool:1:1", None) == "1.0"
+
+
+@mock.patch("statick_tool.version_cache.subprocess.check_output")
+def test_query_npm(mock_subprocess_check_output):
+    """Test that the npm package list is parsed once per process."""
+    mock_subprocess_check_output.return_value = json.dumps(
+        {
+            "name": "project",
+            "dependencies": {
+                "npm-groovy-lint": {"version": "11.1.1"},
+                "eslint": {"version": "8.57.0"},
+            },
+        }
+    )
+    args = ["npm", "list", "--json", "--depth=0"]
+    packages = version_cache.query_npm(args)
+    assert packages == {"npm-groovy-lint": "11.1.1", "eslint": "8.57.0"}
+    assert version_cache.query_npm(args) is packages
+    mock_subprocess_check_output.assert_called_once()
+
+    mock_subprocess_check_output.return_value = "{}"
+    assert version_cache.query_npm(["npm", "list", "-g"]) == {}
+
+    mock_subprocess_check_output.side_effect = subprocess.CalledProcessError(1, "npm")
+    assert version_cache.query_npm(["npm", "list", "-g", "--json"]) is None
+
+
+def test_get_key(tmp_path):
+    """Test that the key changes when the tool binary changes."""
+    tool_bin = write_executable(str(tmp_path))
+    key = version_cache.get_key("tool", tool_bin)
+    assert key.startswith("tool:" + os.path.realpath(tool_bin) + ":")
+    assert version_cache.get_key("tool", tool_bin) == key
+    os.utime(tool_bin, ns=(0, 0))
+    assert version_cache.get_key("tool", tool_bin) != key
+    assert version_cache.get_key("tool", os.path.join(tmp_path, "missing")) is None
+
+
+def test_version_cache_dir(tmp_path):
+    """Test that versions are saved in the cache directory.
+
+    Expected result: versions are found again after the memory cache is cleared, and
+    entries for older builds of the same binary are replaced.
+    """
+    cache_dir = os.path.join(tmp_path, "cache")
+    tool_bin = write_executable(str(tmp_path))
+    key = version_cache.get_key("tool", tool_bin)
+    assert version_cache.get_version(key, cache_dir) is None
+    version_cache.set_version(key, "1.0", cache_dir)
+    version_cache.set_version("other:/bin/other:1:1", "2.0", cache_dir)
+    version_cache.clear()
+    assert version_cache.get_version(key, cache_dir) == "1.0"
+
+    os.utime(tool_bin, ns=(0, 0))
+    new_key = version_cache.get_key("tool", tool_bin)
+    version_cache.set_version(new_key, "1.1", cache_dir)
+    versions = version_cache.read_cache(cache_dir)
+    assert versions == {"other:/bin/other:1:1": "2.0", new_key: "1.1"}
+
+
+def test_version_cache_memory_only():
+    """Test that versions are kept in memory without a cache directory."""
+    version_cache.set_version("tool:/bin/tool:1:1", "1.0", None)
+    assert version_cache.get_version("tool:/bin/tool:1:1", None) == "1.0"
+    assert version_cache.get_version("tool:/bin/tool:2:1", None) is None
+
+
+def test_read_cache_invalid(tmp_path):
+    """Test that an invalid cache file is ignored."""
+    assert not version_cache.read_cache(str(tmp_path))
+    with open(
+        os.path.join(tmp_path, version_cache.VERSION_CACHE), "w", encoding="utf8"
+    ) as fid:
+        fid.write("[]")
+    assert not version_cache.read_cache(str(tmp_path))
@@ -0,0 +1,221 @@
+"""Tests for the watch module."""
+
+import os
+from tempfile import TemporaryDirectory
+
+import mock
+import pytest
+
+from statick_tool import watch
+from statick_tool.args import Args
+from statick_tool.issue import Issue
+from statick_tool.package import Package
+from statick_tool.plugins.tool.cccc import CCCCToolPlugin
+from statick_tool.plugins.tool.pylint import PylintToolPlugin
+from statick_tool.statick_tool import Statick
+from statick_tool.tool_plugin import ToolPlugin
+
+RSC_PATH = os.path.dirname(__file__)
+
+
+def write_file(path, content, mtime=None):
+    """Write a file, setting its modification time in seconds if given."""
+    with open(path, "w", encoding="utf8") as fid:
+        fid.write(content)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+def get_issues(package, file_type, tool):
+    """Create an issue with the file contents for each file of a type."""
+    issues = []
+    for filename in package.get(file_type, []):
+        with open(filename, encoding="utf8") as fid:
+            issues.append(Issue(filename, 1, tool, "type", 1, fid.read(), None))
+    return issues
+
+
+@pytest.fixture(name="watch_args")
+def fixture_watch_args():
+    """Create a package and arguments to watch it with."""
+    with TemporaryDirectory() as tmp_dir:
+        package_dir = os.path.join(tmp_dir, "package")
+        os.makedirs(package_dir)
+        write_file(os.path.join(package_dir, "a.py"), "a", 1000)
+        write_file(os.path.join(package_dir, "b.py"), "b", 1000)
+        output_dir = os.path.join(tmp_dir, "output")
+        os.makedirs(output_dir)
+
+        args = Args("Statick tool")
+        args.parser.add_argument("path", help="Path of package to scan")
+        statick = Statick(args.get_user_paths(["--user-paths", RSC_PATH]))
+        statick.gather_args(args.parser)
+        parsed_args = args.get_args(
+            [
+                package_dir,
+                "--user-paths",
+                RSC_PATH,
+                "--profile",
+                "profile.yaml",
+                "--output-directory",
+                output_dir,
+                "--watch",
+            ]
+        )
+        statick.get_config(parsed_args)
+        statick.get_exceptions(parsed_args)
+        yield statick, parsed_args
+
+
+def test_get_changes():
+    """Test that modified, added and removed files are found."""
+    with TemporaryDirectory() as tmp_dir:
+        write_file(os.path.join(tmp_dir, "a.py"), "a", 1000)
+        write_file(os.path.join(tmp_dir, "b.py"), "b", 1000)
+        os.makedirs(os.path.join(tmp_dir, ".git"))
+        write_file(os.path.join(tmp_dir, ".git", "index"), "index")
+        os.makedirs(os.path.join(tmp_dir, "output"))
+        write_file(os.path.join(tmp_dir, "output", "log"), "log")
+
+        skip_dirs = [os.path.join(tmp_dir, "output")]
+        old = watch.get_snapshot(tmp_dir, skip_dirs)
+        assert sorted(old) == [
+            os.path.join(tmp_dir, "a.py"),
+            os.path.join(tmp_dir, "b.py"),
+        ]
+        write_file(os.path.join(tmp_dir, "a.py"), "a", 2000)
+        write_file(os.path.join(tmp_dir, "c.py"), "c")
+        os.remove(os.path.join(tmp_dir, "b.py"))
+        new = watch.get_snapshot(tmp_dir, skip_dirs)
+        assert watch.get_changes(old, new) == (
+            [os.path.join(tmp_dir, "a.py")],
+            [os.path.join(tmp_dir, "c.py")],
+            [os.path.join(tmp_dir, "b.py")],
+        )
+        assert watch.get_changes(new, new) == ([], [], [])
+
+
+def test_get_subset():
+    """Test that only the given files of the given types are kept."""
+    package = Package("package", "/package")
+    package["python_src"] = ["/package/a.py", "/package/b.py"]
+    package["c_src"] = ["/package/a.c"]
+    package["bin_dir"] = "/build"
+
+    subset = watch.get_subset(package, ["python_src"], {"/package/b.py"})
+    assert subset["python_src"] == ["/package/b.py"]
+    assert subset["c_src"] == ["/package/a.c"]
+    assert subset["bin_dir"] == "/build"
+    assert subset["file_subset"] == ["/package/b.py"]
+    assert package["python_src"] == ["/package/a.py", "/package/b.py"]
+    assert "file_subset" not in package
+    assert watch.get_file_types(package, ["/package/a.c", "/package/c.txt"]) == {
+        "c_src"
+    }
+
+
+def test_get_plugin_order():
+    """Test that tools run after the tools they depend on."""
+    tool_plugins = {
+        "make": mock.Mock(**{"get_tool_dependencies.return_value": []}),
+        "clang_tidy": mock.Mock(**{"get_tool_dependencies.return_value": ["make"]}),
+        "pylint": mock.Mock(**{"get_tool_dependencies.return_value": []}),
+    }
+    assert watch.get_plugin_order(
+        tool_plugins, ["clang_tidy", "pylint", "make", "missing"]
+    ) == ["make", "clang_tidy", "pylint"]
+
+
+def test_get_affected_plugins(watch_args):
+    """Test choosing between scanning the changed files and the whole package.
+
+    Expected results: tools that can scan some files of a package only scan the
+    changed files, and tools listing file types that scan the whole package anyway
+    are run on the whole package.
+    """
+    statick, parsed_args = watch_args
+    per_file = mock.Mock(
+        **{
+            "get_file_types.return_value": ["c_src"],
+            "supports_file_subset.return_value": True,
+        }
+    )
+    whole_package = mock.Mock(
+        **{
+            "get_file_types.return_value": ["catkin"],
+            "supports_file_subset.return_value": False,
+            "get_input_file_types.return_value": ["catkin", "cmake_src"],
+        }
+    )
+    watcher = watch.Watcher(statick, parsed_args)
+    with mock.patch.object(
+        watcher, "get_plugins", return_value=[per_file, whole_package]
+    ):
+        assert watcher.get_affected_plugins({"c_src"}, set()) == [(per_file, False)]
+        assert watcher.get_affected_plugins({"cmake_src"}, set()) == [
+            (whole_package, True)
+        ]
+        assert watcher.get_affected_plugins(set(), {"catkin"}) == [
+            (whole_package, True)
+        ]
+
+
+@mock.patch.object(ToolPlugin, "get_cached_version", return_value="1.0")
+@mock.patch.object(CCCCToolPlugin, "is_available", return_value=True)
+@mock.patch.object(PylintToolPlugin, "is_available", return_value=True)
+@mock.patch.object(CCCCToolPlugin, "scan")
+@mock.patch.object(PylintToolPlugin, "scan")
+def test_watch(
+    mock_pylint_scan,
+    mock_cccc_scan,
+    mock_pylint_available,
+    mock_cccc_available,
+    mock_version,
+    watch_args,
+):
+    """Test scanning a package again as files change.
+
+    Expected results: tools scanning single files only scan the changed files, tools
+    scanning the whole package only run when their input files change, and issues in
+    changed and removed files are replaced.
+    """
+    statick, parsed_args = watch_args
+    mock_pylint_scan.side_effect = lambda package, level: get_issues(
+        package, "python_src", "pylint"
+    )
+    mock_cccc_scan.side_effect = lambda package, level: get_issues(
+        package, "c_src", "cccc"
+    )
+    package_dir = parsed_args.path
+    watcher = watch.Watcher(statick, parsed_args)
+    assert watcher.scan()
+    assert not watcher.success
+    assert [issue.message for issue in watcher.issues["pylint"]] == ["a", "b"]
+    assert watcher.issues["cccc"] == []
+    assert not watcher.poll()
+
+    mock_pylint_scan.reset_mock()
+    mock_cccc_scan.reset_mock()
+    write_file(os.path.join(package_dir, "a.py"), "a2", 2000)
+    assert watcher.poll()
+    assert mock_pylint_scan.call_args[0][0]["python_src"] == [
+        os.path.join(package_dir, "a.py")
+    ]
+    mock_cccc_scan.assert_not_called()
+    assert sorted(issue.message for issue in watcher.issues["pylint"]) == ["a2", "b"]
+
+    mock_pylint_scan.reset_mock()
+    write_file(os.path.join(package_dir, "a.c"), "c")
+    assert watcher.poll()
+    mock_pylint_scan.assert_not_called()
+    assert mock_cccc_scan.call_args[0][0]["c_src"] == [os.path.join(package_dir, "a.c")]
+    assert [issue.message for issue in watcher.issues["cccc"]] == ["c"]
+
+    mock_cccc_scan.reset_mock()
+    os.remove(os.path.join(package_dir, "b.py"))
+    write_file(os.path.join(package_dir, "notes.txt"), "notes")
+    assert watcher.poll()
+    mock_pylint_scan.assert_not_called()
+    mock_cccc_scan.assert_not_called()
+    assert [issue.message for issue in watcher.issues["pylint"]] == ["a2"]
+    assert os.path.join(package_dir, "b.py") not in watcher.package.files
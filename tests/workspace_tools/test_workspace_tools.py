@@ -0,0 +1,144 @@
+"""Tests for the workspace_tools module."""
+
+import os
+from tempfile import TemporaryDirectory
+
+from statick_tool import workspace_tools
+from statick_tool.issue import Issue
+from statick_tool.package import Package
+from statick_tool.tool_plugin import ToolPlugin
+
+
+class AgnosticToolPlugin(ToolPlugin):
+    """Package-agnostic tool plugin that reports an issue for every file."""
+
+    def __init__(self):
+        """Initialize the plugin."""
+        super().__init__()
+        self.packages = []
+        self.cwd = None
+
+    def get_name(self):
+        """Get name of tool."""
+        return "agnostic"
+
+    def get_file_types(self):
+        """Return a list of file types the plugin can scan."""
+        return ["python_src"]
+
+    def is_package_agnostic(self):
+        """Check if the tool reports the same issues for a file in any package."""
+        return True
+
+    def scan(self, package, level):
+        """Report an issue for every file, with a path relative to the cwd."""
+        self.packages.append(package)
+        self.cwd = os.getcwd()
+        return [
+            Issue(os.path.relpath(filename), 1, "agnostic", "type", 1, "msg", None)
+            for filename in package["python_src"]
+        ]
+
+
+def make_package(root, name, num_files):
+    """Create a package with the given number of Python files."""
+    package = Package(name, os.path.join(root, name))
+    package["python_src"] = [
+        os.path.join(root, name, f"file{index}.py") for index in range(num_files)
+    ]
+    return package
+
+
+def test_get_plugins():
+    """Test that only package-agnostic tools that can run are selected."""
+    agnostic = AgnosticToolPlugin()
+    tool_plugins = {"agnostic": agnostic, "other": ToolPlugin()}
+    assert workspace_tools.get_plugins(
+        tool_plugins, ["agnostic", "other", "unknown"], []
+    ) == [agnostic]
+    assert not workspace_tools.get_plugins(tool_plugins, ["agnostic"], ["agnostic"])
+    assert not workspace_tools.get_plugins(
+        tool_plugins, ["agnostic"], [], "other,unknown"
+    )
+    assert workspace_tools.get_plugins(
+        tool_plugins, ["agnostic"], [], "other,agnostic"
+    ) == [agnostic]
+
+
+def test_get_chunks():
+    """Test that packages are grouped by number of files without splitting them."""
+    packages = [
+        make_package("/ws", "a", 2),
+        make_package("/ws", "b", 0),
+        make_package("/ws", "c", 2),
+        make_package("/ws", "d", 5),
+        make_package("/ws", "e", 1),
+    ]
+    chunks = workspace_tools.get_chunks(packages, ["python_src"], 4)
+    assert [[package.name for package in chunk] for chunk in chunks] == [
+        ["a", "c"],
+        ["d"],
+        ["e"],
+    ]
+    assert not workspace_tools.get_chunks(packages, ["shell_src"], 4)
+
+
+def test_merge_packages():
+    """Test that the files of several packages are merged."""
+    first = make_package("/ws", "a", 1)
+    second = make_package("/ws", "b", 2)
+    second["shell_src"] = ["/ws/b/run.sh"]
+    merged = workspace_tools.merge_packages(
+        "all", "/ws", [first, second], ["python_src", "shell_src"]
+    )
+    assert merged.name == "all"
+    assert merged["python_src"] == first["python_src"] + second["python_src"]
+    assert merged["shell_src"] == ["/ws/b/run.sh"]
+    assert first["python_src"] == ["/ws/a/file0.py"]
+
+
+def test_route_issues():
+    """Test that issues are routed to the innermost package owning the file."""
+    packages = [
+        Package("outer", "/ws/outer"),
+        Package("inner", "/ws/outer/inner"),
+        Package("outer2", "/ws/outer2"),
+    ]
+    issues = [
+        Issue("/ws/outer/a.py", 1, "tool", "type", 1, "msg", None),
+        Issue("/ws/outer/inner/b.py", 1, "tool", "type", 1, "msg", None),
+        Issue("/ws/outer2/c.py", 1, "tool", "type", 1, "msg", None),
+        Issue("/elsewhere/d.py", 1, "tool", "type", 1, "msg", None),
+    ]
+    routed = workspace_tools.route_issues(packages, issues)
+    assert routed["/ws/outer"] == [issues[0]]
+    assert routed["/ws/outer/inner"] == [issues[1]]
+    assert routed["/ws/outer2"] == [issues[2]]
+
+
+def test_scan():
+    """Test that a tool is run over several packages and issues are routed back.
+
+    Expected results: the tool runs once in the output directory and relative file
+    names in its issues are resolved there.
+    """
+    plugin = AgnosticToolPlugin()
+    with TemporaryDirectory() as tmp_dir:
+        packages = [make_package(tmp_dir, "a", 1), make_package(tmp_dir, "b", 2)]
+        output_dir = os.path.join(tmp_dir, "all_packages-level")
+        orig_path = os.getcwd()
+        routed = workspace_tools.scan(plugin, packages, "level", output_dir)
+        assert os.getcwd() == orig_path
+        assert plugin.cwd == output_dir
+        assert len(plugin.packages) == 1
+        assert plugin.packages[0].path == tmp_dir
+        assert len(routed[packages[0].path]) == 1
+        assert len(routed[packages[1].path]) == 2
+
+
+def test_scan_failed():
+    """Test that a failed tool run is reported as None."""
+    plugin = AgnosticToolPlugin()
+    plugin.scan = lambda package, level: None
+    packages = [make_package("/ws", "a", 1)]
+    assert workspace_tools.scan(plugin, packages, "level") is None